@@ -1,6 +1,7 @@
 """
 Admin endpoints for API key management and tenant management
 """
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from app.models.tenant import (
@@ -18,6 +19,12 @@ from app.database import (
     delete_api_key
 )
 from app.database.connection import get_db_dependency
+from app.quendoo.cache import get_response_cache, get_analysis_cache, get_tool_result_cache
+from app.quendoo.singleflight import get_single_flight
+from app.quendoo.resilience import get_circuit_breakers
+from app.quendoo.governor import get_governors
+from app.quendoo.tools import get_tool_registry
+from app.quendoo.booking_store import get_booking_store
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -190,3 +197,173 @@ async def delete_api_key_endpoint(tenant_id: str, key_name: str, db: Session = D
         "tenant_id": tenant_id,
         "key_name": key_name
     }
+
+
+# Upstream diagnostics
+
+@router.get("/cache/stats")
+async def cache_stats_endpoint():
+    """
+    Get Quendoo response cache and request coalescing statistics
+
+    Example:
+        GET /admin/cache/stats
+
+        Response:
+        {
+            "quendoo": {
+                "entries": 12,
+                "max_entries": 1000,
+                "hits": 340,
+                "misses": 25,
+                "evictions": 0,
+                "hit_rate": 0.932,
+                "invalidations": 3,
+                "revalidation_entries": 10,
+                "not_modified": 58,
+                "endpoint_ttls": {"/Property/getPropertySettings": 600.0, ...}
+            },
+            "coalescing": {"inflight": 0, "leaders": 365, "coalesced": 41},
+            "bookings": {"tenants": 4, "bookings": 812, "syncs": 30, "local_reads": 95, ...},
+            "analysis": {"entries": 7, "max_entries": 256, "hits": 15, "misses": 9, ...},
+            "tool_memo": {"entries": 40, "hits": 112, "misses": 51, ..., "tenants": {"3f2a9c1b7e4d5a60": 12}, "tools": {"search_hotel_documents": {"hits": 30, "misses": 12}}}
+        }
+    """
+    return {
+        "quendoo": get_response_cache().get_stats(),
+        "coalescing": get_single_flight().get_stats(),
+        "bookings": get_booking_store().get_stats(),
+        "analysis": get_analysis_cache().get_stats(),
+        "tool_memo": get_tool_result_cache().get_stats()
+    }
+
+
+@router.get("/upstream/circuits")
+async def circuit_states_endpoint():
+    """
+    Get per-endpoint circuit breaker state for the Quendoo API
+
+    Example:
+        GET /admin/upstream/circuits
+
+        Response:
+        {
+            "circuits": {
+                "/Booking/getBookings": {
+                    "state": "open",
+                    "consecutive_failures": 5,
+                    "failure_threshold": 5,
+                    "retry_in_seconds": 12.4,
+                    "total_failures": 7,
+                    "total_rejections": 3,
+                    "last_error": "HTTP 502"
+                }
+            },
+            "open": ["/Booking/getBookings"]
+        }
+    """
+    circuits = get_circuit_breakers().get_states()
+    return {
+        "circuits": circuits,
+        "open": [name for name, state in circuits.items() if state["state"] != "closed"]
+    }
+
+
+@router.get("/upstream/governors")
+async def governor_stats_endpoint():
+    """
+    Get per-tenant outbound queue and rate metrics for the Quendoo API
+
+    Example:
+        GET /admin/upstream/governors
+
+        Response:
+        {
+            "tenants": {
+                "3f2a9c1b7e4d5a60": {
+                    "queue_depth": 4,
+                    "in_flight": 8,
+                    "max_queue_depth": 17,
+                    "rate_per_second": 5.0,
+                    "base_rate_per_second": 10.0,
+                    "max_concurrency": 8,
+                    "paused_seconds": 0.0,
+                    "requests": 1240,
+                    "queued": 96,
+                    "throttled": 1,
+                    "avg_wait_ms": 12.3
+                }
+            },
+            "queue_depth": 4,
+            "in_flight": 8,
+            "throttled": 1
+        }
+    """
+    return get_governors().get_stats()
+
+
+# Tool diagnostics
+
+@router.get("/tools/stats")
+async def tool_stats_endpoint():
+    """
+    Get per-tool call statistics and handler module load times
+
+    first_call_ms shows what the first call of each tool cost; "modules"
+    shows how long each handler module took to import (warmup or first use).
+
+    Example:
+        GET /admin/tools/stats
+
+        Response:
+        {
+            "tools": {
+                "analyze_data": {
+                    "module": "app.quendoo.handlers.analysis",
+                    "loaded": true,
+                    "timeout_seconds": 90.0,
+                    "cache": "none",
+                    "calls": 12,
+                    "errors": 0,
+                    "first_call_ms": 2310.4,
+                    "avg_ms": 1840.2
+                }
+            },
+            "modules": {"app.quendoo.handlers.analysis": 655.1, ...},
+            "module_errors": {}
+        }
+    """
+    return get_tool_registry().get_stats()
+
+
+@router.delete("/tools/cache")
+async def purge_tool_cache_endpoint(
+    tenant_key: Optional[str] = None,
+    tool_name: Optional[str] = None,
+    hotel_id: Optional[str] = None
+):
+    """
+    Purge memoized tool results (all of them if no filter is given)
+
+    Use after documents were uploaded or changed outside this service.
+    Results are memoized per Quendoo API key sent with the request, so a
+    tenant is selected by its hashed key as listed under "tool_memo.tenants"
+    in /admin/cache/stats (the same key as in /admin/upstream/governors).
+
+    Example:
+        DELETE /admin/tools/cache?tenant_key=3f2a9c1b7e4d5a60&tool_name=list_hotel_documents
+
+        Response:
+        {
+            "success": true,
+            "removed": 3
+        }
+    """
+    if tool_name is not None and get_tool_registry().get(tool_name) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {tool_name}")
+
+    removed = get_tool_result_cache().purge(tenant=tenant_key, tool_name=tool_name, hotel_id=hotel_id)
+    return {
+        "success": True,
+        "removed": removed
+    }
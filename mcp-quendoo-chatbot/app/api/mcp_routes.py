@@ -1,16 +1,28 @@
 """
 MCP Protocol endpoints for connection and tool execution
 """
+import time
 from fastapi import APIRouter, HTTPException, Header
 from typing import Optional
 from app.models.tenant import (
     ConnectionRequest,
     ConnectionResponse,
     ToolExecuteRequest,
-    ToolExecuteResponse
+    ToolExecuteResponse,
+    ToolBatchRequest,
+    ToolBatchResponse,
+    ToolBatchResult,
+    ToolPipelineRequest,
+    ToolPipelineResponse
 )
 from app.mcp.protocol import get_mcp_server
-from app.quendoo.tools import list_quendoo_tools
+from app.quendoo.tools import list_quendoo_tools, get_tool_registry
+from app.quendoo.pipeline import run_pipeline, PipelineError
+from app.quendoo.shaping import shape_tool_result, parse_token_budget
+from app.config import get_settings
+from app.deadline import parse_timeout
+
+settings = get_settings()
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
@@ -63,16 +75,25 @@ async def connect(request: ConnectionRequest):
 @router.post("/tools/execute", response_model=ToolExecuteResponse)
 async def execute_tool(
     request: ToolExecuteRequest,
-    x_quendoo_api_key: Optional[str] = Header(None)
+    x_quendoo_api_key: Optional[str] = Header(None),
+    x_tool_timeout: Optional[str] = Header(None),
+    x_result_max_tokens: Optional[str] = Header(None)
 ):
     """
     Execute a tool via MCP connection
 
-    Uses the Quendoo API key from X-Quendoo-Api-Key header (user-provided per request)
+    Uses the Quendoo API key from X-Quendoo-Api-Key header (user-provided per request).
+    Optional X-Tool-Timeout header sets the call's deadline in seconds
+    (defaults to the tool's budget from TOOL_SPECS). Results are returned in
+    full unless X-Result-Max-Tokens is sent: then they are shaped to that
+    token budget (fields dropped, arrays paginated - see "_shaping" and the
+    tool's result_offset argument). Shaping by default is for MCP clients
+    (JSON-RPC /messages), not for this HTTP API.
 
     Example:
         POST /mcp/tools/execute
         Headers: X-Quendoo-Api-Key: <user's quendoo api key>
+                 X-Tool-Timeout: 15
         {
             "connection_id": "conn_abc123...",
             "tool_name": "get_availability",
@@ -101,11 +122,15 @@ async def execute_tool(
     server = get_mcp_server()
 
     try:
+        max_result_tokens = parse_token_budget(x_result_max_tokens)
         result = await server.handle_tool_call(
             connection_id=request.connection_id,
             tool_name=request.tool_name,
             tool_args=request.tool_args,
-            quendoo_api_key=x_quendoo_api_key  # Pass user's API key
+            quendoo_api_key=x_quendoo_api_key,  # Pass user's API key
+            timeout=parse_timeout(x_tool_timeout),
+            max_result_tokens=max_result_tokens,
+            shape=max_result_tokens is not None  # Opt-in on the HTTP API
         )
 
         if result.get("success"):
@@ -129,6 +154,208 @@ async def execute_tool(
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
 
+@router.post("/tools/execute_batch", response_model=ToolBatchResponse)
+async def execute_tool_batch(
+    request: ToolBatchRequest,
+    x_quendoo_api_key: Optional[str] = Header(None),
+    x_tool_timeout: Optional[str] = Header(None),
+    x_result_max_tokens: Optional[str] = Header(None)
+):
+    """
+    Execute several independent tools via one MCP connection
+
+    Calls run concurrently (up to TOOL_BATCH_MAX_CONCURRENCY at a time), each
+    under its own deadline: the call's "timeout", else X-Tool-Timeout, else
+    the tool's budget. Results come back in request order; a failing call
+    only sets "error" on its own entry. Results are only shaped if
+    X-Result-Max-Tokens is sent (the budget applies per call).
+
+    Example:
+        POST /mcp/tools/execute_batch
+        Headers: X-Quendoo-Api-Key: <user's quendoo api key>
+        {
+            "connection_id": "conn_abc123...",
+            "calls": [
+                {"tool_name": "get_availability",
+                 "tool_args": {"date_from": "2026-03-01", "date_to": "2026-03-10", "sysres": "qdo"}},
+                {"tool_name": "get_rooms_details", "tool_args": {}},
+                {"tool_name": "get_bookings", "tool_args": {}, "timeout": 10}
+            ]
+        }
+
+        Response:
+        {
+            "connection_id": "conn_abc123...",
+            "results": [
+                {"index": 0, "tool_name": "get_availability", "result": {...}, "error": null, ...},
+                {"index": 1, "tool_name": "get_rooms_details", "result": {...}, "error": null, ...},
+                {"index": 2, "tool_name": "get_bookings", "result": null, "error": "...", "timed_out": true, ...}
+            ],
+            "succeeded": 2,
+            "failed": 1,
+            "duration_ms": 412.7
+        }
+    """
+    # Validate Quendoo API key is provided
+    if not x_quendoo_api_key:
+        raise HTTPException(
+            status_code=400,
+            detail="X-Quendoo-Api-Key header is required"
+        )
+
+    if len(request.calls) > settings.TOOL_BATCH_MAX_CALLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(request.calls)} calls, maximum is {settings.TOOL_BATCH_MAX_CALLS}"
+        )
+
+    server = get_mcp_server()
+    started = time.perf_counter()
+    max_result_tokens = parse_token_budget(x_result_max_tokens)
+
+    try:
+        outcomes = await server.handle_tool_batch(
+            connection_id=request.connection_id,
+            calls=[call.model_dump() for call in request.calls],
+            quendoo_api_key=x_quendoo_api_key,
+            timeout=parse_timeout(x_tool_timeout),
+            max_result_tokens=max_result_tokens,
+            shape=max_result_tokens is not None  # Opt-in on the HTTP API
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch execution failed: {str(e)}")
+
+    results = []
+    for index, (call, outcome) in enumerate(zip(request.calls, outcomes)):
+        success = outcome.get("success", False)
+        results.append(ToolBatchResult(
+            index=index,
+            tool_name=call.tool_name,
+            result=outcome.get("result") if success else None,
+            error=None if success else outcome.get("error"),
+            timed_out=outcome.get("timed_out", False),
+            duration_ms=outcome["duration_ms"]
+        ))
+
+    succeeded = sum(1 for r in results if r.error is None)
+    return ToolBatchResponse(
+        connection_id=request.connection_id,
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+
+
+@router.post("/tools/execute_pipeline", response_model=ToolPipelineResponse)
+async def execute_tool_pipeline(
+    request: ToolPipelineRequest,
+    x_quendoo_api_key: Optional[str] = Header(None),
+    x_tool_timeout: Optional[str] = Header(None),
+    x_result_max_tokens: Optional[str] = Header(None)
+):
+    """
+    Execute a pipeline of tools whose arguments reference earlier results
+
+    "{RESULT}" (previous step), "{RESULT:step_id}" and "{RESULT:step_id.field}"
+    are resolved on the server, so intermediate payloads never leave the
+    process. Independent steps run concurrently; each step runs through
+    handle_tool_call under its own deadline (X-Tool-Timeout or the tool's
+    budget). Only the final steps' results are returned unless "outputs"
+    lists step ids; intermediate results are not shaped, returned outputs
+    only if X-Result-Max-Tokens is sent.
+
+    Example:
+        POST /mcp/tools/execute_pipeline
+        Headers: X-Quendoo-Api-Key: <user's quendoo api key>
+        {
+            "connection_id": "conn_abc123...",
+            "steps": [
+                {"id": "avail", "tool_name": "get_availability",
+                 "tool_args": {"date_from": "2026-03-01", "date_to": "2026-03-31", "sysres": "qdo"}},
+                {"id": "summary", "tool_name": "analyze_data",
+                 "tool_args": {"data": "{RESULT}", "instruction": "Dates with < 5 rooms", "format": "html_table"}},
+                {"id": "mail", "tool_name": "send_quendoo_email",
+                 "tool_args": {"to": "gm@hotel.com", "subject": "Low availability",
+                               "message": "{RESULT:summary.analysis}", "html": true}}
+            ]
+        }
+
+        Response:
+        {
+            "connection_id": "conn_abc123...",
+            "success": true,
+            "steps": [
+                {"id": "avail", "tool_name": "get_availability", "success": true, "duration_ms": 220.4},
+                ...
+            ],
+            "outputs": {"mail": {"success": true, "result": {...}}},
+            "duration_ms": 5120.9
+        }
+    """
+    # Validate Quendoo API key is provided
+    if not x_quendoo_api_key:
+        raise HTTPException(
+            status_code=400,
+            detail="X-Quendoo-Api-Key header is required"
+        )
+
+    server = get_mcp_server()
+    if not server.get_connection_context(request.connection_id):
+        raise HTTPException(status_code=404, detail=f"Connection not found: {request.connection_id}")
+
+    timeout = parse_timeout(x_tool_timeout)
+
+    async def run_step(tool_name: str, tool_args: dict) -> dict:
+        if tool_name == "run_tool_pipeline":
+            return {"success": False, "error": "Pipelines cannot be nested"}
+        try:
+            return await server.handle_tool_call(
+                connection_id=request.connection_id,
+                tool_name=tool_name,
+                tool_args=tool_args,
+                quendoo_api_key=x_quendoo_api_key,
+                timeout=timeout,
+                shape=False  # Full results feed later steps
+            )
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    started = time.perf_counter()
+    try:
+        outcome = await run_pipeline(
+            [step.model_dump() for step in request.steps],
+            run_step,
+            param_type=get_tool_registry().get_param_type,
+            outputs=request.outputs,
+            max_steps=settings.TOOL_PIPELINE_MAX_STEPS,
+            max_concurrency=settings.TOOL_BATCH_MAX_CONCURRENCY
+        )
+    except PipelineError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pipeline: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pipeline execution failed: {str(e)}")
+
+    outputs = outcome["outputs"]
+    max_result_tokens = parse_token_budget(x_result_max_tokens)
+    if max_result_tokens is not None:
+        tool_names = {status["id"]: status["tool_name"] for status in outcome["steps"]}
+        outputs = {
+            step_id: shape_tool_result(tool_names[step_id], result, max_tokens=max_result_tokens)
+            for step_id, result in outputs.items()
+        }
+
+    return ToolPipelineResponse(
+        connection_id=request.connection_id,
+        success=outcome["success"],
+        steps=outcome["steps"],
+        outputs=outputs,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+
+
 @router.post("/disconnect")
 async def disconnect(connection_id: str):
     """
@@ -10,6 +10,8 @@ from uuid import uuid4
 
 from app.mcp.protocol import get_mcp_server
 from app.models.tenant import ToolExecuteRequest
+from app.deadline import parse_timeout, timeout_from_meta
+from app.quendoo.shaping import parse_token_budget, budget_from_meta
 
 router = APIRouter(tags=["SSE-MCP"])
 
@@ -78,12 +80,19 @@ async def sse_mcp_endpoint(request: Request):
 async def messages_mcp_endpoint(
     request: Request,
     session_id: str,
-    x_quendoo_api_key: Optional[str] = Header(None)
+    x_quendoo_api_key: Optional[str] = Header(None),
+    x_tool_timeout: Optional[str] = Header(None),
+    x_result_max_tokens: Optional[str] = Header(None)
 ):
     """
     Handle JSON-RPC messages from backend
 
-    Extracts Quendoo API key from header and processes MCP requests
+    Extracts Quendoo API key from header and processes MCP requests.
+    A tools/call deadline (seconds) is read from params._meta.timeout
+    (or _meta.timeout_ms), falling back to the X-Tool-Timeout header. The
+    result token budget is read from params._meta.max_result_tokens, falling
+    back to the X-Result-Max-Tokens header, then the tool's budget
+    (RESULT_MAX_TOKENS) - MCP clients get shaped results by default.
     """
     try:
         # Parse JSON-RPC request
@@ -183,7 +192,9 @@ async def messages_mcp_endpoint(
                     connection_id=connection_id,
                     tool_name=tool_name,
                     tool_args=tool_args,
-                    quendoo_api_key=api_key
+                    quendoo_api_key=api_key,
+                    timeout=timeout_from_meta(params) or parse_timeout(x_tool_timeout),
+                    max_result_tokens=budget_from_meta(params) or parse_token_budget(x_result_max_tokens)
                 )
 
                 if result.get("success"):
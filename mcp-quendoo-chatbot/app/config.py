@@ -33,10 +33,91 @@ class Settings(BaseSettings):
         """Parse CORS_ORIGINS string into list"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    # Import tool handler modules (anthropic, vertexai, firestore, ...) at startup
+    TOOL_WARMUP_ENABLED: bool = True
+
+    # Batch tool execution (POST /mcp/tools/execute_batch)
+    TOOL_BATCH_MAX_CALLS: int = 20
+    TOOL_BATCH_MAX_CONCURRENCY: int = 8
+
+    # Result shaping: results above the token budget are reduced
+    # (fields dropped, arrays paginated, strings truncated) before returning
+    RESULT_SHAPING_ENABLED: bool = True
+    RESULT_MAX_TOKENS: int = 8000
+
+    # analyze_data: Anthropic API key refresh and result cache
+    ANTHROPIC_SECRET_REFRESH_SECONDS: float = 3600.0
+    ANALYSIS_CACHE_TTL_SECONDS: float = 3600.0
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 256
+    # Larger inputs are split on record boundaries and analyzed map-reduce style
+    ANALYSIS_CHUNK_CHARS: int = 100000
+    ANALYSIS_MAP_CONCURRENCY: int = 8
+    ANALYSIS_MAX_CHUNKS: int = 24
+    # Expected duration of one model call; limits the chunk count to what fits the tool's deadline
+    ANALYSIS_CALL_SECONDS: float = 30.0
+
+    # Tool result memoization for tools declared with CachePolicy.MEMO in TOOL_SPECS
+    TOOL_MEMO_ENABLED: bool = True
+    TOOL_MEMO_MAX_ENTRIES: int = 500
+
+    # Server-side tool pipelines ({RESULT} chaining)
+    TOOL_PIPELINE_MAX_STEPS: int = 10
+
     # Connection settings
     MAX_CONNECTIONS_PER_TENANT: int = 10
     CONNECTION_TIMEOUT_MINUTES: int = 60
 
+    # Outbound HTTP connection pools (shared per upstream host)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_DEFAULT_TIMEOUT_SECONDS: float = 60.0
+
+    # Quendoo PMS API (point at benchmarks/fake_quendoo.py for offline load tests)
+    QUENDOO_API_BASE_URL: str = "https://www.platform.quendoo.com/api/pms/v1"
+
+    # Quendoo response cache (slow-changing property data)
+    QUENDOO_CACHE_MAX_ENTRIES: int = 1000
+    QUENDOO_CACHE_TTL_PROPERTY_SETTINGS: float = 600.0
+    QUENDOO_CACHE_TTL_ROOMS_DETAILS: float = 600.0
+    QUENDOO_CACHE_TTL_BOOKING_MODULE: float = 1800.0
+    # Bodies with ETag/Last-Modified are kept this long for conditional GETs (304)
+    QUENDOO_CACHE_REVALIDATE_TTL_SECONDS: float = 86400.0
+
+    # Quendoo API retries (GET only) and per-endpoint circuit breakers
+    QUENDOO_RETRY_MAX_ATTEMPTS: int = 3
+    QUENDOO_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    QUENDOO_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    QUENDOO_RETRY_AFTER_MAX_SECONDS: float = 30.0
+    QUENDOO_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    QUENDOO_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Per-tenant outbound governor (token bucket + in-flight limit per API key).
+    # The burst covers a full scan_booking_offers grid (QUENDOO_OFFER_SCAN_MAX_COMBINATIONS)
+    # and the in-flight limit the tools' own fan-out; 429s still lower the rate (AIMD).
+    QUENDOO_TENANT_RATE_PER_SECOND: float = 50.0
+    QUENDOO_TENANT_BURST: int = 120
+    QUENDOO_TENANT_MAX_CONCURRENCY: int = 16
+    QUENDOO_TENANT_MIN_RATE_PER_SECOND: float = 0.5
+    QUENDOO_GOVERNOR_MAX_TENANTS: int = 1000
+
+    # Wide getAvailability ranges are fetched as concurrent date windows
+    QUENDOO_AVAILABILITY_WINDOW_DAYS: int = 31
+    QUENDOO_AVAILABILITY_MAX_CONCURRENCY: int = 4
+
+    # Bulk update_availability (chunked by room and date)
+    QUENDOO_BULK_CHUNK_SIZE: int = 200
+    QUENDOO_BULK_MAX_CONCURRENCY: int = 4
+
+    # scan_booking_offers fan-out limits
+    QUENDOO_OFFER_SCAN_MAX_CONCURRENCY: int = 6
+    QUENDOO_OFFER_SCAN_MAX_COMBINATIONS: int = 120
+
+    # Local bookings store (get_bookings reads are served from the last sync)
+    QUENDOO_BOOKINGS_SYNC_INTERVAL_SECONDS: float = 60.0
+    QUENDOO_BOOKINGS_MAX_TENANTS: int = 200
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,126 @@
+"""
+Per-request deadlines for tool calls
+
+A tool call runs inside deadline_scope(); the deadline travels with the task's
+context, so downstream HTTP, Firestore and embedding calls can ask for the
+remaining budget instead of using their own fixed timeouts.
+
+Example usage:
+    with deadline_scope(15.0):
+        await execute_quendoo_tool(...)
+
+    # somewhere downstream
+    timeout = timeout_for(60.0)  # min(60, seconds left), raises if already expired
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# Header carrying the caller's budget in seconds (e.g. "X-Tool-Timeout: 12.5")
+DEADLINE_HEADER = "X-Tool-Timeout"
+
+# Absolute deadline (time.monotonic()) of the current tool call
+_deadline: ContextVar[Optional[float]] = ContextVar("tool_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is abandoned because the caller's deadline has passed"""
+
+    def __init__(self, what: str = "operation"):
+        super().__init__(f"Deadline exceeded before {what} could complete")
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Run the enclosed block under a deadline `seconds` from now
+
+    A nested scope can only shorten an enclosing deadline, never extend it.
+    """
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + max(0.0, seconds)
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline (None if no deadline is set)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(what: str = "operation"):
+    """
+    Abandon work whose deadline has already passed
+
+    Raises:
+        DeadlineExceeded: If the current deadline has expired
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(what)
+
+
+def timeout_for(default: float, what: str = "operation") -> float:
+    """
+    Timeout for a downstream call: the default, capped by the remaining budget
+
+    Raises:
+        DeadlineExceeded: If the current deadline has expired
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(what)
+    return min(default, left)
+
+
+def fits_in_deadline(seconds: float) -> bool:
+    """Check whether waiting `seconds` still leaves time before the deadline"""
+    left = remaining()
+    return left is None or seconds < left
+
+
+def parse_timeout(value: Any) -> Optional[float]:
+    """
+    Parse a caller-provided budget in seconds
+
+    Returns:
+        Positive number of seconds, or None if missing/invalid
+    """
+    if value is None or value == "":
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds > 0 else None
+
+
+def timeout_from_meta(params: Dict[str, Any]) -> Optional[float]:
+    """
+    Read a budget from JSON-RPC request metadata
+
+    Accepts params._meta.timeout (seconds) or params._meta.timeout_ms.
+    """
+    meta = params.get("_meta") if isinstance(params, dict) else None
+    if not isinstance(meta, dict):
+        return None
+    if "timeout" in meta:
+        return parse_timeout(meta["timeout"])
+    seconds = parse_timeout(meta.get("timeout_ms"))
+    return seconds / 1000 if seconds is not None else None
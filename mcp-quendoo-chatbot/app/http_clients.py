@@ -0,0 +1,135 @@
+"""
+Shared outbound HTTP client registry
+
+Keeps one keep-alive connection pool per upstream host so tool calls reuse
+TCP/TLS connections instead of paying a fresh handshake on every request.
+Clients are created lazily on first use and closed on application shutdown.
+"""
+import importlib.util
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Pool key for arbitrary user-supplied URLs (fetch_url) - these share one pool
+# instead of opening a dedicated pool per external host
+EXTERNAL_POOL = "external"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (installed via httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientRegistry:
+    """
+    Registry of pooled httpx.AsyncClient instances keyed by upstream origin
+
+    Example usage:
+        registry = get_http_registry()
+        client = registry.get_client("https://www.platform.quendoo.com/api/pms/v1")
+        response = await client.get(url, timeout=30.0)
+
+        # On shutdown
+        await registry.aclose()
+    """
+
+    def __init__(self):
+        """Initialize empty registry"""
+        # origin (scheme://host[:port]) -> pooled client
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2 = settings.HTTP2_ENABLED and _http2_available()
+
+    @staticmethod
+    def pool_key(url: str) -> str:
+        """
+        Get pool key (origin) for a URL
+
+        Args:
+            url: Absolute URL or a pool name such as EXTERNAL_POOL
+
+        Returns:
+            Origin string used as registry key
+        """
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return url
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create a new pooled client using configured limits"""
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        return httpx.AsyncClient(
+            http2=self._http2,
+            limits=limits,
+            timeout=settings.HTTP_DEFAULT_TIMEOUT_SECONDS
+        )
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Get (or lazily create) the pooled client for the URL's upstream host
+
+        Args:
+            url: Upstream URL or pool name
+
+        Returns:
+            Shared httpx.AsyncClient - callers must NOT close it
+        """
+        key = self.pool_key(url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self._clients[key] = client
+            print(f"[HTTP] Created connection pool for {key} (http2={self._http2})")
+        return client
+
+    async def aclose(self):
+        """Close all pooled clients (called on application shutdown)"""
+        clients = list(self._clients.items())
+        self._clients.clear()
+
+        for key, client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"[HTTP] Error closing pool for {key}: {e}")
+
+        if clients:
+            print(f"[HTTP] Closed {len(clients)} connection pool(s)")
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        Get registry overview for diagnostics
+
+        Returns:
+            Dictionary of pool key -> pool info
+        """
+        return {
+            key: {"closed": client.is_closed, "http2": self._http2}
+            for key, client in self._clients.items()
+        }
+
+
+# Global registry instance
+_http_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_registry() -> HTTPClientRegistry:
+    """Get or create global HTTPClientRegistry"""
+    global _http_registry
+    if _http_registry is None:
+        _http_registry = HTTPClientRegistry()
+    return _http_registry
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Shortcut for get_http_registry().get_client(url)"""
+    return get_http_registry().get_client(url)
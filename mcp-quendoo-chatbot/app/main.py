@@ -3,10 +3,14 @@ MCP Quendoo Chatbot - Main FastAPI Application
 
 Multi-tenant MCP server for Quendoo hotel management system
 """
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
 from app.database.connection import init_db
+from app.http_clients import get_http_registry
+from app.quendoo.tools import get_tool_registry
+from app.services import document_service
 from app.api import mcp_routes, admin_routes, sse_mcp_routes
 
 settings = get_settings()
@@ -37,13 +41,25 @@ app.include_router(sse_mcp_routes.router)  # SSE-based MCP protocol
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and warm up tool handlers on startup"""
     print("[App] Starting MCP Quendoo Chatbot...")
     print(f"[App] Database: {settings.DATABASE_URL}")
     init_db()
+    if settings.TOOL_WARMUP_ENABLED:
+        # Import heavy tool handler modules now instead of on a user's first call
+        await get_tool_registry().warmup()
+        # Firebase/Vertex AI clients connect in the background so startup is not held up
+        app.state.document_warmup = asyncio.create_task(document_service.warmup())
     print("[App] Ready to accept connections!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled outbound HTTP clients on shutdown"""
+    print("[App] Shutting down MCP Quendoo Chatbot...")
+    await get_http_registry().aclose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API info"""
@@ -55,6 +71,8 @@ async def root():
             "mcp": [
                 "POST /mcp/connect",
                 "POST /mcp/tools/execute",
+                "POST /mcp/tools/execute_batch",
+                "POST /mcp/tools/execute_pipeline",
                 "POST /mcp/disconnect",
                 "GET /mcp/tools/list",
                 "GET /mcp/connections"
@@ -65,7 +83,11 @@ async def root():
                 "GET /admin/tenants",
                 "POST /admin/api-keys",
                 "GET /admin/api-keys/{tenant_id}",
-                "DELETE /admin/api-keys/{tenant_id}/{key_name}"
+                "DELETE /admin/api-keys/{tenant_id}/{key_name}",
+                "GET /admin/cache/stats",
+                "GET /admin/upstream/circuits",
+                "GET /admin/upstream/governors",
+                "GET /admin/tools/stats"
             ]
         },
         "documentation": "/docs"
@@ -6,10 +6,13 @@ Implements connection-based tenant isolation:
 - connection_id -> tenant_id mapping stored in memory
 - Each tool call uses tenant's API keys from database
 """
+import asyncio
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.config import get_settings
+from app.deadline import deadline_scope, remaining, DeadlineExceeded
 from app.database import get_db, get_api_key
 
 settings = get_settings()
@@ -102,16 +105,27 @@ class MultitenantMCPServer:
         connection_id: str,
         tool_name: str,
         tool_args: Dict[str, Any],
-        quendoo_api_key: Optional[str] = None
+        quendoo_api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_result_tokens: Optional[int] = None,
+        shape: bool = True
     ) -> Dict[str, Any]:
         """
         Handle tool execution request
 
+        The call runs under a deadline: the caller's timeout if given, else the
+        tool's default from TOOL_SPECS. Downstream calls only get the
+        remaining budget, and the call is abandoned once the deadline passes.
+        Successful results are shaped to the tool's (or caller's) token budget.
+
         Args:
             connection_id: Connection identifier
             tool_name: Name of the tool to execute
             tool_args: Tool arguments
             quendoo_api_key: User's Quendoo API key (per-request, optional)
+            timeout: Caller's latency budget in seconds (optional)
+            max_result_tokens: Caller's result token budget (optional)
+            shape: Shape the result (off for results that stay server-side)
 
         Returns:
             Tool execution result
@@ -145,15 +159,25 @@ class MultitenantMCPServer:
         print(f"[MCP Server] Tool call: {tool_name} for tenant: {tenant_id} with user-provided API key")
 
         # Import here to avoid circular dependency
-        from app.quendoo.tools import execute_quendoo_tool
+        from app.quendoo.tools import execute_quendoo_tool, get_tool_timeout
+        from app.quendoo.shaping import shape_tool_result
+
+        budget = timeout if timeout is not None else get_tool_timeout(tool_name)
 
         try:
             # Execute tool with user's API key (passed per-request)
-            result = await execute_quendoo_tool(
-                tool_name=tool_name,
-                tool_args=tool_args,
-                api_key=quendoo_api_key
-            )
+            with deadline_scope(budget):
+                result = await asyncio.wait_for(
+                    execute_quendoo_tool(
+                        tool_name=tool_name,
+                        tool_args=tool_args,
+                        api_key=quendoo_api_key
+                    ),
+                    timeout=remaining()
+                )
+
+            if shape:
+                result = shape_tool_result(tool_name, result, tool_args, max_result_tokens)
 
             return {
                 "success": True,
@@ -162,6 +186,16 @@ class MultitenantMCPServer:
                 "tool_name": tool_name
             }
 
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            print(f"[MCP Server] Tool call abandoned: {tool_name} exceeded its {budget:.1f}s deadline")
+            return {
+                "success": False,
+                "error": f"Tool {tool_name} did not complete within its {budget:.1f}s deadline",
+                "timed_out": True,
+                "connection_id": connection_id,
+                "tool_name": tool_name
+            }
+
         except Exception as e:
             print(f"[MCP Server] Tool execution failed: {tool_name} - {str(e)}")
             return {
@@ -171,6 +205,71 @@ class MultitenantMCPServer:
                 "tool_name": tool_name
             }
 
+    async def handle_tool_batch(
+        self,
+        connection_id: str,
+        calls: List[Dict[str, Any]],
+        quendoo_api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_result_tokens: Optional[int] = None,
+        shape: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute several independent tool calls concurrently
+
+        Each call goes through handle_tool_call with its own deadline, so one
+        slow or failing call does not affect the others.
+
+        Args:
+            connection_id: Connection identifier
+            calls: List of {"tool_name", "tool_args", "timeout"?} invocations
+            quendoo_api_key: User's Quendoo API key (per-request)
+            timeout: Default latency budget per call in seconds (optional)
+            max_concurrency: Calls in flight at once (default TOOL_BATCH_MAX_CONCURRENCY)
+            max_result_tokens: Result token budget per call (optional)
+            shape: Shape each result (see handle_tool_call)
+
+        Returns:
+            handle_tool_call results in the same order as calls,
+            each with "duration_ms" added
+
+        Raises:
+            ValueError: If connection_id not found or API key not provided
+        """
+        if not self.get_connection_context(connection_id):
+            raise ValueError(f"Connection not found: {connection_id}")
+        if not quendoo_api_key:
+            raise ValueError("Quendoo API key is required for tool execution")
+
+        semaphore = asyncio.Semaphore(max_concurrency or settings.TOOL_BATCH_MAX_CONCURRENCY)
+        print(f"[MCP Server] Tool batch: {len(calls)} calls on {connection_id}")
+
+        async def run_call(call: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await self.handle_tool_call(
+                        connection_id=connection_id,
+                        tool_name=call["tool_name"],
+                        tool_args=call.get("tool_args") or {},
+                        quendoo_api_key=quendoo_api_key,
+                        timeout=call.get("timeout") or timeout,
+                        max_result_tokens=max_result_tokens,
+                        shape=shape
+                    )
+                except Exception as e:
+                    result = {
+                        "success": False,
+                        "error": str(e),
+                        "connection_id": connection_id,
+                        "tool_name": call["tool_name"]
+                    }
+                result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                return result
+
+        return await asyncio.gather(*(run_call(call) for call in calls))
+
     def get_connection_context(self, connection_id: str) -> Optional[Dict[str, Any]]:
         """
         Get connection context by connection_id
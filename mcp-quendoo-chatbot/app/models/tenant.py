@@ -2,7 +2,7 @@
 Database models for tenants, users, and API keys
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Any
 from sqlalchemy import Column, String, DateTime, ForeignKey, Text
 from sqlalchemy.orm import declarative_base, relationship
 from pydantic import BaseModel, Field
@@ -117,3 +117,59 @@ class ToolExecuteResponse(BaseModel):
     tool_name: str
     result: dict
     error: Optional[str] = None
+
+
+class ToolInvocation(BaseModel):
+    """Single tool call inside a batch"""
+    tool_name: str
+    tool_args: dict = Field(default_factory=dict)
+    timeout: Optional[float] = Field(None, gt=0)  # Seconds; overrides X-Tool-Timeout
+
+
+class ToolBatchRequest(BaseModel):
+    """Request model for executing several independent tools at once"""
+    connection_id: str
+    calls: List[ToolInvocation] = Field(..., min_length=1)
+
+
+class ToolBatchResult(BaseModel):
+    """Result of one call in a batch (same position as in the request)"""
+    index: int
+    tool_name: str
+    result: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    duration_ms: float
+
+
+class ToolBatchResponse(BaseModel):
+    """Response model for batch tool execution"""
+    connection_id: str
+    results: List[ToolBatchResult]
+    succeeded: int
+    failed: int
+    duration_ms: float
+
+
+class ToolPipelineStep(BaseModel):
+    """Single step of a tool pipeline"""
+    id: Optional[str] = None
+    tool_name: str
+    tool_args: dict = Field(default_factory=dict)
+    depends_on: List[str] = Field(default_factory=list)
+
+
+class ToolPipelineRequest(BaseModel):
+    """Request model for executing a tool pipeline"""
+    connection_id: str
+    steps: List[ToolPipelineStep] = Field(..., min_length=1)
+    outputs: Optional[List[str]] = None  # Step ids to return (default: final steps)
+
+
+class ToolPipelineResponse(BaseModel):
+    """Response model for tool pipeline execution"""
+    connection_id: str
+    success: bool
+    steps: List[dict]
+    outputs: dict
+    duration_ms: float
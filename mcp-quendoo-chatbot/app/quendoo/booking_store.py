@@ -0,0 +1,235 @@
+"""
+Local per-tenant bookings store
+
+Keeps the last known revision of every booking per tenant (keyed by
+booking_id) and serves get_bookings reads locally. A sync pulls bookings from
+Quendoo and applies only new or changed revisions; bookings missing from the
+pull (acked or cancelled) are removed. Syncs run at most once per
+QUENDOO_BOOKINGS_SYNC_INTERVAL_SECONDS per tenant unless a refresh is forced
+or a booking write invalidated the tenant.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import get_settings
+from app.quendoo.cache import tenant_key
+
+settings = get_settings()
+
+
+class TenantBookings:
+    """Bookings snapshot of a single tenant"""
+
+    def __init__(self):
+        # booking_id -> latest booking record
+        self.bookings: Dict[str, Dict[str, Any]] = {}
+        # booking_id -> revision_id of stored record
+        self.revisions: Dict[str, Any] = {}
+        # Non-"data" keys of the last upstream response
+        self.meta: Dict[str, Any] = {}
+        self.last_sync: Optional[float] = None
+        self.last_changes: Dict[str, int] = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        # Bumped by invalidate(); a sync that started before it does not mark the snapshot fresh
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Check whether the snapshot was synced within max_age seconds"""
+        return self.last_sync is not None and time.monotonic() - self.last_sync < max_age
+
+
+class BookingStore:
+    """
+    Per-tenant bookings store with incremental revision sync
+
+    Example usage:
+        store = get_booking_store()
+        result = await store.get_bookings(client)            # sync if stale, read locally
+        result = await store.get_bookings(client, refresh=True)  # force sync
+    """
+
+    def __init__(self, sync_interval: float = 60.0, max_tenants: int = 200):
+        """
+        Initialize store
+
+        Args:
+            sync_interval: Seconds a tenant snapshot is served without re-syncing
+            max_tenants: Number of tenant snapshots kept (least recently used evicted)
+        """
+        self.sync_interval = sync_interval
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, TenantBookings]" = OrderedDict()
+        self.syncs = 0
+        self.local_reads = 0
+        self.invalidations = 0
+
+    def _get_tenant(self, api_key: str) -> TenantBookings:
+        """Get or create tenant snapshot (marks it as recently used)"""
+        key = tenant_key(api_key)
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            tenant = TenantBookings()
+            self._tenants[key] = tenant
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+        self._tenants.move_to_end(key)
+        return tenant
+
+    @staticmethod
+    def apply(tenant: TenantBookings, records: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+        """
+        Apply booking records to a tenant snapshot
+
+        Records whose revision_id matches the stored revision are skipped.
+
+        Returns:
+            (added, updated, unchanged) counts
+        """
+        added = updated = unchanged = 0
+        for record in records:
+            booking_id = str(record["booking_id"])
+            revision_id = record.get("revision_id")
+
+            if booking_id not in tenant.bookings:
+                added += 1
+            elif revision_id is not None and tenant.revisions.get(booking_id) == revision_id:
+                unchanged += 1
+                continue
+            else:
+                updated += 1
+
+            tenant.bookings[booking_id] = record
+            tenant.revisions[booking_id] = revision_id
+
+        return added, updated, unchanged
+
+    @staticmethod
+    def prune(tenant: TenantBookings, seen: set) -> int:
+        """
+        Remove bookings that were not part of a full pull
+
+        Returns:
+            Number of removed bookings
+        """
+        stale = [booking_id for booking_id in tenant.bookings if booking_id not in seen]
+        for booking_id in stale:
+            del tenant.bookings[booking_id]
+            tenant.revisions.pop(booking_id, None)
+        return len(stale)
+
+    async def sync(self, client, tenant: TenantBookings) -> Optional[Dict[str, Any]]:
+        """
+        Pull bookings from Quendoo and apply changed revisions
+
+        The response is decoded as a stream, so each booking is applied as soon
+        as it is parsed and the raw payload is never held in memory in full.
+        getBookings returns the full current list, so once the pull completes
+        every booking it did not contain is pruned.
+
+        Returns:
+            None on success, or the upstream payload if it carried no bookings
+            list (e.g. an API error)
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "skipped": 0}
+        seen = set()
+        generation = tenant.generation
+
+        def on_booking(_, record: Any):
+            if not isinstance(record, dict) or record.get("booking_id") is None:
+                counts["skipped"] += 1
+                return
+            seen.add(str(record["booking_id"]))
+            added, updated, unchanged = self.apply(tenant, [record])
+            counts["added"] += added
+            counts["updated"] += updated
+            counts["unchanged"] += unchanged
+
+        meta, found = await client.stream_bookings(on_booking)
+        if not found:
+            return meta
+
+        counts["removed"] = self.prune(tenant, seen)
+        tenant.meta = meta
+        tenant.last_sync = time.monotonic()
+        if tenant.generation != generation:
+            # A booking write landed during the pull - serve this result, but sync again next read
+            tenant.last_sync = None
+        tenant.last_changes = {k: counts[k] for k in ("added", "updated", "unchanged", "removed")}
+        self.syncs += 1
+
+        print(
+            f"[BookingStore] Synced bookings: {counts['added']} new, {counts['updated']} changed, "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed, {counts['skipped']} without booking_id"
+        )
+        return None
+
+    async def get_bookings(self, client, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get tenant bookings, syncing with Quendoo if the snapshot is stale
+
+        Args:
+            client: QuendooAPIClient of the tenant
+            refresh: Force a sync even if the snapshot is fresh
+
+        Returns:
+            {"data": [...bookings...], ...upstream meta, "sync": {...}}
+        """
+        tenant = self._get_tenant(client.api_key)
+
+        async with tenant.lock:
+            if refresh or not tenant.is_fresh(self.sync_interval):
+                passthrough = await self.sync(client, tenant)
+                if passthrough is not None:
+                    return passthrough
+            else:
+                self.local_reads += 1
+
+            # Shallow copies - stored records are treated as read-only
+            response = dict(tenant.meta)
+            response["data"] = list(tenant.bookings.values())
+            response["sync"] = {
+                "total": len(tenant.bookings),
+                "age_seconds": round(time.monotonic() - tenant.last_sync, 1) if tenant.last_sync is not None else 0.0,
+                **tenant.last_changes
+            }
+            return response
+
+    def invalidate(self, api_key: str):
+        """
+        Mark a tenant's snapshot stale after a booking write
+
+        The next get_bookings read syncs with Quendoo instead of serving the
+        snapshot for the rest of the sync interval.
+        """
+        tenant = self._tenants.get(tenant_key(api_key))
+        if tenant is not None:
+            tenant.generation += 1
+            tenant.last_sync = None
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            "tenants": len(self._tenants),
+            "bookings": sum(len(t.bookings) for t in self._tenants.values()),
+            "syncs": self.syncs,
+            "local_reads": self.local_reads,
+            "invalidations": self.invalidations,
+            "sync_interval_seconds": self.sync_interval
+        }
+
+
+# Global store instance
+_booking_store: Optional[BookingStore] = None
+
+
+def get_booking_store() -> BookingStore:
+    """Get or create global BookingStore"""
+    global _booking_store
+    if _booking_store is None:
+        _booking_store = BookingStore(
+            sync_interval=settings.QUENDOO_BOOKINGS_SYNC_INTERVAL_SECONDS,
+            max_tenants=settings.QUENDOO_BOOKINGS_MAX_TENANTS
+        )
+    return _booking_store
@@ -0,0 +1,434 @@
+"""
+In-memory TTL/LRU cache for slow-changing Quendoo API reads
+
+Entries are keyed by tenant (hashed API key), endpoint and normalized query
+params. Each cacheable endpoint has its own TTL; the whole cache is bounded
+by an LRU size limit. Write endpoints invalidate all entries of their tenant.
+
+When Quendoo sends validators (ETag / Last-Modified), the body is kept for
+QUENDOO_CACHE_REVALIDATE_TTL_SECONDS after it expires so the next read can be
+a conditional GET - a 304 re-arms the entry without transferring the payload.
+
+ToolResultCache memoizes whole tool results (documents, Excel queries, web
+fetches) for tools declared with CachePolicy.MEMO in TOOL_SPECS.
+"""
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def tenant_key(api_key: str) -> str:
+    """
+    Derive a stable tenant key from a Quendoo API key
+
+    The raw key is never used as a dictionary key so it does not show up
+    in stats or debug output.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_params(params: Optional[Dict[str, Any]]) -> str:
+    """
+    Normalize query params into a canonical string
+
+    Drops the api_key and empty values and sorts keys, so that
+    {"names": "rooms", "api_lng": None} and {"names": "rooms"} share an entry.
+    """
+    cleaned = {
+        k: v for k, v in (params or {}).items()
+        if k != "api_key" and v is not None and v != ""
+    }
+    if not cleaned:
+        return ""
+    return json.dumps(cleaned, sort_keys=True, default=str)
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with per-entry expiry
+
+    Example usage:
+        cache = TTLCache(max_entries=100)
+        cache.set("key", {"data": 1}, ttl=60)
+        cache.get("key")  # {"data": 1} until 60s pass
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.max_entries = max_entries
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Get value if present and not expired (marks entry as recently used)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float):
+        """Store value for ttl seconds, evicting least recently used entries"""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Any) -> bool:
+        """Remove a single entry"""
+        return self._entries.pop(key, None) is not None
+
+    def delete_where(self, predicate) -> int:
+        """
+        Remove all entries whose key matches predicate
+
+        Returns:
+            Number of removed entries
+        """
+        keys = [k for k in self._entries if predicate(k)]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+
+    def keys(self) -> List[Any]:
+        """Keys of all entries (including expired ones not yet removed)"""
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class QuendooResponseCache:
+    """
+    Per-tenant cache for Quendoo GET responses
+
+    Only endpoints with a configured TTL are cached. Writes to endpoints in
+    INVALIDATING_ENDPOINTS drop every cached entry for the same tenant.
+    """
+
+    # Write endpoints that change cached property data
+    INVALIDATING_ENDPOINTS = {
+        "/Property/postExternalPropertyData",
+        "/Availability/updateAvailability",
+    }
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        endpoint_ttls: Optional[Dict[str, float]] = None,
+        revalidate_ttl: float = 86400.0
+    ):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: LRU size bound shared by all tenants
+            endpoint_ttls: endpoint -> TTL in seconds (defaults from settings)
+            revalidate_ttl: How long a body with validators is kept for conditional GETs
+        """
+        self._cache = TTLCache(max_entries=max_entries)
+        # key -> (etag, last_modified, body) - shares the body object with _cache
+        self._validators = TTLCache(max_entries=max_entries)
+        self.revalidate_ttl = revalidate_ttl
+        self.invalidations = 0
+        self.not_modified = 0
+
+        # endpoint -> TTL in seconds (almost-static property data)
+        self.endpoint_ttls = endpoint_ttls or {
+            "/Property/getPropertySettings": settings.QUENDOO_CACHE_TTL_PROPERTY_SETTINGS,
+            "/Property/getRoomsDetails": settings.QUENDOO_CACHE_TTL_ROOMS_DETAILS,
+        }
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        """Check whether endpoint responses are cached"""
+        return endpoint in self.endpoint_ttls
+
+    @staticmethod
+    def make_key(api_key: str, endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Build cache key (tenant, endpoint, normalized params)"""
+        return (tenant_key(api_key), endpoint, normalize_params(params))
+
+    def get(self, api_key: str, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Get cached response
+
+        Returns:
+            Deep copy of cached response, or None on miss
+        """
+        value = self._cache.get(self.make_key(api_key, endpoint, params))
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(
+        self,
+        api_key: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        value: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        Cache response using the endpoint's TTL
+
+        Args:
+            etag: ETag response header, if Quendoo sent one
+            last_modified: Last-Modified response header, if Quendoo sent one
+        """
+        ttl = self.endpoint_ttls.get(endpoint)
+        if not ttl:
+            return
+        key = self.make_key(api_key, endpoint, params)
+        stored = copy.deepcopy(value)
+        self._cache.set(key, stored, ttl)
+        if etag or last_modified:
+            self._validators.set(key, (etag, last_modified, stored), self.revalidate_ttl)
+
+    def conditional_headers(self, api_key: str, endpoint: str, params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Get If-None-Match / If-Modified-Since headers for a conditional GET
+
+        Returns:
+            Headers dict, empty if no validators are stored
+        """
+        if not self.is_cacheable(endpoint):
+            return {}
+        entry = self._validators.get(self.make_key(api_key, endpoint, params))
+        if entry is None:
+            return {}
+
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def revalidated(self, api_key: str, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Handle a 304 Not Modified: re-arm the cached body for another TTL
+
+        Returns:
+            Deep copy of the stored body, or None if it was dropped meanwhile
+        """
+        key = self.make_key(api_key, endpoint, params)
+        entry = self._validators.get(key)
+        if entry is None:
+            return None
+
+        etag, last_modified, stored = entry
+        self._cache.set(key, stored, self.endpoint_ttls[endpoint])
+        self._validators.set(key, entry, self.revalidate_ttl)
+        self.not_modified += 1
+        return copy.deepcopy(stored)
+
+    def invalidate_tenant(self, api_key: str) -> int:
+        """
+        Drop all cached responses for a tenant
+
+        Returns:
+            Number of removed entries
+        """
+        tenant = tenant_key(api_key)
+        removed = self._cache.delete_where(lambda key: key[0] == tenant)
+        self._validators.delete_where(lambda key: key[0] == tenant)
+        get_booking_module_cache().delete(tenant)
+        self.invalidations += 1
+        if removed:
+            print(f"[QuendooCache] Invalidated {removed} entries for tenant {tenant}")
+        return removed
+
+    def on_write(self, api_key: str, endpoint: str):
+        """Invalidate tenant entries if endpoint modifies cached data"""
+        if endpoint in self.INVALIDATING_ENDPOINTS:
+            self.invalidate_tenant(api_key)
+
+    def clear(self):
+        """Remove all entries"""
+        self._cache.clear()
+        self._validators.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        stats = self._cache.get_stats()
+        stats["invalidations"] = self.invalidations
+        stats["revalidation_entries"] = len(self._validators)
+        stats["not_modified"] = self.not_modified
+        stats["endpoint_ttls"] = dict(self.endpoint_ttls)
+        stats["booking_modules"] = get_booking_module_cache().get_stats()
+        return stats
+
+
+class ToolResultCache:
+    """
+    Memoized tool results, keyed by (tenant, hotelId, tool, canonical args)
+
+    Each tool declares its own TTL (ToolSpec.memo_ttl). Results are stored
+    and returned as deep copies, so callers may modify them freely.
+    """
+
+    # Arguments that do not change a tool's raw result
+    IGNORED_ARGS = {"hotelId", "result_offset"}
+
+    def __init__(self, max_entries: int = 500):
+        """
+        Args:
+            max_entries: LRU size bound shared by all tenants and tools
+        """
+        self._cache = TTLCache(max_entries=max_entries)
+        self.invalidations = 0
+        # tool name -> {"hits", "misses"}
+        self._tool_counts: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def make_key(cls, api_key: str, tool_name: str, tool_args: Optional[Dict[str, Any]]) -> Tuple[str, str, str, str]:
+        """Build cache key (tenant, hotelId, tool, normalized args)"""
+        args = tool_args or {}
+        cleaned = {k: v for k, v in args.items() if k not in cls.IGNORED_ARGS}
+        return (tenant_key(api_key), str(args.get("hotelId") or ""), tool_name, normalize_params(cleaned))
+
+    def get(self, key: Tuple[str, str, str, str]) -> Optional[Any]:
+        """Get a deep copy of a memoized result, or None on miss"""
+        value = self._cache.get(key)
+        counts = self._tool_counts.setdefault(key[2], {"hits": 0, "misses": 0})
+        counts["hits" if value is not None else "misses"] += 1
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key: Tuple[str, str, str, str], value: Any, ttl: float):
+        """Memoize a result for ttl seconds"""
+        self._cache.set(key, copy.deepcopy(value), ttl)
+
+    def purge(
+        self,
+        api_key: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        hotel_id: Optional[str] = None,
+        tenant: Optional[str] = None
+    ) -> int:
+        """
+        Drop memoized results matching all given filters (all entries if none given)
+
+        Args:
+            api_key: Tenant's Quendoo API key
+            tool_name: Tool name
+            hotel_id: hotelId argument
+            tenant: Tenant as tenant_key(api_key), for callers without the raw key
+
+        Returns:
+            Number of removed entries
+        """
+        if api_key:
+            tenant = tenant_key(api_key)
+        removed = self._cache.delete_where(
+            lambda key: (tenant is None or key[0] == tenant)
+            and (hotel_id is None or key[1] == str(hotel_id))
+            and (tool_name is None or key[2] == tool_name)
+        )
+        self.invalidations += 1
+        if removed:
+            print(f"[ToolMemo] Purged {removed} entries")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        stats = self._cache.get_stats()
+        stats["invalidations"] = self.invalidations
+        # Entries per tenant_key - the keys accepted by DELETE /admin/tools/cache
+        tenants: Dict[str, int] = {}
+        for key in self._cache.keys():
+            tenants[key[0]] = tenants.get(key[0], 0) + 1
+        stats["tenants"] = tenants
+        stats["tools"] = {name: dict(counts) for name, counts in self._tool_counts.items()}
+        return stats
+
+
+# Global cache instances
+_response_cache: Optional[QuendooResponseCache] = None
+_tool_result_cache: Optional[ToolResultCache] = None
+_booking_module_cache: Optional[TTLCache] = None
+_analysis_cache: Optional[TTLCache] = None
+
+
+def get_response_cache() -> QuendooResponseCache:
+    """Get or create global QuendooResponseCache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = QuendooResponseCache(
+            max_entries=settings.QUENDOO_CACHE_MAX_ENTRIES,
+            revalidate_ttl=settings.QUENDOO_CACHE_REVALIDATE_TTL_SECONDS
+        )
+    return _response_cache
+
+
+def get_booking_module_cache() -> TTLCache:
+    """
+    Get or create global cache of resolved booking module codes
+
+    Keyed by tenant_key(api_key); cleared together with the tenant's
+    response cache entries on property writes.
+    """
+    global _booking_module_cache
+    if _booking_module_cache is None:
+        _booking_module_cache = TTLCache(max_entries=settings.QUENDOO_CACHE_MAX_ENTRIES)
+    return _booking_module_cache
+
+
+def get_analysis_cache() -> TTLCache:
+    """
+    Get or create global cache of analyze_data results
+
+    Keyed by a content hash of (data, instruction, format, language).
+    """
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = TTLCache(max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES)
+    return _analysis_cache
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Get or create global ToolResultCache"""
+    global _tool_result_cache
+    if _tool_result_cache is None:
+        _tool_result_cache = ToolResultCache(max_entries=settings.TOOL_MEMO_MAX_ENTRIES)
+    return _tool_result_cache
@@ -1,8 +1,99 @@
 """
 Quendoo API HTTP client wrapper
 """
+import asyncio
 import httpx
-from typing import Dict, Any, Optional
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.http_clients import get_http_client
+from app.deadline import timeout_for, fits_in_deadline
+from app.config import get_settings
+from app.quendoo.cache import get_response_cache, get_booking_module_cache, tenant_key
+from app.quendoo.singleflight import get_single_flight
+from app.quendoo.governor import get_governors
+from app.quendoo.resilience import get_retry_policy, get_circuit_breakers, parse_retry_after
+from app.quendoo.streaming import stream_json_members, MemberCallback
+
+settings = get_settings()
+
+
+def split_date_range(date_from: str, date_to: str, window_days: int) -> List[Tuple[str, str]]:
+    """
+    Split an inclusive YYYY-MM-DD date range into consecutive windows
+
+    Args:
+        date_from: Start date (inclusive)
+        date_to: End date (inclusive)
+        window_days: Maximum number of days per window
+
+    Returns:
+        List of (window_from, window_to) tuples. A single tuple with the
+        original strings if the range is short or cannot be parsed.
+    """
+    try:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+    except (TypeError, ValueError):
+        return [(date_from, date_to)]
+
+    if window_days <= 0 or end < start or (end - start).days < window_days:
+        return [(date_from, date_to)]
+
+    windows = []
+    window_start = start
+    while window_start <= end:
+        window_end = min(window_start + timedelta(days=window_days - 1), end)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + timedelta(days=1)
+    return windows
+
+
+def chunk_availability_values(values: List[Dict[str, Any]], chunk_size: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split availability updates into chunks by room and date
+
+    Values are grouped per room (room_id or ext_room_id), ordered by date and
+    cut into chunks of at most chunk_size cells, so every chunk covers one room
+    and a contiguous slice of its dates.
+    """
+    by_room: Dict[str, List[Dict[str, Any]]] = {}
+    for value in values:
+        if "room_id" in value:
+            room_key = f"room:{value['room_id']}"
+        else:
+            room_key = f"ext:{value.get('ext_room_id')}"
+        by_room.setdefault(room_key, []).append(value)
+
+    chunk_size = max(1, chunk_size)
+    chunks = []
+    for room_values in by_room.values():
+        room_values.sort(key=lambda v: str(v.get("date", "")))
+        for i in range(0, len(room_values), chunk_size):
+            chunks.append(room_values[i:i + chunk_size])
+    return chunks
+
+
+def merge_availability(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-window getAvailability responses into one response
+
+    Input:  [{"data": {"44": {"2026-01-01": 3}}}, {"data": {"44": {"2026-02-01": 5}}}]
+    Output: {"data": {"44": {"2026-01-01": 3, "2026-02-01": 5}}}
+
+    A window response without a "data" map (e.g. an API error payload) is
+    returned as-is, same as a single upstream call would have done.
+    """
+    for result in results:
+        if not isinstance(result, dict) or not isinstance(result.get("data"), dict):
+            return result
+
+    merged = {k: v for k, v in results[0].items() if k != "data"}
+    merged_data: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for room_id, dates in result["data"].items():
+            merged_data.setdefault(room_id, {}).update(dates)
+    merged["data"] = merged_data
+    return merged
 
 
 class QuendooAPIClient:
@@ -12,7 +103,8 @@ class QuendooAPIClient:
     Handles authentication and request formatting for all Quendoo API endpoints
     """
 
-    BASE_URL = "https://www.platform.quendoo.com/api/pms/v1"
+    BASE_URL = settings.QUENDOO_API_BASE_URL
+    TIMEOUT_SECONDS = 60.0
 
     def __init__(self, api_key: str):
         """
@@ -47,25 +139,168 @@ class QuendooAPIClient:
 
         Raises:
             httpx.HTTPStatusError: If request fails
+            CircuitOpenError: If the endpoint's circuit breaker is open
+        """
+        cache = get_response_cache()
+        if method == "GET":
+            if cache.is_cacheable(endpoint):
+                cached = cache.get(self.api_key, endpoint, params)
+                if cached is not None:
+                    return cached
+
+            # Identical concurrent GETs for the same tenant share one upstream call
+            key = cache.make_key(self.api_key, endpoint, params)
+            return await get_single_flight().do(
+                key,
+                lambda: self._send(method, endpoint, params, json_data)
+            )
+
+        return await self._send(method, endpoint, params, json_data)
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        decode: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None
+    ) -> Any:
         """
+        Send request upstream and update the response cache
+
+        GETs are retried on transport errors and transient statuses with
+        jittered backoff, as long as the retry still fits in the caller's
+        deadline (app.deadline). Cacheable GETs with stored validators are sent as
+        conditional requests; a 304 reuses the stored body. Every attempt
+        waits for a slot from the tenant's governor (rate and concurrency
+        limit) and goes through the endpoint's circuit breaker, which raises
+        CircuitOpenError while Quendoo is degraded.
+
+        Args:
+            decode: Optional coroutine consuming the streamed response body.
+                    If omitted, the full body is read and parsed as JSON.
+        """
+        cache = get_response_cache()
+        policy = get_retry_policy()
+        breaker = get_circuit_breakers().get(endpoint)
+        governor = get_governors().get(self.api_key)
         url = f"{self.BASE_URL}{endpoint}"
 
         # Add API key to params (Quendoo uses query parameter authentication)
-        if params is None:
-            params = {}
+        params = dict(params) if params else {}
         params["api_key"] = self.api_key
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.request(
+        # Only idempotent GETs are retried
+        max_attempts = policy.max_attempts if method == "GET" else 1
+
+        # Shared keep-alive pool for the Quendoo host (do not close it here)
+        client = get_http_client(self.BASE_URL)
+
+        def build_request(conditional: bool) -> httpx.Request:
+            headers = dict(self.headers)
+            if conditional:
+                # Revalidate a stored body instead of downloading it again
+                headers.update(cache.conditional_headers(self.api_key, endpoint, params))
+            return client.build_request(
                 method=method,
                 url=url,
-                headers=self.headers,
+                headers=headers,
                 params=params,
-                json=json_data
+                json=json_data,
+                timeout=self.TIMEOUT_SECONDS
             )
 
-            response.raise_for_status()
-            return response.json()
+        request = build_request(conditional=method == "GET" and decode is None)
+        etag = last_modified = None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_delay = None
+
+            # Queue behind this tenant's rate/concurrency limits; retry sleeps happen outside the slot
+            async with governor.slot():
+                # Each attempt gets at most the caller's remaining budget
+                attempt_timeout = timeout_for(self.TIMEOUT_SECONDS, f"{method} {endpoint}")
+                request.extensions["timeout"] = httpx.Timeout(attempt_timeout).as_dict()
+                breaker.before_call()
+
+                try:
+                    # Body is streamed so large responses can be decoded incrementally
+                    response = await client.send(request, stream=True)
+                except httpx.TransportError as e:
+                    if isinstance(e, httpx.TimeoutException) and attempt_timeout < self.TIMEOUT_SECONDS:
+                        # Cut short by the caller's deadline, not a sign that Quendoo is unhealthy -
+                        # the breaker is shared by all tenants, so a short X-Tool-Timeout must not open it
+                        breaker.release()
+                    else:
+                        breaker.record_failure(f"{type(e).__name__}: {e}")
+                    retry_delay = policy.delay_for(attempt)
+                    if attempt >= max_attempts or not fits_in_deadline(retry_delay):
+                        raise
+                    print(f"[QuendooAPI] {method} {endpoint} failed ({type(e).__name__}), retry {attempt}/{max_attempts - 1} in {retry_delay:.2f}s")
+                    response = None
+                except BaseException:
+                    breaker.release()
+                    raise
+
+                if response is not None:
+                    try:
+                        if response.status_code >= 500:
+                            breaker.record_failure(f"HTTP {response.status_code}")
+                        else:
+                            breaker.record_success()
+
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        if response.status_code == 429:
+                            governor.on_throttled(retry_after)
+                        elif not response.is_error:
+                            governor.on_success()
+
+                        if method != "GET":
+                            # Writes may change cached property data for this tenant (even if they failed midway)
+                            cache.on_write(self.api_key, endpoint)
+
+                        if response.status_code == 304 and method == "GET":
+                            result = cache.revalidated(self.api_key, endpoint, params)
+                            if result is not None:
+                                print(f"[QuendooAPI] GET {endpoint} not modified (304), reusing cached body")
+                                return result
+                            # Stored body was dropped meanwhile - fetch it unconditionally
+                            request = build_request(conditional=False)
+                            retry_delay = 0.0
+
+                        elif policy.is_retryable_status(response.status_code) and attempt < max_attempts:
+                            retry_delay = policy.delay_for(attempt, retry_after)
+                            if retry_delay is not None and not fits_in_deadline(retry_delay):
+                                # No time left for another attempt - surface this response
+                                retry_delay = None
+                            if retry_delay is not None:
+                                print(f"[QuendooAPI] {method} {endpoint} returned {response.status_code}, retry {attempt}/{max_attempts - 1} in {retry_delay:.2f}s")
+
+                        if retry_delay is None:
+                            if response.is_error:
+                                await response.aread()
+                                response.raise_for_status()
+
+                            if decode is not None:
+                                return await decode(response)
+
+                            await response.aread()
+                            result = response.json()
+                            etag = response.headers.get("ETag")
+                            last_modified = response.headers.get("Last-Modified")
+                    finally:
+                        await response.aclose()
+
+            if retry_delay is not None:
+                await asyncio.sleep(retry_delay)
+                continue
+
+            if method == "GET":
+                cache.set(self.api_key, endpoint, params, result, etag=etag, last_modified=last_modified)
+
+            return result
 
     async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """GET request to Quendoo API"""
@@ -104,22 +339,184 @@ class QuendooAPIClient:
         return await self.get("/Property/getRoomsDetails", params=params)
 
     async def get_availability(self, date_from: str, date_to: str, sysres: str) -> Dict[str, Any]:
-        """Get availability for date range"""
-        params = {
-            "date_from": date_from,
-            "date_to": date_to,
-            "sysres": sysres
-        }
-        return await self.get("/Availability/getAvailability", params=params)
+        """
+        Get availability for date range
+
+        Wide ranges are split into QUENDOO_AVAILABILITY_WINDOW_DAYS windows that
+        are fetched concurrently (at most QUENDOO_AVAILABILITY_MAX_CONCURRENCY at
+        a time) and merged, so a 12-month view returns the same shape as one call.
+        """
+        windows = split_date_range(date_from, date_to, settings.QUENDOO_AVAILABILITY_WINDOW_DAYS)
+        semaphore = asyncio.Semaphore(settings.QUENDOO_AVAILABILITY_MAX_CONCURRENCY)
+
+        async def fetch_window(window_from: str, window_to: str) -> Dict[str, Any]:
+            params = {
+                "date_from": window_from,
+                "date_to": window_to,
+                "sysres": sysres
+            }
+            async with semaphore:
+                return await self.get("/Availability/getAvailability", params=params)
+
+        if len(windows) == 1:
+            return await fetch_window(*windows[0])
+
+        print(f"[QuendooAPI] getAvailability {date_from}..{date_to} split into {len(windows)} windows")
+        results = await asyncio.gather(*[fetch_window(*window) for window in windows])
+        return merge_availability(results)
+
+    async def stream_availability(
+        self,
+        date_from: str,
+        date_to: str,
+        sysres: str,
+        on_room: MemberCallback
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Stream availability for date range without materializing the raw body
+
+        Uses the same date windows as get_availability. on_room is called with
+        (room_id, {date: qty}) for every room of every window as it is decoded,
+        so a room may be delivered once per window.
+
+        Returns:
+            None on success, or the response payload of a window that carried
+            no "data" map (e.g. an API error), same as get_availability would return
+        """
+        windows = split_date_range(date_from, date_to, settings.QUENDOO_AVAILABILITY_WINDOW_DAYS)
+        semaphore = asyncio.Semaphore(settings.QUENDOO_AVAILABILITY_MAX_CONCURRENCY)
+
+        async def decode(response: httpx.Response) -> Optional[Dict[str, Any]]:
+            meta, found = await stream_json_members(response, "data", on_room)
+            return None if found else meta
+
+        async def fetch_window(window_from: str, window_to: str) -> Optional[Dict[str, Any]]:
+            params = {
+                "date_from": window_from,
+                "date_to": window_to,
+                "sysres": sysres
+            }
+            async with semaphore:
+                return await self._send("GET", "/Availability/getAvailability", params=params, decode=decode)
+
+        results = await asyncio.gather(*[fetch_window(*window) for window in windows])
+        return next((result for result in results if result is not None), None)
 
     async def update_availability(self, values: list) -> Dict[str, Any]:
         """Update availability values"""
         return await self.post("/Availability/updateAvailability", json_data={"values": values})
 
+    async def update_availability_bulk(
+        self,
+        values: list,
+        chunk_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Update availability in chunks with bounded concurrency
+
+        Each chunk is sent as its own updateAvailability call; a failed chunk
+        does not abort the others.
+
+        Args:
+            values: Availability updates (date, room_id or ext_room_id, avail)
+            chunk_size: Max cells per request (default QUENDOO_BULK_CHUNK_SIZE)
+            max_concurrency: Max requests in flight (default QUENDOO_BULK_MAX_CONCURRENCY)
+
+        Returns:
+            Per-chunk report plus "failed_values" that can be resubmitted as-is
+        """
+        chunks = chunk_availability_values(values, chunk_size or settings.QUENDOO_BULK_CHUNK_SIZE)
+        semaphore = asyncio.Semaphore(max_concurrency or settings.QUENDOO_BULK_MAX_CONCURRENCY)
+
+        async def send_chunk(index: int, chunk: List[Dict[str, Any]]) -> Dict[str, Any]:
+            first = chunk[0]
+            report = {
+                "index": index,
+                "room_id": first.get("room_id"),
+                "ext_room_id": first.get("ext_room_id"),
+                "date_from": chunk[0].get("date"),
+                "date_to": chunk[-1].get("date"),
+                "count": len(chunk),
+                "success": False,
+                "error": None
+            }
+            try:
+                async with semaphore:
+                    result = await self.update_availability(chunk)
+                if isinstance(result, dict) and result.get("error"):
+                    report["error"] = str(result["error"])
+                else:
+                    report["success"] = True
+            except Exception as e:
+                report["error"] = str(e)
+            return report
+
+        reports = await asyncio.gather(*[send_chunk(i, chunk) for i, chunk in enumerate(chunks)])
+
+        failed_values = []
+        for report, chunk in zip(reports, chunks):
+            if not report["success"]:
+                failed_values.extend(chunk)
+
+        failed = sum(1 for report in reports if not report["success"])
+        print(f"[QuendooAPI] Bulk updateAvailability: {len(values)} values in {len(chunks)} chunks, {failed} failed")
+
+        return {
+            "success": failed == 0,
+            "total_values": len(values),
+            "chunks_total": len(chunks),
+            "chunks_succeeded": len(chunks) - failed,
+            "chunks_failed": failed,
+            "chunks": list(reports),
+            "failed_values": failed_values
+        }
+
     async def get_bookings(self) -> Dict[str, Any]:
         """List all bookings"""
         return await self.get("/Booking/getBookings")
 
+    async def stream_bookings(self, on_booking: MemberCallback) -> Tuple[Dict[str, Any], bool]:
+        """
+        Stream bookings one record at a time
+
+        on_booking is called with (None, booking) for every booking as it is decoded.
+
+        Returns:
+            (other top-level keys of the response, True if a bookings list was found)
+        """
+        async def decode(response: httpx.Response) -> Tuple[Dict[str, Any], bool]:
+            return await stream_json_members(response, "data", on_booking)
+
+        return await self._send("GET", "/Booking/getBookings", decode=decode)
+
+    async def resolve_booking_module(self) -> Optional[str]:
+        """
+        Resolve the tenant's first active booking module code
+
+        Memoized per tenant for QUENDOO_CACHE_TTL_BOOKING_MODULE seconds so
+        offer searches do not pay a serial getPropertySettings round trip.
+
+        Returns:
+            Booking module code, or None if no module is active
+        """
+        modules_cache = get_booking_module_cache()
+        tenant = tenant_key(self.api_key)
+
+        bm_code = modules_cache.get(tenant)
+        if bm_code:
+            return bm_code
+
+        property_settings = await self.get_property_settings(names="booking_modules")
+        booking_modules = property_settings.get("data", {}).get("booking_modules", [])
+        active_modules = [m for m in booking_modules if m.get("is_active")]
+        if not active_modules:
+            return None
+
+        bm_code = active_modules[0]["code"]
+        modules_cache.set(tenant, bm_code, settings.QUENDOO_CACHE_TTL_BOOKING_MODULE)
+        return bm_code
+
     async def get_booking_offers(
         self,
         date_from: str,
@@ -132,12 +529,9 @@ class QuendooAPIClient:
         """Get booking offers"""
         # Auto-detect booking module if not provided
         if not bm_code:
-            settings = await self.get_property_settings(names="booking_modules")
-            booking_modules = settings.get("data", {}).get("booking_modules", [])
-            active_modules = [m for m in booking_modules if m.get("is_active")]
-            if not active_modules:
+            bm_code = await self.resolve_booking_module()
+            if not bm_code:
                 return {"error": "No active booking modules found. Please configure booking modules in Quendoo."}
-            bm_code = active_modules[0]["code"]
 
         params = {
             "bm_code": bm_code,
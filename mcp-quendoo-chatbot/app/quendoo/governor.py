@@ -0,0 +1,267 @@
+"""
+Per-tenant outbound governor for Quendoo API calls
+
+Every tenant (API key) gets a token bucket (request rate) and a semaphore
+(requests in flight). Calls over the limit wait in a queue instead of failing.
+A 429 halves the tenant's rate and honours Retry-After by pausing the bucket;
+successful calls restore the rate step by step (AIMD). Waiting in the queue
+counts against the tool call's deadline (app.deadline): a call whose deadline
+passes while queued gives up with DeadlineExceeded.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from app.config import get_settings
+from app.deadline import remaining, DeadlineExceeded
+from app.quendoo.cache import tenant_key
+
+settings = get_settings()
+
+
+class TenantGovernor:
+    """
+    Token bucket plus concurrency limit for a single tenant
+
+    Example usage:
+        governor = TenantGovernor(rate=50, burst=120, max_concurrency=16)
+        async with governor.slot():
+            response = await client.send(request)
+    """
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        burst: int = 120,
+        max_concurrency: int = 16,
+        min_rate: float = 0.5
+    ):
+        """
+        Initialize governor
+
+        Args:
+            rate: Sustained requests per second
+            burst: Bucket capacity (requests that may start back to back)
+            max_concurrency: Requests in flight at once
+            min_rate: Lower bound for the rate after repeated 429s
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Hands out tokens to slot holders in arrival order
+        self._token_lock = asyncio.Lock()
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.queued = 0
+        self.throttled = 0
+        self.deadline_expired = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float):
+        """Add tokens for time elapsed since the last refill"""
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def _take_token(self):
+        """Wait until a token is available (and any Retry-After pause is over)"""
+        while True:
+            now = time.monotonic()
+            if self.paused_until > now:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def _wait_for_slot(self):
+        """Wait for a concurrency slot, then a rate token"""
+        await self._semaphore.acquire()
+        try:
+            async with self._token_lock:
+                await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def acquire(self):
+        """
+        Wait for a concurrency slot and a rate token
+
+        Raises:
+            DeadlineExceeded: If the tool call's deadline passes while queued
+        """
+        self.waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.waiting)
+        started = time.monotonic()
+        try:
+            left = remaining()
+            if left is None:
+                await self._wait_for_slot()
+            else:
+                if left <= 0:
+                    raise DeadlineExceeded("queued Quendoo request")
+                try:
+                    await asyncio.wait_for(self._wait_for_slot(), timeout=left)
+                except asyncio.TimeoutError:
+                    self.deadline_expired += 1
+                    raise DeadlineExceeded("queued Quendoo request")
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.requests += 1
+        self.total_wait += waited
+        if waited >= 0.001:
+            self.queued += 1
+        self.in_flight += 1
+
+    def release(self):
+        """Release the concurrency slot"""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the duration of one upstream request"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """
+        Adapt to a 429 response
+
+        Halves the rate, empties the bucket and pauses until Retry-After.
+        """
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+        now = time.monotonic()
+        self.last_refill = now
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        print(f"[QuendooGovernor] Throttled by upstream, rate lowered to {self.rate:.2f} req/s"
+              + (f", paused {retry_after:.1f}s" if retry_after else ""))
+
+    def on_success(self):
+        """Step the rate back towards its configured value"""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue and rate metrics"""
+        paused_for = max(0.0, self.paused_until - time.monotonic())
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "rate_per_second": round(self.rate, 3),
+            "base_rate_per_second": self.base_rate,
+            "max_concurrency": self.max_concurrency,
+            "paused_seconds": round(paused_for, 1),
+            "requests": self.requests,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "deadline_expired": self.deadline_expired,
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 1) if self.requests else 0.0
+        }
+
+
+class GovernorRegistry:
+    """
+    Per-tenant governors keyed by hashed API key
+
+    Bounded to max_tenants: least recently used governors with nothing queued
+    or in flight are evicted (a returning tenant starts with a fresh bucket).
+    When every governor is busy the registry grows past the bound until some
+    become idle.
+    """
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        burst: int = 120,
+        max_concurrency: int = 16,
+        min_rate: float = 0.5,
+        max_tenants: int = 1000
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_tenants = max(1, max_tenants)
+        self._governors: "OrderedDict[str, TenantGovernor]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, api_key: str) -> TenantGovernor:
+        """Get or create governor for a tenant (marks it as recently used)"""
+        key = tenant_key(api_key)
+        governor = self._governors.get(key)
+        if governor is None:
+            # Make room before inserting, so the new governor is never the one evicted
+            self._evict(reserve=1)
+            governor = TenantGovernor(self.rate, self.burst, self.max_concurrency, self.min_rate)
+            self._governors[key] = governor
+        else:
+            self._governors.move_to_end(key)
+        return governor
+
+    def _evict(self, reserve: int = 0):
+        """Drop least recently used idle governors so that reserve more fit in max_tenants"""
+        excess = len(self._governors) + reserve - self.max_tenants
+        if excess <= 0:
+            return
+        idle = [
+            key for key, governor in self._governors.items()
+            if not governor.waiting and not governor.in_flight
+        ][:excess]
+        for key in idle:
+            del self._governors[key]
+        self.evictions += len(idle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-tenant metrics plus totals"""
+        tenants = {key: governor.get_stats() for key, governor in self._governors.items()}
+        return {
+            "tenants": tenants,
+            "queue_depth": sum(t["queue_depth"] for t in tenants.values()),
+            "in_flight": sum(t["in_flight"] for t in tenants.values()),
+            "throttled": sum(t["throttled"] for t in tenants.values()),
+            "max_tenants": self.max_tenants,
+            "evictions": self.evictions
+        }
+
+
+# Global registry
+_governors: Optional[GovernorRegistry] = None
+
+
+def get_governors() -> GovernorRegistry:
+    """Get or create global GovernorRegistry"""
+    global _governors
+    if _governors is None:
+        _governors = GovernorRegistry(
+            rate=settings.QUENDOO_TENANT_RATE_PER_SECOND,
+            burst=settings.QUENDOO_TENANT_BURST,
+            max_concurrency=settings.QUENDOO_TENANT_MAX_CONCURRENCY,
+            min_rate=settings.QUENDOO_TENANT_MIN_RATE_PER_SECOND,
+            max_tenants=settings.QUENDOO_GOVERNOR_MAX_TENANTS
+        )
+    return _governors
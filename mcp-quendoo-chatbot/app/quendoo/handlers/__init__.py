@@ -0,0 +1,8 @@
+"""
+Tool handlers
+
+Each handler has the signature handler(client: QuendooAPIClient, tool_args)
+and is referenced from TOOL_SPECS in app/quendoo/tools.py. Modules are
+imported by the tool registry on warmup or first use - do not import them
+eagerly from here.
+"""
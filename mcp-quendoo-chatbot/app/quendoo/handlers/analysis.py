@@ -0,0 +1,280 @@
+"""
+Data analysis tool handler (analyze_data via Anthropic)
+
+Imports the Anthropic SDK and Secret Manager client - loaded by the tool
+registry on warmup, never inside a request on the event loop.
+
+Results are cached by a hash of (data, instruction, format, language), and
+identical concurrent calls share one model request. Calls carrying a
+structured "query" skip the model and run on the local query engine.
+"""
+from typing import Dict, Any, List
+import asyncio
+import hashlib
+import json
+from app.config import get_settings
+from app.deadline import remaining, timeout_for
+from app.quendoo.client import QuendooAPIClient
+from app.quendoo.tools import markdown_table_to_html
+from app.quendoo.cache import get_analysis_cache
+from app.quendoo.singleflight import get_single_flight
+from app.quendoo.handlers.query import run_local_query
+from app.services.anthropic_service import get_anthropic_service
+
+settings = get_settings()
+
+ANALYSIS_MODEL = "claude-3-5-haiku-20241022"
+
+
+def analysis_cache_key(data: str, instruction: str, output_format: str, language: str) -> str:
+    """Content hash identifying an analysis request"""
+    payload = json.dumps([ANALYSIS_MODEL, data, instruction, output_format, language], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def analyze_data(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Use Claude via direct Anthropic API to analyze data with specific instructions
+    data = tool_args.get("data", "")
+    instruction = tool_args.get("instruction", "")
+    output_format = tool_args.get("format", "text")
+    language = tool_args.get("language", "bulgarian")
+
+    # Structured queries are answered exactly by the local engine - no model call
+    if isinstance(tool_args.get("query"), dict):
+        return run_local_query(data, tool_args["query"], output_format)
+
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False, default=str)
+
+    key = analysis_cache_key(data, instruction, output_format, language)
+    cache = get_analysis_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    result = await get_single_flight().do(
+        ("analyze_data", key),
+        lambda: run_analysis(data, instruction, output_format, language)
+    )
+    # Only successful analyses are cached - failures are retried on the next call
+    if result.get("success") and settings.ANALYSIS_CACHE_TTL_SECONDS > 0:
+        cache.set(key, dict(result), settings.ANALYSIS_CACHE_TTL_SECONDS)
+    return result
+
+
+FORMAT_INSTRUCTIONS = {
+    "text": "Return the result as clear, human-readable text summary.",
+    "json": "Return the result as valid JSON only, without any markdown formatting or explanation.",
+    "table": "Return the result as a markdown table.",
+    "list": "Return the result as a bulleted markdown list."
+}
+
+# Language instructions
+LANGUAGE_INSTRUCTIONS = {
+    "bulgarian": "IMPORTANT: Respond ONLY in Bulgarian language. Use Bulgarian characters (а, б, в, г, д, е, ж, з, и, й, к, л, м, н, о, п, р, с, т, у, ф, х, ц, ч, ш, щ, ъ, ь, ю, я).",
+    "english": "Respond in English language."
+}
+
+
+def output_instructions(output_format: str, language: str) -> str:
+    """OUTPUT FORMAT / LANGUAGE prompt sections"""
+    # For html_table, we'll first generate markdown table then convert to HTML
+    actual_format = "table" if output_format == "html_table" else output_format
+    return f"""OUTPUT FORMAT:
+{FORMAT_INSTRUCTIONS.get(actual_format, FORMAT_INSTRUCTIONS["text"])}
+
+LANGUAGE:
+{LANGUAGE_INSTRUCTIONS.get(language, LANGUAGE_INSTRUCTIONS["bulgarian"])}"""
+
+
+def split_records(data: str, chunk_chars: int) -> List[str]:
+    """
+    Split data into chunks of at most ~chunk_chars without cutting a record
+
+    JSON input is split on array items - the top-level array, or the largest
+    array/object inside a top-level object (e.g. "data" of get_bookings, with
+    the remaining keys repeated in every chunk as context). Other input is
+    split on lines, repeating the first line (CSV / table header).
+    Context or a header longer than half a chunk is not repeated.
+    A single record larger than chunk_chars becomes its own chunk.
+    """
+    try:
+        parsed = json.loads(data)
+    except ValueError:
+        parsed = None
+
+    if isinstance(parsed, (list, dict)):
+        context: Dict[str, Any] = {}
+        records: List[Any] = []
+        field = None
+        if isinstance(parsed, list):
+            records = parsed
+        else:
+            containers = {k: v for k, v in parsed.items() if isinstance(v, (list, dict))}
+            if containers:
+                field = max(containers, key=lambda k: len(containers[k]))
+                value = parsed[field]
+                # Objects such as availability {"room_id": {...}} split on their members
+                records = value if isinstance(value, list) else [{k: v} for k, v in value.items()]
+                context = {k: v for k, v in parsed.items() if k != field}
+
+        if len(records) > 1:
+            prefix = json.dumps(context, ensure_ascii=False, default=str) + "\n" if context else ""
+            if len(prefix) > chunk_chars // 2:
+                prefix = ""
+            serialized = [json.dumps(r, ensure_ascii=False, default=str) for r in records]
+            return _pack(serialized, chunk_chars - len(prefix), lambda part: prefix + "[" + ",\n".join(part) + "]")
+
+    lines = data.splitlines()
+    if len(lines) <= 1:
+        return [data[i:i + chunk_chars] for i in range(0, len(data), chunk_chars)] or [data]
+    header, body = lines[0], lines[1:]
+    if len(header) > chunk_chars // 2:
+        return _pack(lines, chunk_chars, lambda part: "\n".join(part))
+    return _pack(body, chunk_chars - len(header) - 1, lambda part: header + "\n" + "\n".join(part))
+
+
+def _pack(records: List[str], limit: int, render) -> List[str]:
+    """Greedily group serialized records into chunks of at most limit chars"""
+    chunks, current, size = [], [], 0
+    for record in records:
+        if current and size + len(record) + 2 > limit:
+            chunks.append(render(current))
+            current, size = [], 0
+        current.append(record)
+        size += len(record) + 2
+    if current:
+        chunks.append(render(current))
+    return chunks
+
+
+def chunk_limit() -> int:
+    """
+    Number of chunks that can be analyzed before the deadline
+
+    Map calls run in waves of ANALYSIS_MAP_CONCURRENCY, each taking about
+    ANALYSIS_CALL_SECONDS; one call is reserved for the final merge.
+    Capped by ANALYSIS_MAX_CHUNKS.
+    """
+    left = remaining()
+    if left is None:
+        return settings.ANALYSIS_MAX_CHUNKS
+    waves = int((left - settings.ANALYSIS_CALL_SECONDS) // settings.ANALYSIS_CALL_SECONDS)
+    return max(0, min(settings.ANALYSIS_MAX_CHUNKS, waves * settings.ANALYSIS_MAP_CONCURRENCY))
+
+
+async def run_analysis(data: str, instruction: str, output_format: str, language: str) -> Dict[str, Any]:
+    """Ask the model to analyze data (no caching)"""
+    try:
+        if len(data) > settings.ANALYSIS_CHUNK_CHARS:
+            # Too large for one prompt - analyze chunks and merge (map-reduce)
+            chunks = split_records(data, settings.ANALYSIS_CHUNK_CHARS)
+            max_chunks = chunk_limit()
+            if len(chunks) > max_chunks:
+                return {
+                    "success": False,
+                    "error": f"Data too large to analyze ({len(data)} chars, {len(chunks)} chunks, "
+                             f"maximum is {max_chunks} within the time budget). Narrow the date range or filter the data first."
+                }
+            result = await map_reduce(chunks, instruction, output_format, language)
+            extra = {"mode": "map_reduce", "chunks": len(chunks)}
+        else:
+            result = await complete(f"""You are a data analyst. Analyze the following data according to the instruction.
+
+DATA:
+{data}
+
+INSTRUCTION:
+{instruction}
+
+{output_instructions(output_format, language)}
+
+Provide only the requested output without any additional explanation or preamble.""")
+            extra = {}
+
+        # Convert markdown table to HTML if html_table format requested
+        if output_format == "html_table":
+            result = markdown_table_to_html(result)
+
+        return {
+            "success": True,
+            "analysis": result,
+            "format": output_format,
+            **extra
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Analysis failed: {str(e)}"
+        }
+
+
+async def complete(prompt: str) -> str:
+    """Single model call"""
+    # Shared async client with a cached API key - waiting for the model never blocks the loop
+    return await get_anthropic_service().complete(prompt, model=ANALYSIS_MODEL, max_tokens=4096, timeout=timeout_for(600.0, "analysis"))
+
+
+async def map_reduce(chunks: List[str], instruction: str, output_format: str, language: str) -> str:
+    """
+    Analyze chunks concurrently (bounded), then merge the partial results
+
+    Map outputs are intermediate notes in English with the exact counts and
+    sums needed to combine them; only the reduce step applies the requested
+    format and language. If the partials are still too large for one prompt,
+    they are merged in rounds.
+    """
+    semaphore = asyncio.Semaphore(settings.ANALYSIS_MAP_CONCURRENCY)
+    total = len(chunks)
+    print(f"[analyze_data] Map-reduce over {total} chunks (concurrency {settings.ANALYSIS_MAP_CONCURRENCY})")
+
+    async def analyze_chunk(index: int, chunk: str) -> str:
+        async with semaphore:
+            return await complete(f"""You are a data analyst. The data below is part {index + 1} of {total} of a larger dataset that was split on record boundaries.
+Analyze ONLY this part according to the instruction. Your output will be merged with the results of the other parts, so:
+- report exact counts, sums, minimums/maximums and the matching records or dates instead of percentages or averages
+  (give numerator and denominator where an average or ratio is needed)
+- do not guess about data outside this part
+- be concise, plain English, no preamble
+
+DATA (part {index + 1} of {total}):
+{chunk}
+
+INSTRUCTION:
+{instruction}""")
+
+    partials = await asyncio.gather(*(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+
+    # Merge in rounds while the partial results do not fit one prompt
+    while sum(len(p) for p in partials) > settings.ANALYSIS_CHUNK_CHARS and len(partials) > 1:
+        groups = _pack(list(partials), settings.ANALYSIS_CHUNK_CHARS, lambda part: "\n\n---\n\n".join(part))
+        if len(groups) >= len(partials):
+            break
+
+        async def merge(group: str) -> str:
+            async with semaphore:
+                return await complete(f"""Merge these partial analysis results of parts of one dataset into a single partial result.
+Keep exact counts, sums, minimums/maximums and matching records; add up values that belong together. Be concise, plain English.
+
+PARTIAL RESULTS:
+{group}
+
+INSTRUCTION:
+{instruction}""")
+
+        partials = await asyncio.gather(*(merge(group) for group in groups))
+
+    numbered = "\n\n".join(f"PART {i + 1}:\n{p}" for i, p in enumerate(partials))
+    return await complete(f"""You are a data analyst. A large dataset was split into parts and each part was analyzed separately.
+Combine the partial results below into the final answer to the instruction, as if the whole dataset had been analyzed at once.
+Add up counts and sums, recompute averages and ratios from their totals, and merge rankings across parts.
+
+PARTIAL RESULTS:
+{numbered}
+
+INSTRUCTION:
+{instruction}
+
+{output_instructions(output_format, language)}
+
+Provide only the requested output without any additional explanation or preamble.""")
@@ -0,0 +1,62 @@
+"""
+Document tool handlers (RAG search, document listing, Excel queries)
+
+Firebase and Vertex AI clients are created by the document service on
+first use or on app startup warmup, not when this module is imported.
+"""
+from typing import Dict, Any
+from app.quendoo.client import QuendooAPIClient
+from app.services.document_service import (
+    search_hotel_documents as search_documents,
+    list_hotel_documents as list_documents,
+    query_excel_structured
+)
+
+
+async def search_hotel_documents(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Get hotelId from tool arguments (sent by backend from JWT token)
+    hotel_id = tool_args.get("hotelId")
+    if not hotel_id:
+        return {
+            "success": False,
+            "error": "hotelId parameter is required for document search"
+        }
+
+    return await search_documents(
+        hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
+        query=tool_args["query"],
+        document_types=tool_args.get("documentTypes"),
+        top_k=tool_args.get("topK", 3)
+    )
+
+
+async def list_hotel_documents(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Get hotelId from tool arguments (sent by backend from JWT token)
+    hotel_id = tool_args.get("hotelId")
+    if not hotel_id:
+        return {
+            "success": False,
+            "error": "hotelId parameter is required for listing documents"
+        }
+
+    return await list_documents(
+        hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
+        document_types=tool_args.get("documentTypes")
+    )
+
+
+async def query_excel_data(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Get hotelId from tool arguments (sent by backend from JWT token)
+    hotel_id = tool_args.get("hotelId")
+    if not hotel_id:
+        return {
+            "success": False,
+            "error": "hotelId parameter is required for Excel queries"
+        }
+
+    return await query_excel_structured(
+        hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
+        query=tool_args["query"],
+        file_name=tool_args.get("fileName"),
+        limit=tool_args.get("limit", 10)
+    )
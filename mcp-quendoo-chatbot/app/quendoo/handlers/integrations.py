@@ -0,0 +1,37 @@
+"""
+Integration tool handlers (voice calls, email, web fetch)
+"""
+from typing import Dict, Any
+from app.quendoo.client import QuendooAPIClient
+from app.quendoo.tools import AutomationClient, EmailClient, get_web_fetch_service
+
+
+async def make_call(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    automation_client = AutomationClient()
+    result = await automation_client.make_call(
+        phone=tool_args["phone"],
+        message=tool_args["message"],
+        language=tool_args.get("language", "en-US")
+    )
+    return {"success": True, "result": result}
+
+
+async def send_quendoo_email(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    email_client = EmailClient()
+    result = await email_client.send_email(
+        to=tool_args["to"],
+        subject=tool_args["subject"],
+        message=tool_args["message"],
+        html=tool_args.get("html", False)  # Default to plain text if not specified
+    )
+    return {"success": True, "result": result}
+
+
+async def fetch_url(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    web_fetch = get_web_fetch_service()
+    return await web_fetch.fetch_url(
+        url=tool_args["url"],
+        format=tool_args.get("format", "html"),
+        timeout=tool_args.get("timeout", 10),
+        api_key=client.api_key  # For rate limiting per hotel
+    )
@@ -0,0 +1,57 @@
+"""
+Pipeline tool handler (run_tool_pipeline)
+
+Runs each step through the tool registry with the same client, so
+intermediate results stay in the process.
+"""
+import asyncio
+from typing import Dict, Any
+from app.config import get_settings
+from app.quendoo.client import QuendooAPIClient
+from app.quendoo.tools import get_tool_registry, get_tool_timeout
+from app.quendoo.pipeline import run_pipeline, PipelineError
+from app.deadline import deadline_scope, remaining, DeadlineExceeded
+
+settings = get_settings()
+
+# Arguments the backend injects per request; passed on to every step
+SHARED_ARGS = ("hotelId",)
+
+
+async def run_tool_pipeline(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    registry = get_tool_registry()
+
+    async def run_step(tool_name: str, step_args: Dict[str, Any]) -> Dict[str, Any]:
+        if tool_name == "run_tool_pipeline":
+            return {"success": False, "error": "Pipelines cannot be nested"}
+
+        budget = get_tool_timeout(tool_name)
+        try:
+            # Step budget, capped by what is left of the pipeline's deadline
+            with deadline_scope(budget):
+                result = await asyncio.wait_for(
+                    registry.dispatch(tool_name, client, step_args),
+                    timeout=remaining()
+                )
+            return {"success": True, "result": result}
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            return {
+                "success": False,
+                "error": f"Tool {tool_name} did not complete within its deadline",
+                "timed_out": True
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    try:
+        return await run_pipeline(
+            tool_args["steps"],
+            run_step,
+            param_type=registry.get_param_type,
+            outputs=tool_args.get("outputs"),
+            shared_args={name: tool_args[name] for name in SHARED_ARGS if name in tool_args},
+            max_steps=settings.TOOL_PIPELINE_MAX_STEPS,
+            max_concurrency=settings.TOOL_BATCH_MAX_CONCURRENCY
+        )
+    except PipelineError as e:
+        return {"success": False, "error": f"Invalid pipeline: {e}"}
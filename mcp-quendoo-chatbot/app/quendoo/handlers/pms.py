@@ -0,0 +1,231 @@
+"""
+Quendoo PMS tool handlers (property, availability, bookings, offers)
+"""
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+from app.quendoo.client import QuendooAPIClient
+from app.quendoo.booking_store import get_booking_store
+from app.quendoo.offer_scan import scan_booking_offers as run_offer_scan
+from app.quendoo.cache import get_response_cache
+from app.quendoo.singleflight import get_single_flight
+
+
+async def build_availability_rows(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch availability and transform it to the frontend-friendly row format
+
+    The upstream body is decoded as a stream and rows are built room by room,
+    so neither the raw body nor the full upstream object graph is kept.
+
+    Input:  {"data": {"44": {"2026-02-01": 10, "2026-02-02": 10, ...}, "45": {...}}}
+    Output: {"availability": [{"room_id": 44, "date": "2026-02-01", "qty": 10, "is_opened": true}, ...]}
+    """
+    availability_list = []
+
+    def on_room(room_id_str: str, dates_dict: Dict[str, Any]):
+        room_id = int(room_id_str)
+        for date_str, qty in dates_dict.items():
+            availability_list.append({
+                "room_id": room_id,
+                "room_name": f"Room {room_id}",  # Will be enriched by frontend if needed
+                "date": date_str,
+                "qty": qty,
+                "is_opened": True
+            })
+
+    error_payload = await client.stream_availability(
+        date_from=tool_args["date_from"],
+        date_to=tool_args["date_to"],
+        sysres=tool_args["sysres"],
+        on_room=on_room
+    )
+    if error_payload is not None:
+        return error_payload
+
+    # Sort by room_id and date
+    availability_list.sort(key=lambda x: (x["room_id"], x["date"]))
+
+    return {
+        "date_from": tool_args["date_from"],
+        "date_to": tool_args["date_to"],
+        "availability": availability_list
+    }
+
+
+def date_axis(date_from: str, date_to: str) -> List[str]:
+    """Every YYYY-MM-DD date of an inclusive range (empty if it cannot be parsed)"""
+    try:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+    except (TypeError, ValueError):
+        return []
+    return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+
+async def build_availability_columns(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch availability in columnar form: one shared date axis and a dense
+    qty array per room (null where the API returned no value)
+
+    Cells are written straight into preallocated lists - no per-cell dicts.
+
+    Input:  {"data": {"44": {"2026-02-01": 10, "2026-02-02": 9}, "45": {...}}}
+    Output: {"format": "columnar", "dates": ["2026-02-01", "2026-02-02"],
+             "room_ids": [44, 45], "qty": [[10, 9], [3, 4]]}
+    """
+    dates = date_axis(tool_args["date_from"], tool_args["date_to"])
+    date_index = {date_str: index for index, date_str in enumerate(dates)}
+    rows: Dict[int, List[Optional[int]]] = {}
+
+    def on_room(room_id_str: str, dates_dict: Dict[str, Any]):
+        room_id = int(room_id_str)
+        row = rows.get(room_id)
+        if row is None:
+            row = rows[room_id] = [None] * len(dates)
+        for date_str, qty in dates_dict.items():
+            index = date_index.get(date_str)
+            if index is None:
+                # Date outside the requested range - grow the axis
+                index = date_index[date_str] = len(dates)
+                dates.append(date_str)
+            if index >= len(row):
+                row.extend([None] * (len(dates) - len(row)))
+            row[index] = qty
+
+    error_payload = await client.stream_availability(
+        date_from=tool_args["date_from"],
+        date_to=tool_args["date_to"],
+        sysres=tool_args["sysres"],
+        on_room=on_room
+    )
+    if error_payload is not None:
+        return error_payload
+
+    room_ids = sorted(rows)
+    qty = []
+    for room_id in room_ids:
+        row = rows[room_id]
+        row.extend([None] * (len(dates) - len(row)))
+        qty.append(row)
+
+    # Only needed when the API returned dates outside the requested range
+    order = sorted(range(len(dates)), key=dates.__getitem__)
+    if order != list(range(len(dates))):
+        dates = [dates[i] for i in order]
+        qty = [[row[i] for i in order] for row in qty]
+
+    return {
+        "date_from": tool_args["date_from"],
+        "date_to": tool_args["date_to"],
+        "format": "columnar",
+        "dates": dates,
+        "room_ids": room_ids,
+        "qty": qty
+    }
+
+
+async def get_property_settings(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    return await client.get_property_settings(
+        api_lng=tool_args.get("api_lng"),
+        names=tool_args.get("names")
+    )
+
+
+async def get_rooms_details(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    return await client.get_rooms_details(
+        api_lng=tool_args.get("api_lng"),
+        room_id=tool_args.get("room_id")
+    )
+
+
+async def get_availability(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    columnar = tool_args.get("format") == "columnar"
+    build = build_availability_columns if columnar else build_availability_rows
+
+    # Identical concurrent requests for the same tenant share one streamed build
+    key = get_response_cache().make_key(client.api_key, f"get_availability:{'columns' if columnar else 'rows'}", {
+        "date_from": tool_args["date_from"],
+        "date_to": tool_args["date_to"],
+        "sysres": tool_args["sysres"]
+    })
+    return await get_single_flight().do(
+        key,
+        lambda: build(client, tool_args)
+    )
+
+
+async def update_availability(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    if tool_args.get("bulk"):
+        return await client.update_availability_bulk(
+            values=tool_args["values"],
+            chunk_size=tool_args.get("chunk_size")
+        )
+
+    return await client.update_availability(
+        values=tool_args["values"]
+    )
+
+
+async def get_bookings(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Served from the local per-tenant store, synced incrementally by revision
+    result = await get_booking_store().get_bookings(
+        client,
+        refresh=tool_args.get("refresh", False)
+    )
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        print(f"[get_bookings] Returning {len(result['data'])} bookings")
+    return result
+
+
+async def get_booking_offers(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    return await client.get_booking_offers(
+        date_from=tool_args["date_from"],
+        nights=tool_args["nights"],
+        bm_code=tool_args.get("bm_code"),
+        api_lng=tool_args.get("api_lng"),
+        guests=tool_args.get("guests"),
+        currency=tool_args.get("currency")
+    )
+
+
+async def scan_booking_offers(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    nights = tool_args["nights"]
+    return await run_offer_scan(
+        client,
+        date_from=tool_args["date_from"],
+        date_to=tool_args.get("date_to"),
+        step_days=tool_args.get("step_days", 1),
+        nights=nights if isinstance(nights, list) else [nights],
+        occupancies=tool_args["occupancies"],
+        bm_code=tool_args.get("bm_code"),
+        api_lng=tool_args.get("api_lng"),
+        currency=tool_args.get("currency"),
+        top_n=tool_args.get("top_n", 10)
+    )
+
+
+async def ack_booking(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await client.ack_booking(
+            booking_id=tool_args["booking_id"],
+            revision_id=tool_args["revision_id"]
+        )
+    finally:
+        # Acked bookings leave getBookings - next read resyncs (even a failed write may have applied)
+        get_booking_store().invalidate(client.api_key)
+
+
+async def post_room_assignment(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await client.post_room_assignment(
+            booking_id=tool_args["booking_id"],
+            revision_id=tool_args["revision_id"]
+        )
+    finally:
+        get_booking_store().invalidate(client.api_key)
+
+
+async def post_external_property_data(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    return await client.post_external_property_data(
+        data=tool_args["data"]
+    )
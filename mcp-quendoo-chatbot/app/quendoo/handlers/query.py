@@ -0,0 +1,43 @@
+"""
+Local query tool handler (query_data)
+
+Filter / group-by / aggregate / top-k over tool results with the
+deterministic query engine - no model call, no token cost.
+"""
+import time
+from typing import Dict, Any
+from app.quendoo.client import QuendooAPIClient
+from app.quendoo.tools import markdown_table_to_html
+from app.quendoo.query_engine import run_query, format_rows, QueryError
+
+# Query arguments passed through to run_query
+QUERY_FIELDS = ("filter", "group_by", "aggregates", "select", "sort", "limit", "records_path")
+
+
+def run_local_query(data: Any, query: Dict[str, Any], output_format: str = "json") -> Dict[str, Any]:
+    """
+    Run a structured query and render it like analyze_data does
+
+    Returns:
+        run_query result plus "analysis" (rendered rows) unless format is json
+    """
+    started = time.perf_counter()
+    try:
+        result = run_query(data, **{name: query[name] for name in QUERY_FIELDS if query.get(name) is not None})
+    except QueryError as e:
+        return {"success": False, "error": f"Invalid query: {e}"}
+    except (TypeError, ValueError, AttributeError, KeyError) as e:
+        # Wrongly typed query parts (e.g. a filter that is not a list of objects)
+        return {"success": False, "error": f"Invalid query: {type(e).__name__}: {e}"}
+
+    if output_format != "json":
+        rendered = format_rows(result["rows"], output_format)
+        result["analysis"] = markdown_table_to_html(rendered) if output_format == "html_table" else rendered
+    result["format"] = output_format
+    result["mode"] = "local"
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def query_data(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    return run_local_query(tool_args.get("data"), tool_args, tool_args.get("format", "json"))
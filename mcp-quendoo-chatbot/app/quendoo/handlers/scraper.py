@@ -0,0 +1,455 @@
+"""
+Competitor price scraping tool handlers (Booking.com via Cloud Function)
+
+Everything runs on the event loop without blocking it: Firestore through the
+async client, Cloud Function triggers through the pooled async HTTP client,
+and the stagger between batch triggers through a background task - so a
+scrape never stalls other tenants' calls.
+"""
+from typing import Dict, Any, List
+import asyncio
+import contextvars
+import hashlib
+import os
+import time
+from datetime import datetime
+from uuid import uuid4
+from google.cloud import firestore
+from app.quendoo.client import QuendooAPIClient
+from app.http_clients import get_http_client
+from app.deadline import timeout_for
+
+# Upper bound for Firestore calls (capped further by the tool call's deadline)
+FIRESTORE_TIMEOUT_SECONDS = 10.0
+
+# Delay between batch Cloud Function triggers to avoid Booking.com rate limits
+TRIGGER_STAGGER_SECONDS = 2.0
+
+_db = None
+_db_lock = asyncio.Lock()
+
+# Strong references to fire-and-forget trigger tasks until they finish
+_background_tasks = set()
+
+
+async def get_firestore() -> firestore.AsyncClient:
+    """Get the shared async Firestore client (created off the event loop on first use)"""
+    global _db
+    if _db is None:
+        async with _db_lock:
+            if _db is None:
+                # Resolving credentials can block - do it in a worker thread
+                _db = await asyncio.to_thread(firestore.AsyncClient)
+    return _db
+
+
+def firestore_timeout(what: str) -> float:
+    """Timeout for a Firestore call within the tool call's deadline"""
+    return timeout_for(FIRESTORE_TIMEOUT_SECONDS, what)
+
+
+def cloud_function_url() -> str:
+    return os.getenv(
+        "SCRAPER_CLOUD_FUNCTION_URL",
+        "https://us-central1-quendoo-ai-dashboard.cloudfunctions.net/scrapeBooking"
+    )
+
+
+def run_in_background(coro):
+    """
+    Start a fire-and-forget task that outlives the tool call
+
+    The task gets a fresh context, so the tool call's deadline does not
+    cancel it once the call has returned.
+    """
+    task = asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def trigger_cloud_function(payload: Dict[str, Any], timeout: float, label: str):
+    """POST a scrape job to the Cloud Function; errors are logged, not raised"""
+    url = cloud_function_url()
+    try:
+        response = await get_http_client(url).post(url, json=payload, timeout=timeout)
+        print(f"[{label}] Triggered Cloud Function for {payload['url']}: {response.status_code}")
+    except Exception as e:
+        print(f"[{label}] Error triggering Cloud Function for {payload['url']}: {e}")
+
+
+async def trigger_staggered(payloads: List[Dict[str, Any]], label: str):
+    """Start Cloud Function triggers TRIGGER_STAGGER_SECONDS apart without waiting for them"""
+    for idx, payload in enumerate(payloads):
+        if idx > 0:
+            await asyncio.sleep(TRIGGER_STAGGER_SECONDS)
+        # Cloud Function needs 30-60s to complete
+        run_in_background(trigger_cloud_function(payload, 90.0, label))
+        print(f"[{label}] Started background trigger for {payload['url']}")
+
+
+async def scrape_competitor_prices(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # Generate cache key from parameters
+    url = tool_args["url"]
+    check_in = tool_args.get("checkIn", "")
+    check_out = tool_args.get("checkOut", "")
+    adults = tool_args.get("adults", 2)
+    children = tool_args.get("children", 0)
+    rooms = tool_args.get("rooms", 1)
+
+    # Create a hash-based cache key for clean Firestore doc IDs
+    cache_string = f"{url}_{check_in}_{check_out}_{adults}_{children}_{rooms}"
+    cache_key = hashlib.md5(cache_string.encode()).hexdigest()
+
+    # Initialize Firestore
+    db = await get_firestore()
+
+    # ✅ CHECK RATE LIMIT before proceeding
+    rate_limit_key = f"rate_limit_{datetime.now().strftime('%Y-%m-%d')}"  # Daily limit
+    rate_limit_ref = db.collection('scraper_rate_limits').document(rate_limit_key)
+    cache_ref = db.collection('competitor_price_cache').document(cache_key)
+
+    # Rate limit and cache lookups are independent - fetch both at once
+    rate_limit_doc, cache_doc = await asyncio.gather(
+        rate_limit_ref.get(timeout=firestore_timeout("rate limit check")),
+        cache_ref.get(timeout=firestore_timeout("scrape cache lookup"))
+    )
+
+    current_count = rate_limit_doc.to_dict().get('count', 0) if rate_limit_doc.exists else 0
+    MAX_REQUESTS_PER_DAY = 200  # Daily limit to prevent abuse
+
+    if current_count >= MAX_REQUESTS_PER_DAY:
+        return {
+            "success": False,
+            "error": f"Daily scraping limit reached ({MAX_REQUESTS_PER_DAY} requests per day). Please try again tomorrow or contact support.",
+            "limitReached": True
+        }
+
+    # Check if cache exists and is valid
+    if cache_doc.exists:
+        cache_data = cache_doc.to_dict()
+        cache_timestamp = cache_data.get('timestamp', 0)
+        cache_age_hours = (time.time() - cache_timestamp) / 3600
+
+        # If cache is less than 6 hours old and completed
+        if cache_age_hours < 6 and cache_data.get('status') == 'completed':
+            return {
+                "success": True,
+                "data": cache_data.get('result'),
+                "cached": True,
+                "cachedAt": cache_timestamp,
+                "cacheAgeHours": round(cache_age_hours, 1)
+            }
+
+    # No valid cache - increment rate limit counter and mark as pending in Firestore
+    await asyncio.gather(
+        rate_limit_ref.set({
+            'count': current_count + 1,
+            'lastRequest': time.time(),
+            'date': datetime.now().strftime('%Y-%m-%d')
+        }, merge=True, timeout=firestore_timeout("rate limit update")),
+        cache_ref.set({
+            'status': 'pending',
+            'timestamp': time.time(),
+            'url': url,
+            'checkIn': check_in,
+            'checkOut': check_out,
+            'adults': adults,
+            'children': children,
+            'rooms': rooms
+        }, timeout=firestore_timeout("scrape cache update"))
+    )
+
+    payload = {
+        "url": url,
+        "checkIn": check_in,
+        "checkOut": check_out,
+        "adults": adults,
+        "children": children,
+        "rooms": rooms,
+        "cacheKey": cache_key  # Pass cache key to Cloud Function
+    }
+
+    # Trigger Cloud Function (only wait for it to accept the job, not for scraping to complete)
+    await trigger_cloud_function(payload, timeout_for(5.0, "scraper trigger"), "scrape_competitor_prices")
+
+    # Return immediately to AI
+    response = {
+        "success": True,
+        "status": "started",
+        "cacheKey": cache_key,
+        "message": "Scraping started. This takes approximately 30-40 seconds. Use check_scrape_status to retrieve results.",
+        "estimatedWaitSeconds": 35,
+        "realtimeEnabled": True
+    }
+    print(f"[scrape_competitor_prices] Returning response with cacheKey: {cache_key}")
+    print(f"[scrape_competitor_prices] Response: {response}")
+    return response
+
+
+async def check_scrape_status(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    cache_key = tool_args.get("cacheKey")
+    if not cache_key:
+        return {
+            "success": False,
+            "error": "cacheKey parameter is required"
+        }
+
+    # Get status from Firestore
+    db = await get_firestore()
+    cache_ref = db.collection('competitor_price_cache').document(cache_key)
+    cache_doc = await cache_ref.get(timeout=firestore_timeout("scrape status lookup"))
+
+    if not cache_doc.exists:
+        return {
+            "success": False,
+            "error": "Scraping task not found. Cache key may be invalid."
+        }
+
+    cache_data = cache_doc.to_dict()
+    status = cache_data.get('status', 'unknown')
+
+    if status == 'pending' or status == 'in_progress':
+        # Calculate how long it's been running
+        start_time = cache_data.get('timestamp', 0)
+        elapsed_seconds = int(time.time() - start_time)
+        progress = cache_data.get('progress', 0)
+        progress_message = cache_data.get('message', 'Scraping in progress...')
+
+        return {
+            "success": True,
+            "status": "in_progress" if status == 'in_progress' else "pending",
+            "message": f"{progress_message} ({elapsed_seconds} seconds elapsed)",
+            "elapsedSeconds": elapsed_seconds,
+            "progress": progress,
+            "progressMessage": progress_message
+        }
+
+    elif status == 'completed':
+        return {
+            "success": True,
+            "status": "completed",
+            "data": cache_data.get('result'),
+            "scrapedAt": cache_data.get('timestamp')
+        }
+
+    elif status == 'error':
+        return {
+            "success": False,
+            "status": "error",
+            "error": cache_data.get('error', 'Unknown error occurred during scraping')
+        }
+
+    else:
+        return {
+            "success": False,
+            "error": f"Unknown status: {status}"
+        }
+
+
+async def scrape_and_compare_hotels(client: QuendooAPIClient, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    urls = tool_args.get("urls", [])
+    check_in = tool_args.get("checkIn")
+    check_out = tool_args.get("checkOut")
+    adults = tool_args.get("adults", 2)
+    children = tool_args.get("children", 0)
+    rooms = tool_args.get("rooms", 1)
+
+    # Validation
+    if not urls or not isinstance(urls, list):
+        return {
+            "success": False,
+            "error": "urls must be a list"
+        }
+
+    if len(urls) < 2 or len(urls) > 5:
+        return {
+            "success": False,
+            "error": "Provide 2-5 hotel URLs"
+        }
+
+    # Fix truncated URLs (AI sometimes truncates .html endings)
+    fixed_urls = []
+    for url in urls:
+        if not url or not isinstance(url, str) or 'booking.com' not in url:
+            return {
+                "success": False,
+                "error": f"Invalid Booking.com URL: {url}"
+            }
+
+        # Fix common truncations (check more specific patterns first):
+        # .bg.ht -> .bg.html
+        # .bg. -> .bg.html
+        # .ht -> .html
+        if url.endswith('.bg.ht'):
+            url = url + 'ml'
+            print(f"[scrape_and_compare_hotels] Fixed truncated URL .bg.ht -> {url}")
+        elif url.endswith('.ht'):
+            url = url + 'ml'
+            print(f"[scrape_and_compare_hotels] Fixed truncated URL .ht -> {url}")
+        elif url.endswith('.bg.'):
+            url = url + 'html'
+            print(f"[scrape_and_compare_hotels] Fixed truncated URL .bg. -> {url}")
+        elif url.endswith('.') and not url.endswith('.html'):
+            url = url + 'html'
+            print(f"[scrape_and_compare_hotels] Fixed truncated URL . -> {url}")
+
+        fixed_urls.append(url)
+
+    urls = fixed_urls
+
+    print(f"[scrape_and_compare_hotels] Scraping {len(urls)} hotels in batch")
+
+    # Initialize Firestore
+    db = await get_firestore()
+
+    # ✅ CHECK RATE LIMIT before proceeding (same as single scraper)
+    rate_limit_key = f"rate_limit_{datetime.now().strftime('%Y-%m-%d')}"
+    rate_limit_ref = db.collection('scraper_rate_limits').document(rate_limit_key)
+    rate_limit_doc = await rate_limit_ref.get(timeout=firestore_timeout("rate limit check"))
+
+    current_count = rate_limit_doc.to_dict().get('count', 0) if rate_limit_doc.exists else 0
+    MAX_REQUESTS_PER_DAY = 200
+
+    # Batch scraping counts as N requests (one per hotel)
+    if current_count + len(urls) > MAX_REQUESTS_PER_DAY:
+        return {
+            "success": False,
+            "error": f"Batch scraping would exceed daily limit ({MAX_REQUESTS_PER_DAY} requests per day). You can scrape {MAX_REQUESTS_PER_DAY - current_count} more hotels today.",
+            "limitReached": True
+        }
+
+    # Increment rate limit counter by number of hotels
+    await rate_limit_ref.set({
+        'count': current_count + len(urls),
+        'lastRequest': time.time(),
+        'date': datetime.now().strftime('%Y-%m-%d')
+    }, merge=True, timeout=firestore_timeout("rate limit update"))
+
+    # Generate batch ID
+    batch_id = str(uuid4())
+
+    # Generate cache keys for each hotel and check for existing cache
+    def generate_cache_key(url, check_in, check_out, adults, children, rooms):
+        cache_string = f"{url}_{check_in or ''}_{check_out or ''}_{adults}_{children}_{rooms}"
+        return hashlib.md5(cache_string.encode()).hexdigest()
+
+    hotels = []
+    urls_to_scrape = []
+    pending_writes = []
+
+    # Fetch all cache documents in one round trip
+    cache_keys = [generate_cache_key(url, check_in, check_out, adults, children, rooms) for url in urls]
+    cache_refs = [db.collection('competitor_price_cache').document(key) for key in cache_keys]
+    cache_docs = {}
+    async for snapshot in db.get_all(cache_refs, timeout=firestore_timeout("scrape cache lookup")):
+        cache_docs[snapshot.id] = snapshot
+
+    for url, cache_key, cache_ref in zip(urls, cache_keys, cache_refs):
+        # Check if this hotel has valid cache (6 hours, same as single scraper)
+        cache_doc = cache_docs.get(cache_key)
+
+        hotel_entry = {
+            "cacheKey": cache_key,
+            "url": url,
+            "status": "pending",
+            "hotelName": None,
+            "minPrice": None,
+            "maxPrice": None,
+            "currency": "USD",
+            "rating": None,
+            "roomCount": 0,
+            "error": None
+        }
+
+        if cache_doc is not None and cache_doc.exists:
+            cache_data = cache_doc.to_dict()
+            cache_timestamp = cache_data.get('timestamp', 0)
+            cache_age_hours = (time.time() - cache_timestamp) / 3600
+
+            # If cache is less than 6 hours old and completed, use it
+            if cache_age_hours < 6 and cache_data.get('status') == 'completed':
+                result = cache_data.get('result', {})
+                hotel_entry.update({
+                    "status": "completed",
+                    "hotelName": result.get('hotelName'),
+                    "minPrice": min(result.get('prices', [0])) if result.get('prices') else None,
+                    "maxPrice": max(result.get('prices', [0])) if result.get('prices') else None,
+                    "currency": result.get('rooms', [{}])[0].get('currency', 'USD') if result.get('rooms') else 'USD',
+                    "rating": result.get('rating'),
+                    "roomCount": len(result.get('rooms', []))
+                })
+                print(f"[scrape_and_compare_hotels] Using cached data for {url} (age: {cache_age_hours:.1f}h)")
+            else:
+                # Need to scrape this one
+                urls_to_scrape.append((url, cache_key))
+        else:
+            # No cache, need to scrape
+            urls_to_scrape.append((url, cache_key))
+            # Mark as pending in cache
+            pending_writes.append(cache_ref.set({
+                'status': 'pending',
+                'timestamp': time.time(),
+                'url': url,
+                'checkIn': check_in,
+                'checkOut': check_out,
+                'adults': adults,
+                'children': children,
+                'rooms': rooms
+            }, timeout=firestore_timeout("scrape cache update")))
+
+        hotels.append(hotel_entry)
+
+    # Create batch document (use time.time() for consistency with single scraper)
+    batch_ref = db.collection('scraper_batches').document(batch_id)
+    await asyncio.gather(*pending_writes, batch_ref.set({
+        "batchId": batch_id,
+        "status": "in_progress",
+        "totalHotels": len(urls),
+        "completedHotels": 0,
+        "failedHotels": 0,
+        "progress": 0,
+        "timestamp": time.time(),
+        "checkIn": check_in,
+        "checkOut": check_out,
+        "adults": adults,
+        "children": children,
+        "rooms": rooms,
+        "hotels": hotels,
+        "results": None
+    }, timeout=firestore_timeout("scrape batch create")))
+
+    print(f"[scrape_and_compare_hotels] Created batch document: {batch_id}")
+    print(f"[scrape_and_compare_hotels] Need to scrape {len(urls_to_scrape)} hotels (others are cached)")
+
+    # Trigger Cloud Functions only for hotels that need scraping
+    if urls_to_scrape:
+        payloads: List[Dict[str, Any]] = []
+        for url, cache_key in urls_to_scrape:
+            hotel_index = next(i for i, h in enumerate(hotels) if h["cacheKey"] == cache_key)
+            payloads.append({
+                "url": url,
+                "checkIn": check_in,
+                "checkOut": check_out,
+                "adults": adults,
+                "children": children,
+                "rooms": rooms,
+                "cacheKey": cache_key,
+                "batchId": batch_id,
+                "batchIndex": hotel_index
+            })
+
+        # Fire and forget - triggers are staggered by a background task, not by blocking this call
+        run_in_background(trigger_staggered(payloads, "scrape_and_compare_hotels"))
+    else:
+        print("[scrape_and_compare_hotels] All hotels are cached, no scraping needed")
+
+    # Return immediately to AI
+    return {
+        "success": True,
+        "batchId": batch_id,
+        "totalHotels": len(urls),
+        "message": f"Scraping {len(urls)} hotels...",
+        "estimatedTime": "1-2 minutes",
+        "realtimeEnabled": True
+    }
@@ -0,0 +1,262 @@
+"""
+Booking offer scan over date / nights / occupancy grids
+
+Answers questions like "cheapest 3-night stay in March for 2 adults" with one
+server-side scan: every (check-in, nights, occupancy) combination is fetched
+via getBookingOffers concurrently (bounded), and the results are reduced to a
+compact price matrix plus a ranked list of the cheapest offers.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def check_in_dates(date_from: str, date_to: Optional[str] = None, step_days: int = 1) -> List[str]:
+    """
+    List check-in dates between date_from and date_to (inclusive)
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format
+    """
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to) if date_to else start
+    step = timedelta(days=max(1, step_days))
+
+    dates = []
+    current = start
+    while current <= end:
+        dates.append(current.isoformat())
+        current += step
+    return dates
+
+
+def parse_nights(nights: Any) -> List[int]:
+    """
+    Normalize stay lengths to sorted, unique positive integers
+
+    Raises:
+        ValueError: If nights is not a list of whole numbers
+    """
+    if isinstance(nights, (int, str)) and not isinstance(nights, bool):
+        nights = [nights]
+    if not isinstance(nights, list):
+        raise ValueError("nights must be a list of whole numbers, e.g. [2, 3]")
+
+    parsed = set()
+    for n in nights:
+        if isinstance(n, bool) or isinstance(n, float) and not n.is_integer():
+            raise ValueError(f"nights must be whole numbers, got {n!r}")
+        try:
+            value = int(n)
+        except (TypeError, ValueError):
+            raise ValueError(f"nights must be whole numbers, got {n!r}")
+        if value > 0:
+            parsed.add(value)
+    return sorted(parsed)
+
+
+def validate_occupancies(occupancies: Any):
+    """
+    Check that occupancies is a list of guest configurations (lists of rooms)
+
+    Raises:
+        ValueError: If the structure is wrong, e.g. a flat list of rooms
+    """
+    example = 'e.g. [[{"adults": 2}], [{"adults": 2, "children_by_ages": [5]}]]'
+    if not isinstance(occupancies, list):
+        raise ValueError(f"occupancies must be a list of guest configurations, {example}")
+    for index, guests in enumerate(occupancies):
+        if isinstance(guests, dict):
+            raise ValueError(
+                f"occupancies must be a list of guest configurations (each a list of rooms), {example} "
+                f"- wrap a single configuration in its own list"
+            )
+        if not isinstance(guests, list) or not guests or not all(isinstance(room, dict) for room in guests):
+            raise ValueError(f"occupancy {index} must be a non-empty list of rooms, {example}")
+
+
+def occupancy_label(guests: List[Dict[str, Any]]) -> str:
+    """
+    Short label for an occupancy
+
+    Example: [{"adults": 2, "children_by_ages": [5, 8]}] -> "2A+2C(5,8)"
+    """
+    rooms = []
+    for room in guests:
+        label = f"{room.get('adults', 0)}A"
+        ages = room.get("children_by_ages") or []
+        if ages:
+            label += f"+{len(ages)}C({','.join(str(a) for a in ages)})"
+        rooms.append(label)
+    return " | ".join(rooms)
+
+
+def offer_price(offer: Dict[str, Any]) -> Optional[float]:
+    """Extract total price of an offer (total_price, falling back to price)"""
+    value = offer.get("total_price", offer.get("price"))
+    if value is None:
+        return None
+    try:
+        return float(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def extract_offers(response: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the list of offers from a getBookingOffers response
+
+    Returns:
+        List of offers, or None if the response carries no offer data (error)
+    """
+    data = response.get("data") if isinstance(response, dict) else None
+    if isinstance(data, list):
+        return [offer for offer in data if isinstance(offer, dict)]
+    if isinstance(data, dict):
+        return [offer for offer in data.values() if isinstance(offer, dict)]
+    return None
+
+
+async def scan_booking_offers(
+    client,
+    date_from: str,
+    nights: List[int],
+    occupancies: List[List[Dict[str, Any]]],
+    date_to: Optional[str] = None,
+    step_days: int = 1,
+    bm_code: Optional[str] = None,
+    api_lng: Optional[str] = None,
+    currency: Optional[str] = None,
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Scan booking offers over all check-in / nights / occupancy combinations
+
+    Args:
+        client: QuendooAPIClient of the tenant
+        date_from: First check-in date (YYYY-MM-DD)
+        nights: Stay lengths to try
+        occupancies: Guest configurations to try (same format as get_booking_offers guests)
+        date_to: Last check-in date (defaults to date_from)
+        step_days: Days between tried check-in dates
+        bm_code: Booking module code (resolved once if not provided)
+        api_lng: Language code
+        currency: Currency code
+        top_n: Number of cheapest offers to return
+
+    Returns:
+        {"cheapest": [...], "matrix": {"columns": [...], "rows": [...]}, "errors": [...], ...}
+    """
+    try:
+        step_days = int(step_days)
+    except (TypeError, ValueError):
+        return {"success": False, "error": f"step_days must be a whole number, got {step_days!r}"}
+
+    try:
+        dates = check_in_dates(date_from, date_to, step_days)
+    except ValueError as e:
+        return {"success": False, "error": f"Invalid date: {e}"}
+
+    try:
+        nights = parse_nights(nights)
+        validate_occupancies(occupancies)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    if not dates or not nights or not occupancies:
+        return {"success": False, "error": "date range, nights and occupancies must not be empty"}
+
+    combinations = [
+        (check_in, n, guests)
+        for check_in in dates
+        for n in nights
+        for guests in occupancies
+    ]
+    max_combinations = settings.QUENDOO_OFFER_SCAN_MAX_COMBINATIONS
+    if len(combinations) > max_combinations:
+        return {
+            "success": False,
+            "error": (
+                f"Scan too large: {len(combinations)} combinations "
+                f"(max {max_combinations}). Narrow the date range, increase step_days "
+                f"or reduce nights/occupancy options."
+            )
+        }
+
+    # Resolve booking module once instead of per combination
+    if not bm_code:
+        bm_code = await client.resolve_booking_module()
+        if not bm_code:
+            return {"success": False, "error": "No active booking modules found. Please configure booking modules in Quendoo."}
+
+    semaphore = asyncio.Semaphore(settings.QUENDOO_OFFER_SCAN_MAX_CONCURRENCY)
+
+    async def fetch(check_in: str, n: int, guests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await client.get_booking_offers(
+                    date_from=check_in,
+                    nights=n,
+                    bm_code=bm_code,
+                    api_lng=api_lng,
+                    guests=guests,
+                    currency=currency
+                )
+            except Exception as e:
+                return {"error": str(e)}
+
+    print(f"[OfferScan] Scanning {len(combinations)} combinations ({len(dates)} dates x {len(nights)} nights x {len(occupancies)} occupancies)")
+    responses = await asyncio.gather(*[fetch(*combination) for combination in combinations])
+
+    rows = []
+    offers = []
+    errors = []
+    for (check_in, n, guests), response in zip(combinations, responses):
+        label = occupancy_label(guests)
+        combination_offers = extract_offers(response)
+        if combination_offers is None:
+            error = response.get("error") if isinstance(response, dict) else None
+            errors.append({
+                "date_from": check_in,
+                "nights": n,
+                "occupancy": label,
+                "error": str(error or "No offer data in response")
+            })
+            continue
+
+        prices = []
+        for offer in combination_offers:
+            price = offer_price(offer)
+            if price is None:
+                continue
+            prices.append(price)
+            offers.append({
+                "date_from": check_in,
+                "nights": n,
+                "occupancy": label,
+                "room": offer.get("room_name") or offer.get("name"),
+                "rate": offer.get("rate_name"),
+                "total_price": price,
+                "price_per_night": round(price / n, 2),
+                "currency": offer.get("currency") or currency
+            })
+
+        rows.append([check_in, n, label, min(prices) if prices else None, len(prices)])
+
+    offers.sort(key=lambda o: (o["total_price"], o["date_from"], o["nights"]))
+
+    return {
+        "bm_code": bm_code,
+        "combinations": len(combinations),
+        "succeeded": len(rows),
+        "failed": len(errors),
+        "cheapest": offers[:max(1, top_n)],
+        "matrix": {
+            "columns": ["date_from", "nights", "occupancy", "min_total_price", "offers"],
+            "rows": rows
+        },
+        "errors": errors
+    }
@@ -0,0 +1,270 @@
+"""
+Server-side tool pipelines
+
+A pipeline is a list of tool steps whose arguments may reference earlier
+results, so large intermediate payloads (availability grids, booking lists)
+stay in the process instead of travelling through the model's context:
+
+    [
+        {"id": "avail", "tool_name": "get_availability",
+         "tool_args": {"date_from": "2026-03-01", "date_to": "2026-03-31", "sysres": "qdo"}},
+        {"id": "summary", "tool_name": "analyze_data",
+         "tool_args": {"data": "{RESULT}", "instruction": "Dates with < 5 rooms", "format": "html_table"}},
+        {"tool_name": "send_quendoo_email",
+         "tool_args": {"to": "gm@hotel.com", "subject": "Low availability", "message": "{RESULT:summary.analysis}", "html": true}}
+    ]
+
+References:
+    {RESULT}                 whole result of the previous step
+    {RESULT.field.0.name}    path into the previous step's result
+    {RESULT:step_id}         whole result of a named step
+    {RESULT:step_id.field}   path into a named step's result
+
+Steps form a DAG: a step waits for the steps it references (plus any listed
+in "depends_on"), and steps that do not depend on each other run concurrently.
+If a dependency fails, its dependents are skipped.
+"""
+import asyncio
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# {RESULT}, {RESULT.path}, {RESULT:step}, {RESULT:step.path}
+REFERENCE_PATTERN = re.compile(r"\{RESULT(?::([A-Za-z0-9_-]+))?((?:\.[A-Za-z0-9_-]+)*)\}")
+
+# run_step(tool_name, tool_args) -> {"success", "result"?, "error"?, "timed_out"?}
+StepRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# param_type(tool_name, arg_name) -> JSON schema type of the argument (or None)
+ParamTypeLookup = Callable[[str, str], Optional[str]]
+
+
+class PipelineError(ValueError):
+    """Raised when a pipeline definition is invalid"""
+
+
+def _find_references(value: Any) -> List[Optional[str]]:
+    """Step ids referenced anywhere in an argument value (None = previous step)"""
+    if isinstance(value, str):
+        return [match.group(1) for match in REFERENCE_PATTERN.finditer(value)]
+    if isinstance(value, dict):
+        return [ref for item in value.values() for ref in _find_references(item)]
+    if isinstance(value, list):
+        return [ref for item in value for ref in _find_references(item)]
+    return []
+
+
+def parse_steps(steps: List[Dict[str, Any]], max_steps: int) -> List[Dict[str, Any]]:
+    """
+    Validate a pipeline and work out each step's dependencies
+
+    Args:
+        steps: Raw steps ({"id"?, "tool_name", "tool_args"?, "depends_on"?})
+        max_steps: Maximum number of steps allowed
+
+    Returns:
+        Normalized steps with "id", "tool_name", "tool_args", "depends_on"
+        and "previous" (id of the step {RESULT} refers to)
+
+    Raises:
+        PipelineError: On unknown/duplicate ids, forward references or too many steps
+    """
+    if not steps:
+        raise PipelineError("Pipeline has no steps")
+    if len(steps) > max_steps:
+        raise PipelineError(f"Pipeline has {len(steps)} steps, maximum is {max_steps}")
+
+    parsed = []
+    seen = set()
+    for index, step in enumerate(steps):
+        step_id = str(step.get("id") or f"step{index + 1}")
+        if step_id in seen:
+            raise PipelineError(f"Duplicate step id: {step_id}")
+        if not step.get("tool_name"):
+            raise PipelineError(f"Step {step_id} has no tool_name")
+
+        tool_args = step.get("tool_args") or {}
+        previous = parsed[-1]["id"] if parsed else None
+
+        depends_on = []
+        for ref in _find_references(tool_args) + list(step.get("depends_on") or []):
+            target = ref if ref is not None else previous
+            if target is None:
+                raise PipelineError(f"Step {step_id} uses {{RESULT}} but has no previous step")
+            # Only earlier steps can be referenced, which also rules out cycles
+            if target not in seen:
+                raise PipelineError(f"Step {step_id} references unknown or later step: {target}")
+            if target not in depends_on:
+                depends_on.append(target)
+
+        seen.add(step_id)
+        parsed.append({
+            "id": step_id,
+            "tool_name": step["tool_name"],
+            "tool_args": tool_args,
+            "depends_on": depends_on,
+            "previous": previous
+        })
+
+    return parsed
+
+
+def _lookup(value: Any, path: str) -> Any:
+    """Follow a dotted path ("data.0.name") into a result"""
+    for part in filter(None, path.split(".")):
+        if isinstance(value, dict):
+            if part not in value:
+                raise PipelineError(f"Result has no field '{part}'")
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            raise PipelineError(f"Cannot resolve '{part}' in result")
+    return value
+
+
+def _as_text(value: Any) -> str:
+    """Render a result for use inside a string argument"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def resolve_references(
+    value: Any,
+    results: Dict[str, Any],
+    previous: Optional[str],
+    param_type: Optional[str] = None
+) -> Any:
+    """
+    Replace {RESULT...} references in an argument value
+
+    A value that is exactly one reference is replaced by the referenced
+    object itself (or its JSON text if the parameter is declared as a
+    string); references embedded in longer strings are replaced by text.
+    """
+    if isinstance(value, dict):
+        return {k: resolve_references(v, results, previous) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(v, results, previous) for v in value]
+    if not isinstance(value, str) or "{RESULT" not in value:
+        return value
+
+    def referenced(match: "re.Match") -> Any:
+        return _lookup(results[match.group(1) or previous], match.group(2))
+
+    whole = REFERENCE_PATTERN.fullmatch(value)
+    if whole:
+        resolved = referenced(whole)
+        return _as_text(resolved) if param_type == "string" else resolved
+
+    return REFERENCE_PATTERN.sub(lambda match: _as_text(referenced(match)), value)
+
+
+def _step_failed(outcome: Dict[str, Any]) -> Optional[str]:
+    """Error message if a step failed (including tools that report success: false)"""
+    if not outcome.get("success"):
+        return outcome.get("error") or "Tool call failed"
+    result = outcome.get("result")
+    if isinstance(result, dict) and result.get("success") is False:
+        return result.get("error") or "Tool reported failure"
+    return None
+
+
+async def run_pipeline(
+    steps: List[Dict[str, Any]],
+    run_step: StepRunner,
+    param_type: Optional[ParamTypeLookup] = None,
+    outputs: Optional[List[str]] = None,
+    shared_args: Optional[Dict[str, Any]] = None,
+    max_steps: int = 10,
+    max_concurrency: int = 4
+) -> Dict[str, Any]:
+    """
+    Execute a pipeline
+
+    Args:
+        steps: Pipeline steps (see module docstring)
+        run_step: Executes one tool call
+        param_type: Optional lookup of argument types from tool schemas
+        outputs: Step ids whose results are returned (default: steps nothing depends on)
+        shared_args: Arguments added to every step unless it sets them (e.g. hotelId)
+        max_steps: Maximum number of steps allowed
+        max_concurrency: Steps running at once
+
+    Returns:
+        {"success", "steps": [per-step status], "outputs": {step_id: result}}
+
+    Raises:
+        PipelineError: If the pipeline definition is invalid
+    """
+    parsed = parse_steps(steps, max_steps)
+    ids = [step["id"] for step in parsed]
+
+    if outputs is None:
+        depended_on = {dep for step in parsed for dep in step["depends_on"]}
+        outputs = [step_id for step_id in ids if step_id not in depended_on]
+    else:
+        unknown = [step_id for step_id in outputs if step_id not in ids]
+        if unknown:
+            raise PipelineError(f"Unknown output step(s): {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {}
+    statuses: Dict[str, Dict[str, Any]] = {}
+    done: Dict[str, asyncio.Event] = {step_id: asyncio.Event() for step_id in ids}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def execute(step: Dict[str, Any]):
+        status = {"id": step["id"], "tool_name": step["tool_name"], "success": False}
+        statuses[step["id"]] = status
+        try:
+            for dep in step["depends_on"]:
+                await done[dep].wait()
+
+            failed_deps = [dep for dep in step["depends_on"] if not statuses[dep]["success"]]
+            if failed_deps:
+                status["skipped"] = True
+                status["error"] = f"Skipped: dependency {', '.join(failed_deps)} failed"
+                return
+
+            try:
+                tool_args = {
+                    name: resolve_references(
+                        value, results, step["previous"],
+                        param_type(step["tool_name"], name) if param_type else None
+                    )
+                    for name, value in step["tool_args"].items()
+                }
+                for name, value in (shared_args or {}).items():
+                    tool_args.setdefault(name, value)
+            except PipelineError as e:
+                status["error"] = f"Could not resolve arguments: {e}"
+                return
+
+            async with semaphore:
+                started = time.perf_counter()
+                outcome = await run_step(step["tool_name"], tool_args)
+                status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+            error = _step_failed(outcome)
+            if error:
+                status["error"] = error
+                status["timed_out"] = outcome.get("timed_out", False)
+                return
+
+            results[step["id"]] = outcome.get("result")
+            status["success"] = True
+        finally:
+            done[step["id"]].set()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(execute(step) for step in parsed))
+
+    print(f"[Pipeline] {len(parsed)} steps in {(time.perf_counter() - started) * 1000:.0f}ms "
+          f"({sum(1 for s in statuses.values() if s['success'])} succeeded)")
+
+    return {
+        "success": all(statuses[step_id]["success"] for step_id in ids),
+        "steps": [statuses[step_id] for step_id in ids],
+        "outputs": {step_id: results[step_id] for step_id in outputs if step_id in results}
+    }
@@ -0,0 +1,343 @@
+"""
+Deterministic query engine over tool-result JSON
+
+Answers plain filter / group-by / aggregate / top-k questions ("dates with
+less than 5 rooms", "bookings per month", "top 10 guests by total") locally
+in milliseconds instead of with an LLM call.
+
+Records are found in the input (a list, the largest list inside an object,
+or a columnar get_availability result) and each referenced field is
+extracted once into a column; filters, grouping and aggregates then run
+column-at-a-time over those lists.
+
+Example query:
+    {
+        "filter": [{"field": "qty", "op": "lt", "value": 5}],
+        "group_by": ["date:month"],
+        "aggregates": [{"op": "count"}, {"op": "avg", "field": "qty", "as": "avg_qty"}],
+        "sort": [{"field": "count", "desc": true}],
+        "limit": 3
+    }
+"""
+import json
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Maximum rows returned when no limit is given
+DEFAULT_LIMIT = 500
+
+
+class QueryError(ValueError):
+    """Raised when a query or its input is invalid"""
+
+
+def _number(value: Any) -> Any:
+    """Numeric view of a value for comparisons ("5" -> 5.0), else the value itself"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _compare(op: str) -> Callable[[Any, Any], bool]:
+    def ordered(fn):
+        def check(a, b):
+            if a is None:
+                return False
+            try:
+                return fn(a, b)
+            except TypeError:
+                try:
+                    return fn(_number(a), _number(b))
+                except TypeError:
+                    return False
+        return check
+
+    operators = {
+        "eq": lambda a, b: a == b or (a is not None and _number(a) == _number(b)),
+        "ne": lambda a, b: not (a == b or (a is not None and _number(a) == _number(b))),
+        "lt": ordered(lambda a, b: a < b),
+        "lte": ordered(lambda a, b: a <= b),
+        "gt": ordered(lambda a, b: a > b),
+        "gte": ordered(lambda a, b: a >= b),
+        "between": ordered(lambda a, b: b[0] <= a <= b[1]),
+        "in": lambda a, b: a in b,
+        "not_in": lambda a, b: a not in b,
+        "contains": lambda a, b: a is not None and str(b).lower() in str(a).lower(),
+        "startswith": lambda a, b: a is not None and str(a).startswith(str(b)),
+        "exists": lambda a, b: (a is not None) == bool(b),
+    }
+    if op not in operators:
+        raise QueryError(f"Unknown filter op '{op}' (use one of: {', '.join(operators)})")
+    return operators[op]
+
+
+# Derived date parts: "field:month" etc. on YYYY-MM-DD values
+_DATE_PARTS: Dict[str, Callable[[str], Any]] = {
+    "year": lambda v: v[:4],
+    "month": lambda v: v[:7],
+    "day": lambda v: v[:10],
+    "weekday": lambda v: date.fromisoformat(v[:10]).strftime("%A"),
+    "week": lambda v: "{}-W{:02d}".format(*date.fromisoformat(v[:10]).isocalendar()[:2]),
+}
+
+
+def _lookup(record: Any, parts: Sequence[str]) -> Any:
+    for part in parts:
+        if isinstance(record, dict):
+            record = record.get(part)
+        elif isinstance(record, list) and part.isdigit() and int(part) < len(record):
+            record = record[int(part)]
+        else:
+            return None
+    return record
+
+
+def column(records: List[Any], field: str) -> List[Any]:
+    """
+    Extract one field from every record
+
+    Supports dotted paths ("guest.name") and date parts ("date:month",
+    "arrival:weekday", ...).
+    """
+    path, _, part = field.partition(":")
+    parts = path.split(".")
+    values = [_lookup(r, parts) for r in records]
+    if not part:
+        return values
+    if part not in _DATE_PARTS:
+        raise QueryError(f"Unknown date part '{part}' (use one of: {', '.join(_DATE_PARTS)})")
+    derive = _DATE_PARTS[part]
+
+    def safe(v):
+        try:
+            return derive(str(v)) if v is not None else None
+        except ValueError:
+            return None
+    return [safe(v) for v in values]
+
+
+def find_records(data: Any, records_path: Optional[str] = None) -> List[Any]:
+    """
+    Locate the records to query
+
+    Args:
+        data: Parsed tool result
+        records_path: Dotted path to the record list; default: the input
+            itself if it is a list, else the largest list inside it
+
+    Returns:
+        List of records. A columnar get_availability result is expanded to
+        {"room_id", "date", "qty"} records.
+    """
+    if isinstance(data, dict) and data.get("format") == "columnar" and "qty" in data:
+        dates = data.get("dates", [])
+        return [
+            {"room_id": room_id, "date": dates[j], "qty": qty}
+            for room_id, row in zip(data.get("room_ids", []), data["qty"])
+            for j, qty in enumerate(row)
+        ]
+
+    if records_path:
+        records = _lookup(data, records_path.split("."))
+        if not isinstance(records, list):
+            raise QueryError(f"'{records_path}' is not a list in the data")
+        return records
+
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        lists = [v for v in data.values() if isinstance(v, list)]
+        if lists:
+            return max(lists, key=len)
+        # One level deeper, e.g. {"result": {"data": [...]}}
+        nested = [find_records(v) for v in data.values() if isinstance(v, dict)]
+        nested = [n for n in nested if n]
+        if nested:
+            return max(nested, key=len)
+    raise QueryError("No list of records found in the data - pass records_path")
+
+
+def _aggregate(op: str, values: List[Any]) -> Any:
+    if op == "count":
+        return len(values)
+    present = [v for v in values if v is not None]
+    if op == "count_distinct":
+        return len(set(json.dumps(v, sort_keys=True, default=str) if isinstance(v, (dict, list)) else v for v in present))
+    if op in ("min", "max"):
+        if not present:
+            return None
+        try:
+            return min(present) if op == "min" else max(present)
+        except TypeError:
+            numbers = [_number(v) for v in present]
+            return min(numbers) if op == "min" else max(numbers)
+
+    numbers = [n for n in (_number(v) for v in present) if isinstance(n, (int, float)) and not isinstance(n, bool)]
+    if op == "sum":
+        return round(sum(numbers), 6)
+    if op == "avg":
+        return round(sum(numbers) / len(numbers), 6) if numbers else None
+    raise QueryError(f"Unknown aggregate op '{op}' (use count, count_distinct, sum, avg, min or max)")
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Type-safe sort key: numbers, then strings, then other values (as JSON)"""
+    value = _number(value)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, json.dumps(value, sort_keys=True, default=str))
+
+
+def _sort_rows(rows: List[Dict[str, Any]], fields: List[Tuple[str, bool]]) -> List[Dict[str, Any]]:
+    """
+    Sort rows by several fields, each ascending or descending
+
+    Stable sorts run from the last key to the first; rows missing a field
+    sort last regardless of direction.
+    """
+    for field, desc in reversed(fields):
+        present = [row for row in rows if row.get(field) is not None]
+        missing = [row for row in rows if row.get(field) is None]
+        present.sort(key=lambda row: _sort_key(row[field]), reverse=desc)
+        rows = present + missing
+    return rows
+
+
+def run_query(
+    data: Any,
+    filter: Optional[List[Dict[str, Any]]] = None,
+    group_by: Optional[List[str]] = None,
+    aggregates: Optional[List[Dict[str, Any]]] = None,
+    select: Optional[List[str]] = None,
+    sort: Optional[List[Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+    records_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run a query over tool-result JSON
+
+    Args:
+        data: Tool result (object or JSON string)
+        filter: Conditions {"field", "op", "value"} combined with AND
+        group_by: Fields to group by (supports "field:month" etc.)
+        aggregates: {"op", "field"?, "as"?} computed per group (default: count)
+        select: Fields returned per record when not aggregating
+        sort: Sort keys {"field", "desc"?} applied to output rows
+        limit: Maximum rows returned (top-k together with sort)
+        records_path: Dotted path to the record list (auto-detected if omitted)
+
+    Returns:
+        {"rows", "row_count", "total_records", "matched_records", "truncated"}
+
+    Raises:
+        QueryError: If the query or data is invalid
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            raise QueryError("data is not valid JSON")
+
+    records = find_records(data, records_path)
+    total = len(records)
+
+    # Filter: evaluate each condition over its column, narrowing the index list
+    indexes = range(total)
+    for condition in filter or []:
+        if "field" not in condition:
+            raise QueryError("Every filter condition needs a 'field'")
+        check = _compare(condition.get("op", "eq"))
+        values = column(records, condition["field"])
+        expected = condition.get("value")
+        if condition.get("op") == "between" and not (isinstance(expected, list) and len(expected) == 2):
+            raise QueryError("'between' needs a [low, high] value")
+        if condition.get("op") in ("in", "not_in") and not isinstance(expected, list):
+            raise QueryError(f"'{condition['op']}' needs a list value")
+        indexes = [i for i in indexes if check(values[i], expected)]
+    indexes = list(indexes)
+
+    if group_by or aggregates:
+        aggregates = aggregates or [{"op": "count"}]
+        group_columns = [column(records, field) for field in group_by or []]
+        groups: Dict[Tuple, List[int]] = {}
+        for i in indexes:
+            groups.setdefault(tuple(c[i] for c in group_columns), []).append(i)
+
+        aggregate_columns = {
+            spec["field"]: column(records, spec["field"])
+            for spec in aggregates if spec.get("field")
+        }
+        rows = []
+        for key, members in groups.items():
+            row = {field: value for field, value in zip(group_by or [], key)}
+            for spec in aggregates:
+                op = spec.get("op", "count")
+                field = spec.get("field")
+                name = spec.get("as") or (f"{op}_{field}" if field else op)
+                if op != "count" and not field:
+                    raise QueryError(f"Aggregate '{op}' needs a 'field'")
+                values = [aggregate_columns[field][i] for i in members] if field else members
+                row[name] = _aggregate(op, values)
+            rows.append(row)
+    elif select:
+        selected = {field: column(records, field) for field in select}
+        rows = [{field: selected[field][i] for field in select} for i in indexes]
+    else:
+        rows = [records[i] for i in indexes]
+
+    limit = limit if limit and limit > 0 else DEFAULT_LIMIT
+    sort_fields = [(s["field"], bool(s.get("desc"))) for s in sort or [] if s.get("field")]
+    if sort_fields and isinstance(rows[0] if rows else None, dict):
+        rows = _sort_rows(rows, sort_fields)
+
+    return {
+        "success": True,
+        "rows": rows[:limit],
+        "row_count": min(len(rows), limit),
+        "total_records": total,
+        "matched_records": len(indexes),
+        "truncated": len(rows) > limit
+    }
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def format_rows(rows: List[Any], output_format: str) -> str:
+    """
+    Render query rows as a markdown table, bulleted list or JSON text
+
+    Args:
+        rows: Rows returned by run_query
+        output_format: "table" / "html_table" (markdown table), "list", "text" or "json"
+    """
+    if output_format == "json":
+        return json.dumps(rows, ensure_ascii=False, default=str)
+    if not rows:
+        return "No matching records."
+    if not all(isinstance(row, dict) for row in rows):
+        return "\n".join(f"- {_cell(row)}" for row in rows)
+
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+
+    if output_format in ("table", "html_table"):
+        lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+        lines.extend("| " + " | ".join(_cell(row.get(c)) for c in columns) + " |" for row in rows)
+        return "\n".join(lines)
+    if output_format == "list":
+        return "\n".join("- " + ", ".join(f"{c}: {_cell(row.get(c))}" for c in columns if c in row) for row in rows)
+    return "\n".join("; ".join(f"{c}: {_cell(row.get(c))}" for c in columns if c in row) for row in rows)
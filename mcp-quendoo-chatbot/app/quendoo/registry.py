@@ -0,0 +1,246 @@
+"""
+Declarative tool registry
+
+Maps every tool name to its schema, handler, cache policy and latency budget.
+Handlers are referenced as "module:function" strings and imported on warmup
+(app startup) or, failing that, on first use in a worker thread - so heavy
+SDK imports (anthropic, vertexai, firestore, ...) never run on the event loop
+inside a user's request. Dispatch is a single dict lookup.
+"""
+import asyncio
+import importlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Handler signature: handler(client: QuendooAPIClient, tool_args) -> result
+ToolHandler = Callable[[Any, Dict[str, Any]], Awaitable[Any]]
+
+
+class CachePolicy:
+    """How a tool's results relate to caching"""
+
+    # Not cached
+    NONE = "none"
+    # Served through client-level caches/stores (response cache, booking store, single-flight)
+    UPSTREAM = "upstream"
+    # Modifies tenant data - never cached, invalidates cached reads
+    WRITE = "write"
+    # Results memoized per (tenant, hotelId, args) for ToolSpec.memo_ttl seconds
+    MEMO = "memo"
+
+
+class ToolSpec:
+    """Declaration of a single tool"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: str,
+        timeout: float = 60.0,
+        cache: str = CachePolicy.NONE,
+        max_result_tokens: Optional[int] = None,
+        drop_fields: Sequence[str] = (),
+        parallel_fields: Sequence[Sequence[str]] = (),
+        memo_ttl: Optional[float] = None,
+        paginated: Optional[bool] = None
+    ):
+        """
+        Args:
+            name: Tool name (must match a schema in QUENDOO_TOOLS)
+            handler: "package.module:function" implementing the tool
+            timeout: Default latency budget in seconds
+            cache: CachePolicy value
+            max_result_tokens: Result token budget (default RESULT_MAX_TOKENS)
+            drop_fields: Result keys removed first when over budget
+            parallel_fields: Groups of sibling arrays whose items belong
+                together by index; they are always paginated together
+            memo_ttl: How long results are memoized (CachePolicy.MEMO only)
+            paginated: Accepts result_offset for the next page of a shaped
+                result (default: every tool except writes)
+        """
+        self.name = name
+        self.handler = handler
+        self.timeout = timeout
+        self.cache = cache
+        self.max_result_tokens = max_result_tokens
+        self.drop_fields = tuple(drop_fields)
+        self.parallel_fields = tuple(tuple(group) for group in parallel_fields)
+        self.memo_ttl = memo_ttl
+        self.paginated = cache != CachePolicy.WRITE if paginated is None else paginated
+        self.schema: Optional[Dict[str, Any]] = None
+
+        self.module_name, _, self.function_name = handler.partition(":")
+
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.first_call_ms: Optional[float] = None
+
+
+class ToolRegistry:
+    """
+    Registry of tool specs with lazily imported handler modules
+
+    With a memo cache, results of CachePolicy.MEMO tools are reused for
+    identical calls of the same tenant and hotel, and every CachePolicy.WRITE
+    call drops the tenant's memoized results.
+
+    Example usage:
+        registry = ToolRegistry(QUENDOO_TOOLS, TOOL_SPECS, memo=get_tool_result_cache())
+        await registry.warmup()                       # at startup
+        result = await registry.dispatch("get_bookings", client, {})
+    """
+
+    def __init__(self, schemas: List[Dict[str, Any]], specs: List[ToolSpec], memo=None):
+        """
+        Args:
+            schemas: Tool schemas (QUENDOO_TOOLS)
+            specs: Tool declarations; every schema needs exactly one spec
+            memo: Optional ToolResultCache for CachePolicy.MEMO tools
+
+        Raises:
+            ValueError: If schemas and specs do not match
+        """
+        self._specs: Dict[str, ToolSpec] = {spec.name: spec for spec in specs}
+        schema_names = {schema["name"] for schema in schemas}
+
+        missing = schema_names - self._specs.keys()
+        unknown = self._specs.keys() - schema_names
+        if missing or unknown:
+            raise ValueError(f"Tool specs out of sync with schemas (missing: {sorted(missing)}, unknown: {sorted(unknown)})")
+
+        for schema in schemas:
+            self._specs[schema["name"]].schema = schema
+
+        for spec in specs:
+            if spec.cache == CachePolicy.MEMO and not spec.memo_ttl:
+                raise ValueError(f"Tool {spec.name} uses CachePolicy.MEMO without a memo_ttl")
+
+        self.memo = memo
+
+        self._handlers: Dict[str, ToolHandler] = {}
+        # module name -> import time in ms
+        self._module_load_ms: Dict[str, float] = {}
+        self._module_errors: Dict[str, str] = {}
+
+    def get(self, tool_name: str) -> Optional[ToolSpec]:
+        """Get tool spec by name"""
+        return self._specs.get(tool_name)
+
+    def get_timeout(self, tool_name: str, default: float = 60.0) -> float:
+        """Get default latency budget of a tool"""
+        spec = self._specs.get(tool_name)
+        return spec.timeout if spec else default
+
+    def get_param_type(self, tool_name: str, arg_name: str) -> Optional[str]:
+        """Get the JSON schema type of a tool argument (None if not declared)"""
+        spec = self._specs.get(tool_name)
+        if spec is None or spec.schema is None:
+            return None
+        properties = spec.schema.get("inputSchema", {}).get("properties", {})
+        return properties.get(arg_name, {}).get("type")
+
+    def _load_module(self, module_name: str):
+        """Import a handler module, recording how long it took"""
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            self._module_errors[module_name] = f"{type(e).__name__}: {e}"
+            raise
+        if module_name not in self._module_load_ms:
+            self._module_load_ms[module_name] = round((time.perf_counter() - started) * 1000, 1)
+            self._module_errors.pop(module_name, None)
+            print(f"[ToolRegistry] Loaded {module_name} in {self._module_load_ms[module_name]}ms")
+        return module
+
+    async def _resolve(self, spec: ToolSpec) -> ToolHandler:
+        """Get handler function, importing its module off the event loop if needed"""
+        handler = self._handlers.get(spec.name)
+        if handler is None:
+            module = await asyncio.to_thread(self._load_module, spec.module_name)
+            handler = getattr(module, spec.function_name)
+            self._handlers[spec.name] = handler
+        return handler
+
+    async def warmup(self):
+        """
+        Import every handler module before traffic arrives
+
+        Failures are logged, not raised - the module is retried on first use.
+        """
+        started = time.perf_counter()
+        failed_modules = set()
+        for spec in self._specs.values():
+            if spec.module_name in failed_modules:
+                continue
+            try:
+                await self._resolve(spec)
+            except Exception as e:
+                failed_modules.add(spec.module_name)
+                print(f"[ToolRegistry] Warmup could not load {spec.module_name}: {e}")
+        print(f"[ToolRegistry] Warmup finished in {(time.perf_counter() - started) * 1000:.0f}ms "
+              f"({len(self._handlers)}/{len(self._specs)} handlers ready)")
+
+    async def dispatch(self, tool_name: str, client, tool_args: Dict[str, Any]) -> Any:
+        """
+        Run a tool
+
+        Raises:
+            ValueError: If tool not found
+        """
+        spec = self._specs.get(tool_name)
+        if spec is None:
+            raise ValueError(f"Unknown tool: {tool_name}")
+
+        handler = await self._resolve(spec)
+
+        api_key = getattr(client, "api_key", None)
+        memo_key = None
+        if self.memo is not None and api_key and spec.cache == CachePolicy.MEMO:
+            memo_key = self.memo.make_key(api_key, tool_name, tool_args)
+            memoized = self.memo.get(memo_key)
+            if memoized is not None:
+                return memoized
+
+        started = time.perf_counter()
+        try:
+            result = await handler(client, tool_args)
+            # Failures are not memoized - the next call retries
+            if memo_key is not None and not (isinstance(result, dict) and result.get("success") is False):
+                self.memo.set(memo_key, result, spec.memo_ttl)
+            return result
+        except BaseException:
+            spec.errors += 1
+            raise
+        finally:
+            if self.memo is not None and api_key and spec.cache == CachePolicy.WRITE:
+                # Even a failed write may have changed something
+                self.memo.purge(api_key=api_key)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            spec.calls += 1
+            spec.total_ms += elapsed_ms
+            if spec.first_call_ms is None:
+                spec.first_call_ms = round(elapsed_ms, 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tool call statistics and handler module load costs"""
+        tools = {}
+        for name, spec in self._specs.items():
+            tools[name] = {
+                "module": spec.module_name,
+                "loaded": name in self._handlers,
+                "timeout_seconds": spec.timeout,
+                "cache": spec.cache,
+                "max_result_tokens": spec.max_result_tokens,
+                "memo_ttl_seconds": spec.memo_ttl,
+                "calls": spec.calls,
+                "errors": spec.errors,
+                "first_call_ms": spec.first_call_ms,
+                "avg_ms": round(spec.total_ms / spec.calls, 1) if spec.calls else None
+            }
+        return {
+            "tools": tools,
+            "modules": dict(self._module_load_ms),
+            "module_errors": dict(self._module_errors)
+        }
@@ -0,0 +1,257 @@
+"""
+Retry policy and circuit breakers for Quendoo API calls
+
+- RetryPolicy: capped exponential backoff with full jitter, honours Retry-After
+- CircuitBreaker: per-endpoint breaker that fails fast while Quendoo is degraded
+"""
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the endpoint's circuit is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(
+            f"Quendoo API endpoint {endpoint} is temporarily unavailable "
+            f"(circuit open, retry in {retry_in:.0f}s)"
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Retry-After header value
+
+    Args:
+        value: Header value - either delay in seconds or an HTTP date
+
+    Returns:
+        Delay in seconds, or None if header missing/invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Retry policy for idempotent requests
+
+    Example usage:
+        policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=8)
+        delay = policy.backoff(attempt=1)  # random value in [0, 1.0]
+    """
+
+    # Upstream statuses worth retrying (transient errors)
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_retry_after: float = 30.0
+    ):
+        """
+        Initialize retry policy
+
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Backoff base in seconds
+            max_delay: Cap for computed backoff
+            max_retry_after: Longest Retry-After we are willing to wait
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """Check if HTTP status is transient"""
+        return status_code in self.RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Compute full-jitter backoff for a retry
+
+        Args:
+            attempt: Number of attempts already made (1 for the first retry)
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def delay_for(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Delay before next attempt
+
+        Returns:
+            Seconds to wait, or None if Retry-After asks for longer than we accept
+        """
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            return max(retry_after, self.backoff(attempt))
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single upstream endpoint
+
+    States:
+        closed    - calls pass, consecutive failures are counted
+        open      - calls fail fast until reset_timeout elapses
+        half_open - one probe call is let through; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+        self.total_failures = 0
+        self.total_rejections = 0
+        self.last_error: Optional[str] = None
+
+    def before_call(self):
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: If circuit is open (or a half-open probe is already running)
+        """
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.total_rejections += 1
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+            print(f"[CircuitBreaker] {self.name} half-open, probing upstream")
+
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                self.total_rejections += 1
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self.probe_in_flight = True
+
+    def record_success(self):
+        """Record successful call"""
+        if self.state != self.CLOSED:
+            print(f"[CircuitBreaker] {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, error: str):
+        """Record failed call (transport error or 5xx)"""
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        self.last_error = error
+        self.probe_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"[CircuitBreaker] {self.name} opened after {self.consecutive_failures} failure(s): {error}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Release a half-open probe slot without recording an outcome"""
+        self.probe_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get breaker state for diagnostics"""
+        retry_in = None
+        if self.state == self.OPEN and self.opened_at is not None:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_in_seconds": retry_in,
+            "total_failures": self.total_failures,
+            "total_rejections": self.total_rejections,
+            "last_error": self.last_error
+        }
+
+
+class CircuitBreakerRegistry:
+    """Per-endpoint circuit breakers (shared by all tenants)"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        """Get or create breaker for endpoint"""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        """Get state of every known breaker"""
+        return {name: breaker.get_state() for name, breaker in self._breakers.items()}
+
+
+# Global instances
+_retry_policy: Optional[RetryPolicy] = None
+_circuit_breakers: Optional[CircuitBreakerRegistry] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get or create global RetryPolicy"""
+    global _retry_policy
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(
+            max_attempts=settings.QUENDOO_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.QUENDOO_RETRY_BASE_DELAY_SECONDS,
+            max_delay=settings.QUENDOO_RETRY_MAX_DELAY_SECONDS,
+            max_retry_after=settings.QUENDOO_RETRY_AFTER_MAX_SECONDS
+        )
+    return _retry_policy
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Get or create global CircuitBreakerRegistry"""
+    global _circuit_breakers
+    if _circuit_breakers is None:
+        _circuit_breakers = CircuitBreakerRegistry(
+            failure_threshold=settings.QUENDOO_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.QUENDOO_CIRCUIT_RESET_SECONDS
+        )
+    return _circuit_breakers
@@ -0,0 +1,345 @@
+"""
+Token-budget-aware shaping of tool results
+
+Every tool result passes through shape_result() before it is returned to the
+model. If its estimated size exceeds the token budget, it is reduced in
+order of least information lost:
+
+1. Drop fields the tool declared as low-value (ToolSpec.drop_fields)
+2. Paginate the largest arrays - keep the items that fit, report the rest
+   (arrays declared parallel, e.g. room_ids / qty, share one window)
+3. Truncate the longest strings
+
+What was removed is reported under "_shaping" so the model knows the result
+is partial and how to get the next page (call again with "result_offset").
+
+Shaping never mutates its input: containers along a changed path are copied,
+everything else is shared. Tool results may be backed by shared stores (e.g.
+the booking store's records), so in-place edits would corrupt them.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Header carrying a per-request token budget for results (e.g. "X-Result-Max-Tokens: 4000")
+RESULT_BUDGET_HEADER = "X-Result-Max-Tokens"
+
+# Rough JSON characters per LLM token
+CHARS_PER_TOKEN = 4
+
+# Strings shorter than this are never truncated
+MIN_TRUNCATE_CHARS = 200
+
+# Paths are tuples of dict keys / list indexes
+Path = Tuple[Any, ...]
+
+# Argument selecting the next page of a paginated result, declared in the
+# inputSchema of every paginated tool (see declare_result_offset)
+RESULT_OFFSET_PARAM = {
+    "type": "integer",
+    "minimum": 0,
+    "description": "Only when a previous result was paginated (\"_shaping\" with next_offset): "
+                   "pass that next_offset to get the next page. Default: 0"
+}
+
+
+def measure(value: Any) -> int:
+    """Approximate length of value serialized as compact JSON (without escapes)"""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return 1 + sum(len(str(k)) + 4 + measure(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 1 + sum(measure(v) + 1 for v in value)
+    if value is None or isinstance(value, bool):
+        return 5
+    return len(str(value))
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate token count of a result"""
+    return measure(value) // CHARS_PER_TOKEN + 1
+
+
+def parse_token_budget(value: Any) -> Optional[int]:
+    """
+    Parse a caller-provided result budget in tokens
+
+    Returns:
+        Positive number of tokens, or None if missing/invalid
+    """
+    if value is None or value == "":
+        return None
+    try:
+        tokens = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return tokens if tokens > 0 else None
+
+
+def budget_from_meta(params: Dict[str, Any]) -> Optional[int]:
+    """Read a result budget from JSON-RPC params._meta.max_result_tokens"""
+    meta = params.get("_meta") if isinstance(params, dict) else None
+    if not isinstance(meta, dict):
+        return None
+    return parse_token_budget(meta.get("max_result_tokens"))
+
+
+def _collect(value: Any, path: Path, arrays: List[Tuple[int, Path]], strings: List[Tuple[int, Path]]):
+    """Find arrays and long strings with their sizes"""
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _collect(v, path + (k,), arrays, strings)
+    elif isinstance(value, list):
+        if len(value) > 1:
+            arrays.append((measure(value), path))
+        for i, v in enumerate(value):
+            _collect(v, path + (i,), arrays, strings)
+    elif isinstance(value, str) and len(value) > MIN_TRUNCATE_CHARS:
+        strings.append((len(value), path))
+
+
+def _get(value: Any, path: Path) -> Any:
+    for part in path:
+        value = value[part]
+    return value
+
+
+def _replace(value: Any, path: Path, new: Any) -> Any:
+    """Copy of value with the node at path replaced (copy-on-write)"""
+    if not path:
+        return new
+    head, rest = path[0], path[1:]
+    if isinstance(value, dict):
+        copy = dict(value)
+    else:
+        copy = list(value)
+    copy[head] = _replace(value[head], rest, new)
+    return copy
+
+
+def _drop_fields(value: Any, fields: frozenset, dropped: set) -> Any:
+    """Copy of value without the given keys at any depth (unchanged nodes are shared)"""
+    if isinstance(value, dict):
+        changed = False
+        result = {}
+        for k, v in value.items():
+            if k in fields:
+                dropped.add(k)
+                changed = True
+                continue
+            new = _drop_fields(v, fields, dropped)
+            changed = changed or new is not v
+            result[k] = new
+        return result if changed else value
+    if isinstance(value, list):
+        items = [_drop_fields(v, fields, dropped) for v in value]
+        return items if any(a is not b for a, b in zip(items, value)) else value
+    return value
+
+
+def _parallel_paths(value: Any, path: Path, length: int, groups: Sequence[Sequence[str]]) -> List[Path]:
+    """Sibling arrays declared parallel to the array at path (same parent, same length)"""
+    if not path or not groups:
+        return []
+    parent = _get(value, path[:-1])
+    if not isinstance(parent, dict):
+        return []
+    for group in groups:
+        if path[-1] in group:
+            return [
+                path[:-1] + (key,) for key in group
+                if key != path[-1] and isinstance(parent.get(key), list) and len(parent[key]) == length
+            ]
+    return []
+
+
+def _path_label(path: Path) -> str:
+    return ".".join(str(part) for part in path) or "(root)"
+
+
+def shape_result(
+    result: Any,
+    max_tokens: int,
+    drop_fields: Sequence[str] = (),
+    offset: int = 0,
+    paginated: bool = True,
+    parallel_fields: Sequence[Sequence[str]] = ()
+) -> Any:
+    """
+    Fit a tool result into a token budget
+
+    Args:
+        result: Tool result (not modified)
+        max_tokens: Token budget for the result
+        drop_fields: Keys that may be removed first when over budget
+        offset: Skip this many items of the largest array (next page)
+        paginated: The tool accepts result_offset (controls the hint)
+        parallel_fields: Groups of sibling keys whose arrays are aligned by
+            index; paginating one slices the others with the same window
+
+    Returns:
+        The result itself if it fits, else a reduced copy with a "_shaping"
+        report ({"original_tokens", "tokens", "budget_tokens", "removed": [...]})
+    """
+    original_tokens = estimate_tokens(result)
+    if original_tokens <= max_tokens and not offset:
+        return result
+
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+    shaped = result
+    removed: List[Dict[str, Any]] = []
+
+    # 1. Declared low-value fields
+    if drop_fields and original_tokens > max_tokens:
+        dropped: set = set()
+        shaped = _drop_fields(shaped, frozenset(drop_fields), dropped)
+        if dropped:
+            removed.append({"action": "drop_fields", "fields": sorted(dropped)})
+
+    # Size is measured once and then updated as parts are replaced
+    size = measure(shaped)
+
+    # 2. Paginate arrays, largest first
+    paged = set()
+    first_page = True
+    while first_page or size > budget_chars:
+        arrays: List[Tuple[int, Path]] = []
+        _collect(shaped, (), arrays, [])
+        candidates = [a for a in arrays if a[1] not in paged and not any(a[1][:len(p)] == p for p in paged)]
+        if not candidates:
+            break
+        array_size, path = max(candidates, key=lambda a: a[0])
+        items = _get(shaped, path)
+        siblings = [(p, _get(shaped, p)) for p in _parallel_paths(shaped, path, len(items), parallel_fields)]
+        group_size = array_size + sum(measure(values) for _, values in siblings)
+        start = offset if first_page else 0
+        first_page = False
+
+        room = budget_chars - (size - group_size)
+        kept, used = 0, 2 + 2 * len(siblings)
+        for index in range(start, len(items)):
+            item_size = measure(items[index]) + 1 + sum(measure(values[index]) + 1 for _, values in siblings)
+            if kept and used + item_size > room:
+                break
+            kept += 1
+            used += item_size
+
+        paged.add(path)
+        paged.update(p for p, _ in siblings)
+        if start == 0 and kept == len(items):
+            # Fits as is - only reached when an offset was requested but the array is small
+            continue
+
+        next_offset = start + kept
+        for p, values in [(path, items)] + siblings:
+            window = values[start:next_offset]
+            shaped = _replace(shaped, p, window)
+            size += measure(window) - measure(values)
+        page = {
+            "action": "paginate",
+            "path": _path_label(path),
+            "total": len(items),
+            "offset": start,
+            "returned": kept,
+            "next_offset": next_offset if next_offset < len(items) else None
+        }
+        if siblings:
+            page["parallel"] = [_path_label(p) for p, _ in siblings]
+        removed.append(page)
+
+    # 3. Truncate the longest strings (structure is unchanged, so paths stay valid)
+    if size > budget_chars:
+        strings: List[Tuple[int, Path]] = []
+        _collect(shaped, (), [], strings)
+        strings.sort(key=lambda s: s[0], reverse=True)
+    else:
+        strings = []
+    for length, path in strings:
+        excess = size - budget_chars
+        if excess <= 0:
+            break
+        keep = max(MIN_TRUNCATE_CHARS, length - excess - 32)
+        if keep >= length:
+            # Remaining strings are shorter still
+            break
+        truncated = _get(shaped, path)[:keep] + " [truncated]"
+        shaped = _replace(shaped, path, truncated)
+        size += len(truncated) - length
+        removed.append({
+            "action": "truncate",
+            "path": _path_label(path),
+            "chars": length,
+            "returned_chars": keep
+        })
+
+    report = {
+        "original_tokens": original_tokens,
+        "tokens": estimate_tokens(shaped),
+        "budget_tokens": max_tokens,
+        "removed": removed
+    }
+    if any(r["action"] == "paginate" and r["next_offset"] is not None for r in removed):
+        if paginated:
+            report["hint"] = "Result is paginated - call the tool again with result_offset=<next_offset> for more items"
+        else:
+            report["hint"] = "Result was shortened to fit the token budget - narrow the request to see the rest"
+
+    if isinstance(shaped, dict):
+        return {**shaped, "_shaping": report}
+    return {"items": shaped, "_shaping": report}
+
+
+def shape_tool_result(
+    tool_name: str,
+    result: Any,
+    tool_args: Optional[Dict[str, Any]] = None,
+    max_tokens: Optional[int] = None
+) -> Any:
+    """
+    Shape a tool's result with the tool's declared budget and droppable fields
+
+    Args:
+        tool_name: Tool that produced the result
+        result: Tool result (not modified)
+        tool_args: Tool arguments ("result_offset" selects the next page)
+        max_tokens: Per-request budget; overrides the tool's budget if given
+    """
+    # Imported here - tools imports the tool registry and schemas
+    from app.quendoo.tools import get_result_budget, get_tool_registry
+
+    spec = get_tool_registry().get(tool_name)
+    budget = max_tokens or get_result_budget(tool_name)
+    if not budget:
+        return result
+
+    try:
+        offset = max(0, int((tool_args or {}).get("result_offset") or 0))
+    except (TypeError, ValueError):
+        offset = 0
+
+    shaped = shape_result(
+        result, budget,
+        drop_fields=spec.drop_fields if spec else (),
+        offset=offset if spec is None or spec.paginated else 0,
+        paginated=spec.paginated if spec else True,
+        parallel_fields=spec.parallel_fields if spec else ()
+    )
+    if shaped is not result:
+        report = shaped["_shaping"]
+        print(f"[Shaping] {tool_name}: {report['original_tokens']} -> {report['tokens']} tokens "
+              f"(budget {budget}, {len(report['removed'])} reductions)")
+    return shaped
+
+
+def declare_result_offset(schemas: List[Dict[str, Any]], specs: Sequence[Any]):
+    """
+    Add result_offset to the inputSchema of every paginated tool
+
+    Args:
+        schemas: Tool schemas (QUENDOO_TOOLS), updated in place
+        specs: ToolSpecs; those with paginated=True get the argument
+    """
+    paginated = {spec.name for spec in specs if spec.paginated}
+    for schema in schemas:
+        if schema["name"] in paginated:
+            properties = schema.setdefault("inputSchema", {}).setdefault("properties", {})
+            properties.setdefault("result_offset", RESULT_OFFSET_PARAM)
@@ -0,0 +1,124 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller starts the work, everyone else awaits the same task and gets
+the same result (or exception).
+"""
+import asyncio
+import copy
+import pickle
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """One in-flight call and the snapshot its followers are served from"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self.followers = 0
+        self.snapshot: Any = None
+        self.pickled = False
+
+    def take_snapshot(self, result: Any):
+        """Freeze the result as it resolved, before any caller can modify it"""
+        try:
+            self.snapshot = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            self.pickled = True
+        except Exception:
+            self.snapshot = copy.deepcopy(result)
+
+    def result_copy(self) -> Any:
+        """Independent copy of the resolved result for one follower"""
+        if self.pickled:
+            # Much cheaper than deepcopy for large JSON-like results
+            return pickle.loads(self.snapshot)
+        return copy.deepcopy(self.snapshot)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent async calls
+
+    Example usage:
+        flight = SingleFlight()
+
+        # Both coroutines trigger only ONE upstream request
+        await asyncio.gather(
+            flight.do(key, lambda: client.fetch()),
+            flight.do(key, lambda: client.fetch()),
+        )
+    """
+
+    def __init__(self):
+        """Initialize with no in-flight calls"""
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key for all concurrent callers
+
+        Args:
+            key: Identity of the call (e.g., tenant + endpoint + params)
+            fn: Zero-argument coroutine factory performing the actual call
+
+        Returns:
+            Result of fn. The leader gets the result object itself; followers
+            get copies of a snapshot taken the moment the call resolved, so no
+            caller can see another caller's modifications.
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.followers += 1
+            flight.followers += 1
+            # shield: a cancelled follower must not cancel the shared call
+            await asyncio.shield(flight.task)
+            return flight.result_copy()
+
+        self.leaders += 1
+        flight = _Flight()
+        self._inflight[key] = flight
+
+        async def run() -> Any:
+            try:
+                result = await fn()
+            finally:
+                # No new followers can join once the result is being handed out
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            if flight.followers:
+                flight.take_snapshot(result)
+            return result
+
+        flight.task = asyncio.ensure_future(run())
+
+        def _retrieve(done: asyncio.Future):
+            # Mark exception as retrieved even if every caller was cancelled
+            if not done.cancelled():
+                done.exception()
+
+        flight.task.add_done_callback(_retrieve)
+
+        return await asyncio.shield(flight.task)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing counters"""
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.followers
+        }
+
+
+# Global instance for Quendoo GETs
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create global SingleFlight"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
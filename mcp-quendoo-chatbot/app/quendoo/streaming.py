@@ -0,0 +1,119 @@
+"""
+Streaming JSON decoding for large Quendoo responses
+
+Parses a response body incrementally with ijson and hands the members of one
+top-level collection (e.g. "data") to a callback one at a time, so the raw
+body and the full object graph are never held in memory at once.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import httpx
+import ijson
+
+_START_EVENTS = ("start_map", "start_array")
+_END_EVENTS = ("end_map", "end_array")
+
+# Callback receiving (key, value) - key is the object key, or None for array items
+MemberCallback = Callable[[Optional[str], Any], None]
+
+
+class ResponseReader:
+    """File-like async reader over a streamed httpx response (for ijson)"""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+        self._eof = False
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all remaining bytes if size < 0)"""
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+async def stream_json_members(
+    response: httpx.Response,
+    field: str,
+    on_member: MemberCallback
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Stream a top-level JSON object, delivering members of one field
+
+    For {"data": {"44": {...}, "45": {...}}, "status": "ok"} and field="data",
+    on_member is called with ("44", {...}) and ("45", {...}); for an array field
+    each item is delivered with key None. Other top-level keys are collected.
+
+    Args:
+        response: Streamed httpx response (client.send(..., stream=True))
+        field: Top-level key whose members are streamed
+        on_member: Callback for each member
+
+    Returns:
+        (other top-level keys, True if field was an object/array)
+    """
+    meta: Dict[str, Any] = {}
+    found = False
+    top_key = None
+    in_field = False
+    member_key = None
+
+    builder = None
+    depth = 0
+    target: Tuple[str, Any] = ("meta", None)
+
+    def finish(value: Any):
+        kind, key = target
+        if kind == "member":
+            on_member(key, value)
+        else:
+            meta[key] = value
+
+    async for prefix, event, value in ijson.parse_async(ResponseReader(response), use_float=True):
+        # Building a nested value - feed events until it is complete
+        if builder is not None:
+            builder.event(event, value)
+            if event in _START_EVENTS:
+                depth += 1
+            elif event in _END_EVENTS:
+                depth -= 1
+            if depth == 0:
+                finish(builder.value)
+                builder = None
+            continue
+
+        if in_field:
+            if prefix == field:
+                if event == "map_key":
+                    member_key = value
+                elif event in _END_EVENTS:
+                    in_field = False
+                continue
+            target = ("member", member_key)
+        elif prefix == "":
+            if event == "map_key":
+                top_key = value
+            continue
+        elif top_key == field and event in _START_EVENTS:
+            in_field = True
+            found = True
+            member_key = None
+            continue
+        else:
+            target = ("meta", top_key)
+
+        if event in _START_EVENTS:
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        else:
+            finish(value)
+
+    return meta, found
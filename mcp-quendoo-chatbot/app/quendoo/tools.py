@@ -10,8 +10,15 @@ from bs4 import BeautifulSoup
 from collections import defaultdict
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
+from app.config import get_settings
 from app.quendoo.client import QuendooAPIClient
+from app.quendoo.registry import ToolRegistry, ToolSpec, CachePolicy
+from app.quendoo.cache import get_tool_result_cache
+from app.quendoo.shaping import declare_result_offset
+from app.http_clients import get_http_client, EXTERNAL_POOL
+from app.deadline import timeout_for
 
+settings = get_settings()
 
 # Tool definitions with schemas
 QUENDOO_TOOLS = [
@@ -51,7 +58,7 @@ QUENDOO_TOOLS = [
     },
     {
         "name": "get_availability",
-        "description": "Get availability for a date range and system (qdo or ext).",
+        "description": "Get availability for a date range and system (qdo or ext). For long ranges or many rooms use format='columnar': one shared 'dates' list plus a 'qty' array per room id (qty[i][j] = rooms free for room_ids[i] on dates[j], null if unknown) - much smaller than the default row list.",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -66,6 +73,12 @@ QUENDOO_TOOLS = [
                 "sysres": {
                     "type": "string",
                     "description": "System reservation type ('qdo' for Quendoo or 'ext' for external)"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Output layout: 'rows' (one object per room and date) or 'columnar' (shared date axis with dense qty arrays per room). Default: 'rows'",
+                    "enum": ["rows", "columnar"],
+                    "default": "rows"
                 }
             },
             "required": ["date_from", "date_to", "sysres"]
@@ -73,7 +86,7 @@ QUENDOO_TOOLS = [
     },
     {
         "name": "update_availability",
-        "description": "Update availability values for rooms or external rooms.",
+        "description": "Update availability values for rooms or external rooms. For large updates (e.g. season openings) set bulk=true: updates are sent in chunks per room and date, and the result lists which chunks failed together with failed_values that can be resubmitted.",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -83,6 +96,17 @@ QUENDOO_TOOLS = [
                     "items": {
                         "type": "object"
                     }
+                },
+                "bulk": {
+                    "type": "boolean",
+                    "description": "Send updates in concurrent chunks and return a per-chunk success/failure report. Default: false.",
+                    "default": False
+                },
+                "chunk_size": {
+                    "type": "integer",
+                    "description": "Maximum number of values per chunk in bulk mode. Optional.",
+                    "minimum": 1,
+                    "maximum": 1000
                 }
             },
             "required": ["values"]
@@ -93,7 +117,13 @@ QUENDOO_TOOLS = [
         "description": "List all bookings for the property.",
         "inputSchema": {
             "type": "object",
-            "properties": {}
+            "properties": {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Force a sync with Quendoo instead of reading the recently synced bookings. Optional.",
+                    "default": False
+                }
+            }
         }
     },
     {
@@ -147,6 +177,64 @@ QUENDOO_TOOLS = [
             "required": ["date_from", "nights", "guests"]
         }
     },
+    {
+        "name": "scan_booking_offers",
+        "description": "Find the cheapest offers across many check-in dates, stay lengths and guest configurations in ONE call (e.g. 'cheapest 3-night stay in March for 2 adults'). Use instead of calling get_booking_offers repeatedly. Returns the cheapest offers ranked by total price and a compact price matrix (one row per date/nights/occupancy with its lowest price).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "date_from": {
+                    "type": "string",
+                    "description": "First check-in date to try in YYYY-MM-DD format."
+                },
+                "date_to": {
+                    "type": "string",
+                    "description": "Last check-in date to try in YYYY-MM-DD format. Defaults to date_from."
+                },
+                "step_days": {
+                    "type": "integer",
+                    "description": "Days between tried check-in dates (e.g. 7 to try one check-in per week). Default: 1.",
+                    "default": 1,
+                    "minimum": 1
+                },
+                "nights": {
+                    "type": "array",
+                    "description": "Stay lengths to try, e.g. [3] or [2, 3, 4].",
+                    "items": {
+                        "type": "integer"
+                    }
+                },
+                "occupancies": {
+                    "type": "array",
+                    "description": "Guest configurations to try. Each item has the same format as get_booking_offers guests, e.g. [[{\"adults\": 2, \"children_by_ages\": []}], [{\"adults\": 2, \"children_by_ages\": [6]}]].",
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object"
+                        }
+                    }
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "Number of cheapest offers to return. Default: 10.",
+                    "default": 10
+                },
+                "bm_code": {
+                    "type": "string",
+                    "description": "Booking module code. If not provided, uses first active module. Optional."
+                },
+                "api_lng": {
+                    "type": "string",
+                    "description": "Language code. Optional."
+                },
+                "currency": {
+                    "type": "string",
+                    "description": "Currency code (e.g., 'BGN', 'EUR', 'USD'). Optional."
+                }
+            },
+            "required": ["date_from", "nights", "occupancies"]
+        }
+    },
     {
         "name": "ack_booking",
         "description": "Acknowledge a booking using booking_id and revision_id.",
@@ -355,7 +443,8 @@ Example use cases:
 - "Identify peak booking periods"
 - "Compare availability across room types"
 
-This tool takes the data from the previous step (using {RESULT} placeholder) and applies intelligent analysis using Claude AI.""",
+This tool takes the data from the previous step (using {RESULT} placeholder) and applies intelligent analysis using Claude AI.
+To avoid copying large results into this call, run it as a step of run_tool_pipeline where {RESULT} is resolved on the server.""",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -372,11 +461,102 @@ This tool takes the data from the previous step (using {RESULT} placeholder) and
                     "description": "Desired output format: 'text' (human-readable summary), 'json' (structured data), 'table' (markdown table), 'html_table' (HTML table for emails), 'list' (bulleted list). Default: 'text'",
                     "enum": ["text", "json", "table", "html_table", "list"],
                     "default": "text"
+                },
+                "query": {
+                    "type": "object",
+                    "description": "Optional structured query (same fields as query_data: filter, group_by, aggregates, select, sort, limit). If given, the data is processed locally in milliseconds instead of by the model and 'instruction' is only informational."
                 }
             },
             "required": ["data", "instruction"]
         }
     },
+    {
+        "name": "query_data",
+        "description": """Filter, group, aggregate and rank data from previous tool results - computed exactly and instantly, without AI.
+
+Prefer this over analyze_data whenever the question is a plain lookup or calculation:
+- "Dates with less than 5 available rooms" -> filter qty lt 5
+- "Bookings per month" -> group_by ["arrival_date:month"], aggregates [{"op": "count"}]
+- "Top 10 bookings by price" -> sort [{"field": "total_price", "desc": true}], limit 10
+- "Average availability per room" -> group_by ["room_id"], aggregates [{"op": "avg", "field": "qty"}]
+Use analyze_data for open-ended questions (insights, explanations, free-text summaries).
+
+Records are taken from the data itself if it is a list, otherwise from its largest list (or records_path).
+Columnar get_availability results are expanded to {room_id, date, qty} records.
+Fields may be dotted paths ("guest.name"); date fields accept :day, :week, :month, :year or :weekday for grouping.""",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "data": {
+                    "type": "string",
+                    "description": "The data to query (usually {RESULT} of a previous step in run_tool_pipeline)"
+                },
+                "filter": {
+                    "type": "array",
+                    "description": "Conditions, all must match. op: eq, ne, lt, lte, gt, gte, between ([low, high]), in, not_in, contains, startswith, exists",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "field": {"type": "string"},
+                            "op": {"type": "string", "default": "eq"},
+                            "value": {}
+                        },
+                        "required": ["field"]
+                    }
+                },
+                "group_by": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Fields to group by, e.g. [\"room_id\"] or [\"date:month\"]"
+                },
+                "aggregates": {
+                    "type": "array",
+                    "description": "Values computed per group (default: count). op: count, count_distinct, sum, avg, min, max. Output column is 'as' or '<op>_<field>'",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "op": {"type": "string"},
+                            "field": {"type": "string"},
+                            "as": {"type": "string"}
+                        },
+                        "required": ["op"]
+                    }
+                },
+                "select": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Fields to return per record (without group_by/aggregates). Default: whole records"
+                },
+                "sort": {
+                    "type": "array",
+                    "description": "Sort keys applied to the output rows",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "field": {"type": "string"},
+                            "desc": {"type": "boolean", "default": False}
+                        },
+                        "required": ["field"]
+                    }
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum rows to return (top-k together with sort). Default: 500"
+                },
+                "records_path": {
+                    "type": "string",
+                    "description": "Dotted path to the list of records inside the data, if not detected automatically"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "'json' (rows only) or also render rows as 'table', 'html_table', 'list' or 'text' under 'analysis'. Default: 'json'",
+                    "enum": ["json", "text", "table", "html_table", "list"],
+                    "default": "json"
+                }
+            },
+            "required": ["data"]
+        }
+    },
     {
         "name": "query_excel_data",
         "description": """Query structured data from uploaded Excel files with intelligent filtering, sorting, and value extraction.
@@ -615,9 +795,148 @@ EXAMPLES:
             },
             "required": ["urls", "checkIn", "checkOut"]
         }
+    },
+    {
+        "name": "run_tool_pipeline",
+        "description": """Run several tools in one call, passing results between them on the server.
+
+Use this instead of calling tools one by one when a later step only needs an earlier step's output
+(e.g. get_availability -> analyze_data -> send_quendoo_email). Intermediate results never come back
+to you, so large data does not have to be copied into the next call.
+
+Reference earlier results in any argument:
+- "{RESULT}" - whole result of the previous step
+- "{RESULT:step_id}" - whole result of the step with that id
+- "{RESULT:step_id.field.0.name}" - a field inside that result (e.g. "{RESULT:summary.analysis}")
+
+Steps that do not reference each other run concurrently. If a step fails, steps depending on it are skipped.
+Only the results of the final steps (those nothing depends on) are returned, unless "outputs" lists step ids.
+
+Example:
+{"steps": [
+  {"id": "avail", "tool_name": "get_availability", "tool_args": {"date_from": "2026-03-01", "date_to": "2026-03-31", "sysres": "qdo"}},
+  {"id": "summary", "tool_name": "analyze_data", "tool_args": {"data": "{RESULT}", "instruction": "Dates with less than 5 rooms", "format": "html_table"}},
+  {"id": "mail", "tool_name": "send_quendoo_email", "tool_args": {"to": "gm@hotel.com", "subject": "Low availability", "message": "{RESULT:summary.analysis}", "html": true}}
+]}""",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "steps": {
+                    "type": "array",
+                    "description": "Tool calls in order. Each step may reference results of earlier steps only.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {
+                                "type": "string",
+                                "description": "Step id used in {RESULT:id} references. Default: step1, step2, ..."
+                            },
+                            "tool_name": {
+                                "type": "string",
+                                "description": "Name of the tool to run"
+                            },
+                            "tool_args": {
+                                "type": "object",
+                                "description": "Tool arguments; string values may contain {RESULT...} references"
+                            },
+                            "depends_on": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Extra step ids to wait for (references are detected automatically)"
+                            }
+                        },
+                        "required": ["tool_name"]
+                    }
+                },
+                "outputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Step ids whose results to return. Default: final steps only"
+                }
+            },
+            "required": ["steps"]
+        }
     }
 ]
 
+# Handler, default latency budget (seconds), cache policy and result shaping of
+# every tool. A caller can override the latency budget per call via the
+# X-Tool-Timeout header or JSON-RPC params._meta.timeout, and the result token
+# budget via X-Result-Max-Tokens or params._meta.max_result_tokens. Read-only
+# tools whose answers are stable for a while use CachePolicy.MEMO: repeated
+# identical calls of a tenant/hotel within memo_ttl seconds return the stored
+# result (purge via DELETE /admin/tools/cache). Handler modules are imported
+# by the registry on warmup (or on first use, off the event loop).
+DEFAULT_TOOL_TIMEOUT_SECONDS = 60.0
+
+_PMS = "app.quendoo.handlers.pms"
+_INTEGRATIONS = "app.quendoo.handlers.integrations"
+_DOCUMENTS = "app.quendoo.handlers.documents"
+_ANALYSIS = "app.quendoo.handlers.analysis"
+_SCRAPER = "app.quendoo.handlers.scraper"
+_QUERY = "app.quendoo.handlers.query"
+_PIPELINE = "app.quendoo.handlers.pipeline"
+
+TOOL_SPECS = [
+    ToolSpec("get_property_settings", f"{_PMS}:get_property_settings", timeout=20.0, cache=CachePolicy.UPSTREAM),
+    ToolSpec("get_rooms_details", f"{_PMS}:get_rooms_details", timeout=20.0, cache=CachePolicy.UPSTREAM),
+    # Columnar results: qty[i] belongs to room_ids[i]
+    ToolSpec("get_availability", f"{_PMS}:get_availability", timeout=45.0, drop_fields=("room_name", "is_opened"),
+             parallel_fields=[("room_ids", "qty")]),
+    ToolSpec("update_availability", f"{_PMS}:update_availability", timeout=60.0, cache=CachePolicy.WRITE),
+    ToolSpec("get_bookings", f"{_PMS}:get_bookings", timeout=45.0, cache=CachePolicy.UPSTREAM),
+    ToolSpec("get_booking_offers", f"{_PMS}:get_booking_offers", timeout=30.0),
+    ToolSpec("scan_booking_offers", f"{_PMS}:scan_booking_offers", timeout=60.0),
+    ToolSpec("ack_booking", f"{_PMS}:ack_booking", timeout=20.0, cache=CachePolicy.WRITE),
+    ToolSpec("post_room_assignment", f"{_PMS}:post_room_assignment", timeout=20.0, cache=CachePolicy.WRITE),
+    ToolSpec("post_external_property_data", f"{_PMS}:post_external_property_data", timeout=30.0, cache=CachePolicy.WRITE),
+    ToolSpec("make_call", f"{_INTEGRATIONS}:make_call", timeout=35.0, cache=CachePolicy.WRITE),
+    ToolSpec("send_quendoo_email", f"{_INTEGRATIONS}:send_quendoo_email", timeout=35.0, cache=CachePolicy.WRITE),
+    ToolSpec("fetch_url", f"{_INTEGRATIONS}:fetch_url", timeout=35.0, cache=CachePolicy.MEMO, memo_ttl=300.0),
+    ToolSpec("search_hotel_documents", f"{_DOCUMENTS}:search_hotel_documents", timeout=30.0, cache=CachePolicy.MEMO, memo_ttl=300.0),
+    ToolSpec("list_hotel_documents", f"{_DOCUMENTS}:list_hotel_documents", timeout=20.0, cache=CachePolicy.MEMO, memo_ttl=120.0),
+    ToolSpec("query_excel_data", f"{_DOCUMENTS}:query_excel_data", timeout=30.0, cache=CachePolicy.MEMO, memo_ttl=300.0),
+    # Inputs above ANALYSIS_CHUNK_CHARS run as several model calls (map-reduce)
+    ToolSpec("analyze_data", f"{_ANALYSIS}:analyze_data", timeout=180.0, paginated=False),
+    ToolSpec("query_data", f"{_QUERY}:query_data", timeout=20.0),
+    ToolSpec("scrape_competitor_prices", f"{_SCRAPER}:scrape_competitor_prices", timeout=120.0, cache=CachePolicy.WRITE),
+    ToolSpec("check_scrape_status", f"{_SCRAPER}:check_scrape_status", timeout=20.0),
+    ToolSpec("scrape_and_compare_hotels", f"{_SCRAPER}:scrape_and_compare_hotels", timeout=120.0, cache=CachePolicy.WRITE),
+    # Steps run under their own budgets, capped by the pipeline's; write steps
+    # purge the memo themselves through ToolRegistry.dispatch
+    ToolSpec("run_tool_pipeline", f"{_PIPELINE}:run_tool_pipeline", timeout=180.0, paginated=False),
+]
+
+# Paginated tools accept result_offset (the "_shaping" hint asks for it)
+declare_result_offset(QUENDOO_TOOLS, TOOL_SPECS)
+
+# Global registry instance
+_tool_registry = None
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Get or create global ToolRegistry"""
+    global _tool_registry
+    if _tool_registry is None:
+        memo = get_tool_result_cache() if settings.TOOL_MEMO_ENABLED else None
+        _tool_registry = ToolRegistry(QUENDOO_TOOLS, TOOL_SPECS, memo=memo)
+    return _tool_registry
+
+
+def get_tool_timeout(tool_name: str) -> float:
+    """Get default latency budget of a tool"""
+    return get_tool_registry().get_timeout(tool_name, DEFAULT_TOOL_TIMEOUT_SECONDS)
+
+
+def get_result_budget(tool_name: str) -> int:
+    """Get result token budget of a tool (0 = results are not shaped)"""
+    if not settings.RESULT_SHAPING_ENABLED:
+        return 0
+    spec = get_tool_registry().get(tool_name)
+    if spec and spec.max_result_tokens:
+        return spec.max_result_tokens
+    return settings.RESULT_MAX_TOKENS
+
 
 # Automation client for make_call
 class AutomationClient:
@@ -642,10 +961,10 @@ class AutomationClient:
         payload = {"phone": phone, "message": message, "language": language}
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(url, json=payload, headers=headers)
-                resp.raise_for_status()
-                return resp.json() if resp.content else {"status": resp.status_code}
+            client = get_http_client(self.base_url)
+            resp = await client.post(url, json=payload, headers=headers, timeout=timeout_for(30, "make_call"))
+            resp.raise_for_status()
+            return resp.json() if resp.content else {"status": resp.status_code}
         except httpx.HTTPStatusError as exc:
             raise RuntimeError(
                 f"Automation request failed with status {exc.response.status_code}: {exc.response.text}"
@@ -726,10 +1045,10 @@ class EmailClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(self.EMAIL_SERVICE_URL, json=payload, headers=headers)
-                resp.raise_for_status()
-                return resp.json()
+            client = get_http_client(self.EMAIL_SERVICE_URL)
+            resp = await client.post(self.EMAIL_SERVICE_URL, json=payload, headers=headers, timeout=timeout_for(30, "send_quendoo_email"))
+            resp.raise_for_status()
+            return resp.json()
         except httpx.HTTPStatusError as exc:
             raise RuntimeError(
                 f"Email request failed with status {exc.response.status_code}: {exc.response.text}"
@@ -839,19 +1158,20 @@ class WebFetchService:
                     "error": error_msg
                 }
 
-            # Validate timeout
-            timeout = max(1, min(timeout, 30))
+            # Validate timeout (and never wait past the caller's deadline)
+            timeout = timeout_for(max(1, min(timeout, 30)), "fetch_url")
 
-            # Fetch content
-            async with httpx.AsyncClient(
+            # Fetch content (arbitrary external hosts share one pool)
+            client = get_http_client(EXTERNAL_POOL)
+            response = await client.get(
+                url,
                 timeout=timeout,
                 follow_redirects=True,
                 headers={
                     'User-Agent': 'QuendooBot/1.0 (Hotel Management Assistant)'
                 }
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
+            )
+            response.raise_for_status()
 
             content_type = response.headers.get('content-type', '').lower()
 
@@ -931,7 +1251,7 @@ class WebFetchService:
         except httpx.TimeoutException:
             return {
                 "success": False,
-                "error": f"Request timed out after {timeout} seconds"
+                "error": f"Request timed out after {round(timeout, 1)} seconds"
             }
         except httpx.HTTPStatusError as e:
             return {
@@ -976,684 +1296,8 @@ async def execute_quendoo_tool(tool_name: str, tool_args: Dict[str, Any], api_ke
     """
     client = QuendooAPIClient(api_key)
 
-    # Route to appropriate tool handler
-    if tool_name == "get_property_settings":
-        return await client.get_property_settings(
-            api_lng=tool_args.get("api_lng"),
-            names=tool_args.get("names")
-        )
-
-    elif tool_name == "get_rooms_details":
-        return await client.get_rooms_details(
-            api_lng=tool_args.get("api_lng"),
-            room_id=tool_args.get("room_id")
-        )
-
-    elif tool_name == "get_availability":
-        result = await client.get_availability(
-            date_from=tool_args["date_from"],
-            date_to=tool_args["date_to"],
-            sysres=tool_args["sysres"]
-        )
-
-        # Transform Quendoo API format to frontend-friendly format
-        # Input: {"data": {"44": {"2026-02-01": 10, "2026-02-02": 10, ...}, "45": {...}}}
-        # Output: {"availability": [{"room_id": 44, "date": "2026-02-01", "qty": 10, "is_opened": true}, ...]}
-        if result and "data" in result:
-            availability_list = []
-            for room_id_str, dates_dict in result["data"].items():
-                room_id = int(room_id_str)
-                for date_str, qty in dates_dict.items():
-                    availability_list.append({
-                        "room_id": room_id,
-                        "room_name": f"Room {room_id}",  # Will be enriched by frontend if needed
-                        "date": date_str,
-                        "qty": qty,
-                        "is_opened": True
-                    })
-
-            # Sort by room_id and date
-            availability_list.sort(key=lambda x: (x["room_id"], x["date"]))
-
-            return {
-                "date_from": tool_args["date_from"],
-                "date_to": tool_args["date_to"],
-                "availability": availability_list
-            }
-
-        return result
-
-    elif tool_name == "update_availability":
-        return await client.update_availability(
-            values=tool_args["values"]
-        )
-
-    elif tool_name == "get_bookings":
-        result = await client.get_bookings()
-        print(f"[DEBUG] get_bookings result type: {type(result)}")
-        print(f"[DEBUG] get_bookings result keys: {result.keys() if isinstance(result, dict) else 'N/A'}")
-        if isinstance(result, dict) and "data" in result:
-            print(f"[DEBUG] get_bookings data length: {len(result['data']) if isinstance(result['data'], list) else 'not a list'}")
-        print(f"[DEBUG] get_bookings full result: {result}")
-        return result
-
-    elif tool_name == "get_booking_offers":
-        return await client.get_booking_offers(
-            date_from=tool_args["date_from"],
-            nights=tool_args["nights"],
-            bm_code=tool_args.get("bm_code"),
-            api_lng=tool_args.get("api_lng"),
-            guests=tool_args.get("guests"),
-            currency=tool_args.get("currency")
-        )
-
-    elif tool_name == "ack_booking":
-        return await client.ack_booking(
-            booking_id=tool_args["booking_id"],
-            revision_id=tool_args["revision_id"]
-        )
-
-    elif tool_name == "post_room_assignment":
-        return await client.post_room_assignment(
-            booking_id=tool_args["booking_id"],
-            revision_id=tool_args["revision_id"]
-        )
-
-    elif tool_name == "post_external_property_data":
-        return await client.post_external_property_data(
-            data=tool_args["data"]
-        )
-
-    elif tool_name == "make_call":
-        automation_client = AutomationClient()
-        result = await automation_client.make_call(
-            phone=tool_args["phone"],
-            message=tool_args["message"],
-            language=tool_args.get("language", "en-US")
-        )
-        return {"success": True, "result": result}
-
-    elif tool_name == "send_quendoo_email":
-        email_client = EmailClient()
-        result = await email_client.send_email(
-            to=tool_args["to"],
-            subject=tool_args["subject"],
-            message=tool_args["message"],
-            html=tool_args.get("html", False)  # Default to plain text if not specified
-        )
-        return {"success": True, "result": result}
-
-    # === DOCUMENT TOOLS ===
-
-    elif tool_name == "search_hotel_documents":
-        # Import document service
-        from app.services.document_service import search_hotel_documents
-
-        # Get hotelId from tool arguments (sent by backend from JWT token)
-        hotel_id = tool_args.get("hotelId")
-        if not hotel_id:
-            return {
-                "success": False,
-                "error": "hotelId parameter is required for document search"
-            }
-
-        return await search_hotel_documents(
-            hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
-            query=tool_args["query"],
-            document_types=tool_args.get("documentTypes"),
-            top_k=tool_args.get("topK", 3)
-        )
-
-    elif tool_name == "list_hotel_documents":
-        # Import document service
-        from app.services.document_service import list_hotel_documents
-
-        # Get hotelId from tool arguments (sent by backend from JWT token)
-        hotel_id = tool_args.get("hotelId")
-        if not hotel_id:
-            return {
-                "success": False,
-                "error": "hotelId parameter is required for listing documents"
-            }
-
-        return await list_hotel_documents(
-            hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
-            document_types=tool_args.get("documentTypes")
-        )
-
-    elif tool_name == "analyze_data":
-        # Use Claude via direct Anthropic API to analyze data with specific instructions
-        import os
-        from anthropic import Anthropic
-        from google.cloud import secretmanager
-
-        data = tool_args.get("data", "")
-        instruction = tool_args.get("instruction", "")
-        output_format = tool_args.get("format", "text")
-        language = tool_args.get("language", "bulgarian")
-
-        # Truncate data if too large (max 100k chars)
-        if len(data) > 100000:
-            data = data[:100000] + "\n\n[Data truncated - too large]"
-
-        # Build prompt based on format and language
-        # For html_table, we'll first generate markdown table then convert to HTML
-        actual_format = "table" if output_format == "html_table" else output_format
-
-        format_instructions = {
-            "text": "Return the result as clear, human-readable text summary.",
-            "json": "Return the result as valid JSON only, without any markdown formatting or explanation.",
-            "table": "Return the result as a markdown table.",
-            "list": "Return the result as a bulleted markdown list."
-        }
-
-        # Language instructions
-        language_instructions = {
-            "bulgarian": "IMPORTANT: Respond ONLY in Bulgarian language. Use Bulgarian characters (а, б, в, г, д, е, ж, з, и, й, к, л, м, н, о, п, р, с, т, у, ф, х, ц, ч, ш, щ, ъ, ь, ю, я).",
-            "english": "Respond in English language."
-        }
-
-        prompt = f"""You are a data analyst. Analyze the following data according to the instruction.
-
-DATA:
-{data}
-
-INSTRUCTION:
-{instruction}
-
-OUTPUT FORMAT:
-{format_instructions.get(actual_format, format_instructions["text"])}
-
-LANGUAGE:
-{language_instructions.get(language, language_instructions["bulgarian"])}
-
-Provide only the requested output without any additional explanation or preamble."""
-
-        try:
-            # Get Anthropic API key from Secret Manager
-            project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-            secret_client = secretmanager.SecretManagerServiceClient()
-            secret_name = f"projects/{project_id}/secrets/anthropic-api-key/versions/latest"
-
-            response_secret = secret_client.access_secret_version(request={"name": secret_name})
-            api_key = response_secret.payload.data.decode("UTF-8")
-
-            # Use direct Anthropic API
-            client = Anthropic(api_key=api_key)
-
-            response = client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=4096,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            result = response.content[0].text
-
-            # Convert markdown table to HTML if html_table format requested
-            if output_format == "html_table":
-                result = markdown_table_to_html(result)
-
-            return {
-                "success": True,
-                "analysis": result,
-                "format": output_format
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Analysis failed: {str(e)}"
-            }
-
-    elif tool_name == "fetch_url":
-        web_fetch = get_web_fetch_service()
-        return await web_fetch.fetch_url(
-            url=tool_args["url"],
-            format=tool_args.get("format", "html"),
-            timeout=tool_args.get("timeout", 10),
-            api_key=api_key  # For rate limiting per hotel
-        )
-
-    elif tool_name == "query_excel_data":
-        # Import document service
-        from app.services.document_service import query_excel_structured
-
-        # Get hotelId from tool arguments (sent by backend from JWT token)
-        hotel_id = tool_args.get("hotelId")
-        if not hotel_id:
-            return {
-                "success": False,
-                "error": "hotelId parameter is required for Excel queries"
-            }
-
-        return await query_excel_structured(
-            hotel_id=hotel_id,  # Use hotel ID from JWT token (secure)
-            query=tool_args["query"],
-            file_name=tool_args.get("fileName"),
-            limit=tool_args.get("limit", 10)
-        )
-
-    elif tool_name == "scrape_competitor_prices":
-        import time
-        import hashlib
-        import asyncio
-        import os
-        from google.cloud import firestore
-
-        # Generate cache key from parameters
-        url = tool_args["url"]
-        check_in = tool_args.get("checkIn", "")
-        check_out = tool_args.get("checkOut", "")
-        adults = tool_args.get("adults", 2)
-        children = tool_args.get("children", 0)
-        rooms = tool_args.get("rooms", 1)
-
-        # Create a hash-based cache key for clean Firestore doc IDs
-        cache_string = f"{url}_{check_in}_{check_out}_{adults}_{children}_{rooms}"
-        cache_key = hashlib.md5(cache_string.encode()).hexdigest()
-
-        # Initialize Firestore
-        db = firestore.Client()
-
-        # ✅ CHECK RATE LIMIT before proceeding
-        from datetime import datetime
-        rate_limit_key = f"rate_limit_{datetime.now().strftime('%Y-%m-%d')}"  # Daily limit
-        rate_limit_ref = db.collection('scraper_rate_limits').document(rate_limit_key)
-        rate_limit_doc = rate_limit_ref.get()
-
-        current_count = rate_limit_doc.to_dict().get('count', 0) if rate_limit_doc.exists else 0
-        MAX_REQUESTS_PER_DAY = 200  # Daily limit to prevent abuse
-
-        if current_count >= MAX_REQUESTS_PER_DAY:
-            return {
-                "success": False,
-                "error": f"Daily scraping limit reached ({MAX_REQUESTS_PER_DAY} requests per day). Please try again tomorrow or contact support.",
-                "limitReached": True
-            }
-
-        cache_ref = db.collection('competitor_price_cache').document(cache_key)
-
-        # Check if cache exists and is valid
-        cache_doc = cache_ref.get()
-
-        if cache_doc.exists:
-            cache_data = cache_doc.to_dict()
-            cache_timestamp = cache_data.get('timestamp', 0)
-            cache_age_hours = (time.time() - cache_timestamp) / 3600
-
-            # If cache is less than 6 hours old and completed
-            if cache_age_hours < 6 and cache_data.get('status') == 'completed':
-                return {
-                    "success": True,
-                    "data": cache_data.get('result'),
-                    "cached": True,
-                    "cachedAt": cache_timestamp,
-                    "cacheAgeHours": round(cache_age_hours, 1)
-                }
-
-        # No valid cache - increment rate limit counter and start async scraping
-        rate_limit_ref.set({
-            'count': current_count + 1,
-            'lastRequest': time.time(),
-            'date': datetime.now().strftime('%Y-%m-%d')
-        }, merge=True)
-        # First, mark as pending in Firestore
-        cache_ref.set({
-            'status': 'pending',
-            'timestamp': time.time(),
-            'url': url,
-            'checkIn': check_in,
-            'checkOut': check_out,
-            'adults': adults,
-            'children': children,
-            'rooms': rooms
-        })
-
-        # Trigger Cloud Function async (don't wait for it)
-        cloud_function_url = os.getenv(
-            "SCRAPER_CLOUD_FUNCTION_URL",
-            "https://us-central1-quendoo-ai-dashboard.cloudfunctions.net/scrapeBooking"
-        )
-
-        payload = {
-            "url": url,
-            "checkIn": check_in,
-            "checkOut": check_out,
-            "adults": adults,
-            "children": children,
-            "rooms": rooms,
-            "cacheKey": cache_key  # Pass cache key to Cloud Function
-        }
-
-        # Trigger Cloud Function synchronously (fire and forget - don't wait for scraping to complete)
-        try:
-            import httpx
-            with httpx.Client(timeout=5.0) as client:
-                response = client.post(cloud_function_url, json=payload)
-                print(f"[scrape_competitor_prices] Triggered Cloud Function: {response.status_code}")
-        except Exception as e:
-            print(f"[scrape_competitor_prices] Error triggering Cloud Function: {e}")
-
-        # Return immediately to AI
-        response = {
-            "success": True,
-            "status": "started",
-            "cacheKey": cache_key,
-            "message": "Scraping started. This takes approximately 30-40 seconds. Use check_scrape_status to retrieve results.",
-            "estimatedWaitSeconds": 35,
-            "realtimeEnabled": True
-        }
-        print(f"[scrape_competitor_prices] Returning response with cacheKey: {cache_key}")
-        print(f"[scrape_competitor_prices] Response: {response}")
-        return response
-
-    elif tool_name == "check_scrape_status":
-        from google.cloud import firestore
-        import time
-
-        cache_key = tool_args.get("cacheKey")
-        if not cache_key:
-            return {
-                "success": False,
-                "error": "cacheKey parameter is required"
-            }
-
-        # Get status from Firestore
-        db = firestore.Client()
-        cache_ref = db.collection('competitor_price_cache').document(cache_key)
-        cache_doc = cache_ref.get()
-
-        if not cache_doc.exists:
-            return {
-                "success": False,
-                "error": "Scraping task not found. Cache key may be invalid."
-            }
-
-        cache_data = cache_doc.to_dict()
-        status = cache_data.get('status', 'unknown')
-
-        if status == 'pending' or status == 'in_progress':
-            # Calculate how long it's been running
-            start_time = cache_data.get('timestamp', 0)
-            elapsed_seconds = int(time.time() - start_time)
-            progress = cache_data.get('progress', 0)
-            progress_message = cache_data.get('message', 'Scraping in progress...')
-
-            return {
-                "success": True,
-                "status": "in_progress" if status == 'in_progress' else "pending",
-                "message": f"{progress_message} ({elapsed_seconds} seconds elapsed)",
-                "elapsedSeconds": elapsed_seconds,
-                "progress": progress,
-                "progressMessage": progress_message
-            }
-
-        elif status == 'completed':
-            return {
-                "success": True,
-                "status": "completed",
-                "data": cache_data.get('result'),
-                "scrapedAt": cache_data.get('timestamp')
-            }
-
-        elif status == 'error':
-            return {
-                "success": False,
-                "status": "error",
-                "error": cache_data.get('error', 'Unknown error occurred during scraping')
-            }
-
-        else:
-            return {
-                "success": False,
-                "error": f"Unknown status: {status}"
-            }
-
-    elif tool_name == "scrape_and_compare_hotels":
-        import hashlib
-        import asyncio
-        import os
-        import time
-        from datetime import datetime
-        from google.cloud import firestore
-        import httpx
-        from uuid import uuid4
-
-        urls = tool_args.get("urls", [])
-        check_in = tool_args.get("checkIn")
-        check_out = tool_args.get("checkOut")
-        adults = tool_args.get("adults", 2)
-        children = tool_args.get("children", 0)
-        rooms = tool_args.get("rooms", 1)
-
-        # Validation
-        if not urls or not isinstance(urls, list):
-            return {
-                "success": False,
-                "error": "urls must be a list"
-            }
-
-        if len(urls) < 2 or len(urls) > 5:
-            return {
-                "success": False,
-                "error": "Provide 2-5 hotel URLs"
-            }
-
-        # Fix truncated URLs (AI sometimes truncates .html endings)
-        fixed_urls = []
-        for url in urls:
-            if not url or not isinstance(url, str) or 'booking.com' not in url:
-                return {
-                    "success": False,
-                    "error": f"Invalid Booking.com URL: {url}"
-                }
-
-            # Fix common truncations (check more specific patterns first):
-            # .bg.ht -> .bg.html
-            # .bg. -> .bg.html
-            # .ht -> .html
-            if url.endswith('.bg.ht'):
-                url = url + 'ml'
-                print(f"[scrape_and_compare_hotels] Fixed truncated URL .bg.ht -> {url}")
-            elif url.endswith('.ht'):
-                url = url + 'ml'
-                print(f"[scrape_and_compare_hotels] Fixed truncated URL .ht -> {url}")
-            elif url.endswith('.bg.'):
-                url = url + 'html'
-                print(f"[scrape_and_compare_hotels] Fixed truncated URL .bg. -> {url}")
-            elif url.endswith('.') and not url.endswith('.html'):
-                url = url + 'html'
-                print(f"[scrape_and_compare_hotels] Fixed truncated URL . -> {url}")
-
-            fixed_urls.append(url)
-
-        urls = fixed_urls
-
-        print(f"[scrape_and_compare_hotels] Scraping {len(urls)} hotels in batch")
-
-        # Initialize Firestore
-        db = firestore.Client()
-
-        # ✅ CHECK RATE LIMIT before proceeding (same as single scraper)
-        rate_limit_key = f"rate_limit_{datetime.now().strftime('%Y-%m-%d')}"
-        rate_limit_ref = db.collection('scraper_rate_limits').document(rate_limit_key)
-        rate_limit_doc = rate_limit_ref.get()
-
-        current_count = rate_limit_doc.to_dict().get('count', 0) if rate_limit_doc.exists else 0
-        MAX_REQUESTS_PER_DAY = 200
-
-        # Batch scraping counts as N requests (one per hotel)
-        if current_count + len(urls) > MAX_REQUESTS_PER_DAY:
-            return {
-                "success": False,
-                "error": f"Batch scraping would exceed daily limit ({MAX_REQUESTS_PER_DAY} requests per day). You can scrape {MAX_REQUESTS_PER_DAY - current_count} more hotels today.",
-                "limitReached": True
-            }
-
-        # Increment rate limit counter by number of hotels
-        rate_limit_ref.set({
-            'count': current_count + len(urls),
-            'lastRequest': time.time(),
-            'date': datetime.now().strftime('%Y-%m-%d')
-        }, merge=True)
-
-        # Generate batch ID
-        batch_id = str(uuid4())
-
-        # Generate cache keys for each hotel and check for existing cache
-        def generate_cache_key(url, check_in, check_out, adults, children, rooms):
-            cache_string = f"{url}_{check_in or ''}_{check_out or ''}_{adults}_{children}_{rooms}"
-            return hashlib.md5(cache_string.encode()).hexdigest()
-
-        hotels = []
-        urls_to_scrape = []
-
-        for url in urls:
-            cache_key = generate_cache_key(url, check_in, check_out, adults, children, rooms)
-
-            # Check if this hotel has valid cache (6 hours, same as single scraper)
-            cache_ref = db.collection('competitor_price_cache').document(cache_key)
-            cache_doc = cache_ref.get()
-
-            hotel_entry = {
-                "cacheKey": cache_key,
-                "url": url,
-                "status": "pending",
-                "hotelName": None,
-                "minPrice": None,
-                "maxPrice": None,
-                "currency": "USD",
-                "rating": None,
-                "roomCount": 0,
-                "error": None
-            }
-
-            if cache_doc.exists:
-                cache_data = cache_doc.to_dict()
-                cache_timestamp = cache_data.get('timestamp', 0)
-                cache_age_hours = (time.time() - cache_timestamp) / 3600
-
-                # If cache is less than 6 hours old and completed, use it
-                if cache_age_hours < 6 and cache_data.get('status') == 'completed':
-                    result = cache_data.get('result', {})
-                    hotel_entry.update({
-                        "status": "completed",
-                        "hotelName": result.get('hotelName'),
-                        "minPrice": min(result.get('prices', [0])) if result.get('prices') else None,
-                        "maxPrice": max(result.get('prices', [0])) if result.get('prices') else None,
-                        "currency": result.get('rooms', [{}])[0].get('currency', 'USD') if result.get('rooms') else 'USD',
-                        "rating": result.get('rating'),
-                        "roomCount": len(result.get('rooms', []))
-                    })
-                    print(f"[scrape_and_compare_hotels] Using cached data for {url} (age: {cache_age_hours:.1f}h)")
-                else:
-                    # Need to scrape this one
-                    urls_to_scrape.append((url, cache_key))
-            else:
-                # No cache, need to scrape
-                urls_to_scrape.append((url, cache_key))
-                # Mark as pending in cache
-                cache_ref.set({
-                    'status': 'pending',
-                    'timestamp': time.time(),
-                    'url': url,
-                    'checkIn': check_in,
-                    'checkOut': check_out,
-                    'adults': adults,
-                    'children': children,
-                    'rooms': rooms
-                })
-
-            hotels.append(hotel_entry)
-
-        # Create batch document (use time.time() for consistency with single scraper)
-        batch_ref = db.collection('scraper_batches').document(batch_id)
-        batch_ref.set({
-            "batchId": batch_id,
-            "status": "in_progress",
-            "totalHotels": len(urls),
-            "completedHotels": 0,
-            "failedHotels": 0,
-            "progress": 0,
-            "timestamp": time.time(),
-            "checkIn": check_in,
-            "checkOut": check_out,
-            "adults": adults,
-            "children": children,
-            "rooms": rooms,
-            "hotels": hotels,
-            "results": None
-        })
-
-        print(f"[scrape_and_compare_hotels] Created batch document: {batch_id}")
-        print(f"[scrape_and_compare_hotels] Need to scrape {len(urls_to_scrape)} hotels (others are cached)")
-
-        # Trigger Cloud Functions only for hotels that need scraping
-        if urls_to_scrape:
-            cloud_function_url = os.getenv("SCRAPER_CLOUD_FUNCTION_URL", "https://us-central1-quendoo-ai-dashboard.cloudfunctions.net/scrapeBooking")
-
-            # Fire and forget - trigger all Cloud Functions in background threads
-            import threading
-            import requests
-
-            def trigger_cloud_function(url, cache_key, hotel_index):
-                """Trigger Cloud Function in background thread (fire and forget)"""
-                try:
-                    response = requests.post(
-                        cloud_function_url,
-                        json={
-                            "url": url,
-                            "checkIn": check_in,
-                            "checkOut": check_out,
-                            "adults": adults,
-                            "children": children,
-                            "rooms": rooms,
-                            "cacheKey": cache_key,
-                            "batchId": batch_id,
-                            "batchIndex": hotel_index
-                        },
-                        timeout=90  # Cloud Function needs 30-60s to complete
-                    )
-                    print(f"[scrape_and_compare_hotels] Triggered Cloud Function for {url}: {response.status_code}")
-                except Exception as e:
-                    print(f"[scrape_and_compare_hotels] Error triggering Cloud Function for {url}: {e}")
-
-            # Start all scraping jobs in background threads (fire and forget)
-            # Add staggered delay to avoid triggering rate limits (2s between requests)
-            for idx, (url, cache_key) in enumerate(urls_to_scrape):
-                try:
-                    hotel_index = next(i for i, h in enumerate(hotels) if h["cacheKey"] == cache_key)
-
-                    # Stagger requests by 2 seconds each to reduce rate limiting
-                    if idx > 0:
-                        import time as time_module
-                        time_module.sleep(2)
-
-                    thread = threading.Thread(
-                        target=trigger_cloud_function,
-                        args=(url, cache_key, hotel_index),
-                        daemon=True  # Daemon thread won't block return
-                    )
-                    thread.start()
-                    print(f"[scrape_and_compare_hotels] Started background thread for {url}")
-                except Exception as e:
-                    print(f"[scrape_and_compare_hotels] Error starting thread for {url}: {e}")
-        else:
-            print(f"[scrape_and_compare_hotels] All hotels are cached, no scraping needed")
-
-        # Return immediately to AI
-        return {
-            "success": True,
-            "batchId": batch_id,
-            "totalHotels": len(urls),
-            "message": f"Scraping {len(urls)} hotels...",
-            "estimatedTime": "1-2 minutes",
-            "realtimeEnabled": True
-        }
-
-    else:
-        raise ValueError(f"Unknown tool: {tool_name}")
+    # Route to the tool's handler (see TOOL_SPECS)
+    return await get_tool_registry().dispatch(tool_name, client, tool_args)
 
 
 def list_quendoo_tools() -> list:
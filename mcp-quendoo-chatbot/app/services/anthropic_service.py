@@ -0,0 +1,147 @@
+"""
+Anthropic API access - cached API key and one long-lived async client
+
+The API key is read from Secret Manager once and refreshed every
+ANTHROPIC_SECRET_REFRESH_SECONDS; if a refresh fails the previous key keeps
+being used. All callers share one AsyncAnthropic client (and its connection
+pool), rebuilt only when the key changes. Nothing here blocks the event loop.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+from anthropic import AsyncAnthropic
+from google.cloud import secretmanager
+from app.config import get_settings
+from app.deadline import timeout_for
+
+settings = get_settings()
+
+SECRET_ID = "anthropic-api-key"
+
+# Upper bound for the Secret Manager call (capped further by the tool call's deadline)
+SECRET_TIMEOUT_SECONDS = 10.0
+
+
+class AnthropicService:
+    """
+    Holds the cached API key and shared async client
+
+    Example usage:
+        service = get_anthropic_service()
+        text = await service.complete("Summarize: ...", model="claude-3-5-haiku-20241022")
+    """
+
+    def __init__(self, refresh_seconds: float = 3600.0):
+        """
+        Args:
+            refresh_seconds: How long a fetched API key is used before refetching
+        """
+        self.refresh_seconds = refresh_seconds
+        self._api_key: Optional[str] = None
+        self._fetched_at = 0.0
+        self._client: Optional[AsyncAnthropic] = None
+        self._secret_client = None
+        self._lock = asyncio.Lock()
+
+        self.secret_fetches = 0
+        self.secret_errors = 0
+        self.requests = 0
+
+    def _fetch_secret(self, timeout: float) -> str:
+        """Read the API key from Secret Manager (blocking - run in a worker thread)"""
+        if self._secret_client is None:
+            self._secret_client = secretmanager.SecretManagerServiceClient()
+        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+        name = f"projects/{project_id}/secrets/{SECRET_ID}/versions/latest"
+        response = self._secret_client.access_secret_version(request={"name": name}, timeout=timeout)
+        return response.payload.data.decode("UTF-8")
+
+    async def get_api_key(self) -> str:
+        """
+        Get the API key, refetching it once the refresh interval has passed
+
+        Raises:
+            Exception: If no key was ever fetched and Secret Manager fails
+        """
+        if self._api_key and time.monotonic() - self._fetched_at < self.refresh_seconds:
+            return self._api_key
+
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._api_key and time.monotonic() - self._fetched_at < self.refresh_seconds:
+                return self._api_key
+
+            try:
+                timeout = timeout_for(SECRET_TIMEOUT_SECONDS, "Anthropic API key lookup")
+                api_key = await asyncio.wait_for(
+                    asyncio.to_thread(self._fetch_secret, timeout),
+                    timeout=timeout
+                )
+            except Exception as e:
+                self.secret_errors += 1
+                if not self._api_key:
+                    raise
+                # Keep serving with the previous key, retry on the next call
+                print(f"[AnthropicService] Secret refresh failed, keeping previous key: {e}")
+                return self._api_key
+
+            self.secret_fetches += 1
+            self._fetched_at = time.monotonic()
+            if api_key != self._api_key:
+                self._api_key = api_key
+                # Requests in flight keep using the old client; new ones get a fresh one
+                self._client = None
+            return self._api_key
+
+    async def get_client(self) -> AsyncAnthropic:
+        """Get the shared async client for the current API key"""
+        api_key = await self.get_api_key()
+        if self._client is None:
+            self._client = AsyncAnthropic(api_key=api_key)
+        return self._client
+
+    async def complete(self, prompt: str, model: str, max_tokens: int = 4096, timeout: float = 600.0) -> str:
+        """
+        Send a single-turn prompt and return the text of the reply
+
+        Args:
+            prompt: User message
+            model: Model name
+            max_tokens: Maximum tokens in the reply
+            timeout: Upper bound in seconds (capped by the tool call's deadline)
+        """
+        client = await self.get_client()
+        self.requests += 1
+        response = await client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            timeout=timeout_for(timeout, "Anthropic request"),
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.content[0].text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics"""
+        return {
+            "key_loaded": self._api_key is not None,
+            "key_age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._api_key else None,
+            "refresh_seconds": self.refresh_seconds,
+            "secret_fetches": self.secret_fetches,
+            "secret_errors": self.secret_errors,
+            "requests": self.requests
+        }
+
+
+# Global service instance
+_anthropic_service: Optional[AnthropicService] = None
+
+
+def get_anthropic_service() -> AnthropicService:
+    """Get or create global AnthropicService"""
+    global _anthropic_service
+    if _anthropic_service is None:
+        _anthropic_service = AnthropicService(refresh_seconds=settings.ANTHROPIC_SECRET_REFRESH_SECONDS)
+    return _anthropic_service
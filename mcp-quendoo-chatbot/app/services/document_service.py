@@ -8,35 +8,102 @@ Handles:
 """
 
 from typing import Dict, Any, List, Optional
+import asyncio
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
-from google.cloud import aiplatform
-from vertexai.language_models import TextEmbeddingModel
+import threading
+import time
 import base64
 import json
+from app.deadline import timeout_for, check_deadline, DeadlineExceeded
 
-# Initialize Firebase Admin (if not already initialized)
-try:
-    firebase_admin.get_app()
-except ValueError:
-    # App not initialized, initialize it
-    # In Cloud Run, Application Default Credentials are used
-    firebase_admin.initialize_app()
-
-# Initialize Vertex AI
+# Google Cloud settings - clients are created on first use (or warmup()),
+# never at import time, so importing this module stays cheap and works offline
 PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT", "quendoo-ai-dashboard")
 LOCATION = "us-central1"
-aiplatform.init(project=PROJECT_ID, location=LOCATION)
 
-# Firestore client
-db = firestore.client()
+_firestore_lock = threading.Lock()
+_embedding_lock = threading.Lock()
+_db = None
+_embedding_model = None
 
 # Embedding model
 EMBEDDING_MODEL = "text-embedding-004"
 
+# Upper bounds for downstream calls (capped further by the tool call's deadline)
+EMBEDDING_TIMEOUT_SECONDS = 20.0
+FIRESTORE_TIMEOUT_SECONDS = 30.0
+
+
+def _init_firestore():
+    """Initialize Firebase Admin and create the Firestore client (blocking, thread-safe)"""
+    global _db
+    if _db is None:
+        with _firestore_lock:
+            if _db is None:
+                import firebase_admin
+                from firebase_admin import firestore
+
+                # Initialize Firebase Admin (if not already initialized)
+                try:
+                    firebase_admin.get_app()
+                except ValueError:
+                    # In Cloud Run, Application Default Credentials are used
+                    firebase_admin.initialize_app()
+
+                _db = firestore.client()
+                print("[DocumentService] Firestore client initialized")
+    return _db
+
+
+def _init_embedding_model():
+    """Initialize Vertex AI and load the embedding model (blocking, thread-safe)"""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                from google.cloud import aiplatform
+                from vertexai.language_models import TextEmbeddingModel
 
-def get_hotel_collection(hotel_id: str):
+                aiplatform.init(project=PROJECT_ID, location=LOCATION)
+                _embedding_model = TextEmbeddingModel.from_pretrained(EMBEDDING_MODEL)
+                print(f"[DocumentService] Embedding model {EMBEDDING_MODEL} loaded")
+    return _embedding_model
+
+
+async def get_firestore_client():
+    """Get the shared Firestore client, initializing it off the event loop on first use"""
+    if _db is not None:
+        return _db
+    return await asyncio.to_thread(_init_firestore)
+
+
+async def get_embedding_model():
+    """Get the shared embedding model, initializing it off the event loop on first use"""
+    if _embedding_model is not None:
+        return _embedding_model
+    return await asyncio.to_thread(_init_embedding_model)
+
+
+async def warmup():
+    """
+    Create the Firestore client and embedding model before traffic arrives
+
+    Failures are logged, not raised - initialization is retried on first use.
+    """
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        get_firestore_client(),
+        get_embedding_model(),
+        return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors:
+        print(f"[DocumentService] Warmup failed: {type(error).__name__}: {error}")
+    print(f"[DocumentService] Warmup finished in {(time.perf_counter() - started) * 1000:.0f}ms "
+          f"({len(results) - len(errors)}/{len(results)} clients ready)")
+
+
+async def get_hotel_collection(hotel_id: str):
     """
     Get Firestore collection reference for a specific hotel using hotel ID
     Uses namespace isolation: {hotel_id}/documents/hotel_documents
@@ -50,9 +117,37 @@ def get_hotel_collection(hotel_id: str):
     if not hotel_id:
         raise ValueError("Hotel ID is required for document operations")
 
+    db = await get_firestore_client()
     return db.collection(f"{hotel_id}").document("documents").collection("hotel_documents")
 
 
+async def stream_documents(query_ref, what: str) -> List[Any]:
+    """
+    Run a Firestore query and collect its document snapshots
+
+    The Firestore client is synchronous and blocks while streaming, so the
+    whole stream is consumed in a worker thread, bounded by the caller's deadline.
+
+    Args:
+        query_ref: Firestore query or collection reference
+        what: Operation name for deadline errors
+
+    Returns:
+        List of document snapshots
+    """
+    timeout = timeout_for(FIRESTORE_TIMEOUT_SECONDS, what)
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(lambda: list(query_ref.stream(timeout=timeout))),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        if timeout < FIRESTORE_TIMEOUT_SECONDS:
+            # Cut short by the caller's deadline, not a slow Firestore
+            raise DeadlineExceeded(what)
+        raise
+
+
 async def generate_embedding(text: str) -> List[float]:
     """
     Generate 768-dimensional embedding vector using Vertex AI
@@ -64,8 +159,12 @@ async def generate_embedding(text: str) -> List[float]:
         768-dimensional embedding vector
     """
     try:
-        model = TextEmbeddingModel.from_pretrained(EMBEDDING_MODEL)
-        embeddings = model.get_embeddings([text])
+        model = await get_embedding_model()
+        # Blocking Vertex AI call - run off the event loop, bounded by the caller's deadline
+        embeddings = await asyncio.wait_for(
+            asyncio.to_thread(model.get_embeddings, [text]),
+            timeout=timeout_for(EMBEDDING_TIMEOUT_SECONDS, "embedding generation")
+        )
 
         if embeddings and len(embeddings) > 0:
             return embeddings[0].values
@@ -143,7 +242,7 @@ async def search_hotel_documents(
         query_embedding = await generate_embedding(query)
 
         # Get hotel document collection using hotel ID
-        collection = get_hotel_collection(hotel_id)
+        collection = await get_hotel_collection(hotel_id)
 
         # Build query with optional document type filter
         query_ref = collection
@@ -152,11 +251,12 @@ async def search_hotel_documents(
 
         # Get all documents (we'll calculate similarity manually)
         print(f"[DocumentService] Fetching documents from Firestore...")
-        docs_snapshot = query_ref.stream()
+        docs_snapshot = await stream_documents(query_ref, "document search")
 
         results = []
 
         for doc in docs_snapshot:
+            check_deadline("document search")
             data = doc.to_dict()
 
             # UPDATED: Read chunks from subcollection (new format)
@@ -164,7 +264,7 @@ async def search_hotel_documents(
             # to avoid Firestore's 10MB document size limit
             try:
                 chunks_ref = doc.reference.collection("chunks")
-                chunks_snapshot = chunks_ref.stream()
+                chunks_snapshot = await stream_documents(chunks_ref, "document search")
 
                 for chunk_doc in chunks_snapshot:
                     chunk_data = chunk_doc.to_dict()
@@ -191,6 +291,8 @@ async def search_hotel_documents(
                         "tags": data.get("tags", [])
                     })
 
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 print(f"[DocumentService] Failed to read chunks for doc {doc.id}: {e}")
                 continue
@@ -277,16 +379,16 @@ async def list_hotel_documents(
             }
 
         # Get hotel document collection using hotel ID
-        collection = get_hotel_collection(hotel_id)
+        collection = await get_hotel_collection(hotel_id)
 
         # Build query with optional document type filter
-        query_ref = collection.order_by("createdAt", direction=firestore.Query.DESCENDING)
+        query_ref = collection.order_by("createdAt", direction="DESCENDING")
 
         if document_types and len(document_types) > 0:
-            query_ref = collection.where("documentType", "in", document_types).order_by("createdAt", direction=firestore.Query.DESCENDING)
+            query_ref = collection.where("documentType", "in", document_types).order_by("createdAt", direction="DESCENDING")
 
         # Get documents
-        docs_snapshot = query_ref.stream()
+        docs_snapshot = await stream_documents(query_ref, "document listing")
 
         documents = []
         for doc in docs_snapshot:
@@ -361,13 +463,12 @@ async def query_excel_structured(
         print(f"[ExcelQuery] Limit: {limit}")
 
         # Get Excel documents from Firestore
-        docs_ref = db.collection(hotel_id).document("documents").collection("hotel_documents")
+        docs_ref = await get_hotel_collection(hotel_id)
 
         # Filter by filename if provided
         if file_name:
-            docs_snapshot = docs_ref.where("fileName", "==", file_name).stream()
-        else:
-            docs_snapshot = docs_ref.stream()
+            docs_ref = docs_ref.where("fileName", "==", file_name)
+        docs_snapshot = await stream_documents(docs_ref, "Excel query")
 
         # Filter only Excel documents
         excel_docs = []
@@ -0,0 +1,3 @@
+"""
+Offline performance tooling: fake Quendoo PMS server and load driver
+"""
@@ -0,0 +1,302 @@
+"""
+Fake Quendoo PMS API for offline load testing
+
+Implements every endpoint used by app/quendoo/client.py with deterministic
+synthetic data and configurable latency, payload size and error rates.
+Property settings and room details carry ETags and answer conditional GETs.
+
+Run:
+    python -m benchmarks.fake_quendoo --port 8081 --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 0.01 --throttle-rate 0.01 --rooms 20 --bookings 2000 --padding-bytes 256
+
+Then start the app against it:
+    QUENDOO_API_BASE_URL=http://127.0.0.1:8081/api/pms/v1 python -m uvicorn app.main:app --port 8000
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+API_PREFIX = "/api/pms/v1"
+
+
+class FakeQuendooConfig:
+    """Behaviour knobs of the fake server"""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 20.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        rooms: int = 10,
+        bookings: int = 500,
+        padding_bytes: int = 0,
+        seed: int = 42
+    ):
+        """
+        Args:
+            latency_ms: Base response latency
+            jitter_ms: Uniform random latency added on top of the base
+            error_rate: Fraction of requests answered with 503
+            throttle_rate: Fraction of requests answered with 429 + Retry-After
+            retry_after_seconds: Retry-After value sent with 429s
+            rooms: Number of rooms of the fake property
+            bookings: Number of bookings returned by getBookings
+            padding_bytes: Filler text added to every room, booking and offer record
+            seed: Seed for synthetic data and injected failures
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.rooms = rooms
+        self.bookings = bookings
+        self.padding_bytes = padding_bytes
+        self.seed = seed
+
+
+class FakeQuendooState:
+    """Synthetic property data plus request counters"""
+
+    def __init__(self, config: FakeQuendooConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.padding = "x" * config.padding_bytes
+        self.room_ids = [100 + i for i in range(config.rooms)]
+        # (room_id, date) -> qty set through updateAvailability
+        self.availability_overrides: Dict[tuple, int] = {}
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.version = 1
+
+    def etag(self, name: str) -> str:
+        """ETag of a versioned payload (changes after every write)"""
+        return '"' + hashlib.sha1(f"{name}:{self.version}".encode()).hexdigest()[:16] + '"'
+
+    def property_settings(self) -> Dict[str, Any]:
+        return {
+            "data": {
+                "name": "Fake Hotel",
+                "currency": "EUR",
+                "booking_modules": [
+                    {"code": "FAKEBM0001", "name": "Website", "is_active": True},
+                    {"code": "FAKEBM0002", "name": "Legacy", "is_active": False}
+                ],
+                "rooms": [{"room_id": room_id, "name": f"Room {room_id}"} for room_id in self.room_ids]
+            }
+        }
+
+    def rooms_details(self, room_id: Optional[int] = None) -> Dict[str, Any]:
+        room_ids = [room_id] if room_id else self.room_ids
+        return {
+            "data": [
+                {
+                    "room_id": rid,
+                    "name": f"Room {rid}",
+                    "max_adults": 2 + rid % 3,
+                    "size_m2": 18 + rid % 20,
+                    "amenities": ["wifi", "tv", "minibar"],
+                    "images": [f"https://example.invalid/rooms/{rid}/{n}.jpg" for n in range(3)],
+                    "description": self.padding
+                }
+                for rid in room_ids
+            ]
+        }
+
+    def availability(self, date_from: str, date_to: str) -> Dict[str, Any]:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+        data = {}
+        for room_id in self.room_ids:
+            dates = {}
+            day = start
+            while day <= end:
+                key = day.isoformat()
+                dates[key] = self.availability_overrides.get((room_id, key), (room_id + day.toordinal()) % 6)
+                day += timedelta(days=1)
+            data[str(room_id)] = dates
+        return {"data": data}
+
+    def bookings(self) -> Dict[str, Any]:
+        records = []
+        for i in range(self.config.bookings):
+            check_in = date(2026, 1, 1) + timedelta(days=i % 365)
+            records.append({
+                "booking_id": 50000 + i,
+                "revision_id": f"r{self.version}-{i % 7}",
+                "room_id": self.room_ids[i % len(self.room_ids)],
+                "date_from": check_in.isoformat(),
+                "date_to": (check_in + timedelta(days=1 + i % 5)).isoformat(),
+                "guest_name": f"Guest {i}",
+                "total_price": 80 + (i * 37) % 400,
+                "status": "confirmed",
+                "notes": self.padding
+            })
+        return {"data": records, "count": len(records)}
+
+    def booking_offers(self, date_from: str, nights: int, adults: int) -> Dict[str, Any]:
+        base = 60 + date.fromisoformat(date_from).toordinal() % 40
+        return {
+            "data": [
+                {
+                    "room_id": room_id,
+                    "room_name": f"Room {room_id}",
+                    "rate_name": rate,
+                    "total_price": round((base + room_id % 50 + adults * 15) * nights * factor, 2),
+                    "currency": "EUR",
+                    "description": self.padding
+                }
+                for room_id in self.room_ids
+                for rate, factor in (("Room only", 1.0), ("Breakfast", 1.15))
+            ]
+        }
+
+
+def create_fake_quendoo_app(config: Optional[FakeQuendooConfig] = None) -> FastAPI:
+    """Create the fake Quendoo FastAPI app"""
+    config = config or FakeQuendooConfig()
+    state = FakeQuendooState(config)
+    app = FastAPI(title="Fake Quendoo PMS API", docs_url=None, redoc_url=None)
+    app.state.fake = state
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next):
+        """Inject latency, auth check and random failures"""
+        path = request.url.path
+        if not path.startswith(API_PREFIX):
+            return await call_next(request)
+
+        endpoint = path[len(API_PREFIX):]
+        state.requests[endpoint] += 1
+
+        delay = config.latency_ms + state.random.uniform(0, config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+
+        if not request.query_params.get("api_key"):
+            response = JSONResponse({"error": "Missing api_key"}, status_code=401)
+        elif state.random.random() < config.throttle_rate:
+            response = JSONResponse(
+                {"error": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)}
+            )
+        elif state.random.random() < config.error_rate:
+            response = JSONResponse({"error": "Service unavailable"}, status_code=503)
+        else:
+            response = await call_next(request)
+
+        state.statuses[response.status_code] += 1
+        return response
+
+    def versioned(request: Request, name: str, payload: Dict[str, Any]) -> Response:
+        """Answer with ETag, or 304 if the client already has this version"""
+        etag = state.etag(name)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(payload, headers={"ETag": etag})
+
+    @app.get(f"{API_PREFIX}/Property/getPropertySettings")
+    async def get_property_settings(request: Request):
+        return versioned(request, "settings", state.property_settings())
+
+    @app.get(f"{API_PREFIX}/Property/getRoomsDetails")
+    async def get_rooms_details(request: Request, room_id: Optional[int] = None):
+        return versioned(request, f"rooms:{room_id}", state.rooms_details(room_id))
+
+    @app.get(f"{API_PREFIX}/Availability/getAvailability")
+    async def get_availability(date_from: str, date_to: str, sysres: str = "qdo"):
+        return state.availability(date_from, date_to)
+
+    @app.post(f"{API_PREFIX}/Availability/updateAvailability")
+    async def update_availability(request: Request):
+        body = await request.json()
+        values: List[Dict[str, Any]] = body.get("values", [])
+        for value in values:
+            room_id = value.get("room_id", value.get("ext_room_id"))
+            state.availability_overrides[(int(room_id), value["date"])] = value.get("avail", 0)
+        state.version += 1
+        return {"success": True, "updated": len(values)}
+
+    @app.get(f"{API_PREFIX}/Booking/getBookings")
+    async def get_bookings():
+        return state.bookings()
+
+    @app.get(f"{API_PREFIX}/Property/getBookingOffers")
+    async def get_booking_offers(request: Request, date_from: str, nights: int, bm_code: str):
+        adults = sum(
+            int(value) for key, value in request.query_params.items()
+            if key.startswith("guests[") and key.endswith("[adults]")
+        ) or 2
+        return state.booking_offers(date_from, nights, adults)
+
+    @app.post(f"{API_PREFIX}/Booking/ackBooking")
+    async def ack_booking(request: Request):
+        body = await request.json()
+        return {"success": True, "booking_id": body.get("booking_id")}
+
+    @app.post(f"{API_PREFIX}/Booking/postRoomAssignment")
+    async def post_room_assignment(request: Request):
+        body = await request.json()
+        return {"success": True, "booking_id": body.get("booking_id")}
+
+    @app.post(f"{API_PREFIX}/Property/postExternalPropertyData")
+    async def post_external_property_data(request: Request):
+        await request.json()
+        state.version += 1
+        return {"success": True}
+
+    @app.get("/_stats")
+    async def stats():
+        """Request counts per endpoint and status"""
+        return {
+            "requests": dict(state.requests),
+            "statuses": {str(k): v for k, v in state.statuses.items()}
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Quendoo PMS API for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-seconds", type=int, default=1)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--padding-bytes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeQuendooConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        rooms=args.rooms,
+        bookings=args.bookings,
+        padding_bytes=args.padding_bytes,
+        seed=args.seed
+    )
+
+    import uvicorn
+
+    print(f"[FakeQuendoo] Serving {API_PREFIX} on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms}+{args.jitter_ms}ms, errors {args.error_rate:.0%}, 429s {args.throttle_rate:.0%})")
+    uvicorn.run(create_fake_quendoo_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+End-to-end load driver for /mcp/tools/execute and /messages/
+
+Fires tool calls at increasing concurrency and reports p50/p95/p99 latency
+and throughput per transport and tool.
+
+Against a running app (pointed at the fake Quendoo server):
+    python -m benchmarks.load_driver --target http://127.0.0.1:8000 \\
+        --tools get_availability,get_bookings --concurrency 1,8,32 --requests 200
+
+Fully offline, spawning the fake Quendoo server and the app locally:
+    python -m benchmarks.load_driver --spawn --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+
+# Arguments used for each benchmarked tool
+DEFAULT_TOOL_ARGS: Dict[str, Dict[str, Any]] = {
+    "get_property_settings": {},
+    "get_rooms_details": {},
+    "get_availability": {"date_from": "2026-03-01", "date_to": "2026-05-31", "sysres": "qdo"},
+    "get_bookings": {},
+    "get_booking_offers": {
+        "date_from": "2026-03-10",
+        "nights": 3,
+        "guests": [{"adults": 2, "children_by_ages": []}]
+    },
+    "scan_booking_offers": {
+        "date_from": "2026-03-01",
+        "date_to": "2026-03-14",
+        "nights": [3],
+        "occupancies": [[{"adults": 2, "children_by_ages": []}]]
+    }
+}
+
+TRANSPORTS = ("execute", "messages")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class ToolCaller:
+    """Calls one tool through one of the app's transports"""
+
+    def __init__(self, client: httpx.AsyncClient, transport: str, api_keys: List[str]):
+        self.client = client
+        self.transport = transport
+        self.api_keys = api_keys
+        self.connection_id: Optional[str] = None
+        self.session_id = f"session_bench{os.getpid()}"
+
+    async def setup(self):
+        """Open an MCP connection for /mcp/tools/execute"""
+        if self.transport == "execute":
+            response = await self.client.post("/mcp/connect", json={"tenant_id": "benchmark", "user_id": "load-driver"})
+            response.raise_for_status()
+            self.connection_id = response.json()["connection_id"]
+
+    async def call(self, index: int, tool_name: str, tool_args: Dict[str, Any]) -> bool:
+        """
+        Execute one tool call
+
+        Returns:
+            True if the tool returned a result without error
+        """
+        headers = {"X-Quendoo-Api-Key": self.api_keys[index % len(self.api_keys)]}
+
+        if self.transport == "execute":
+            response = await self.client.post("/mcp/tools/execute", headers=headers, json={
+                "connection_id": self.connection_id,
+                "tool_name": tool_name,
+                "tool_args": tool_args
+            })
+            return response.status_code == 200 and response.json().get("error") is None
+
+        response = await self.client.post(
+            "/messages/",
+            params={"session_id": self.session_id},
+            headers=headers,
+            json={
+                "jsonrpc": "2.0",
+                "id": index,
+                "method": "tools/call",
+                "params": {"name": tool_name, "arguments": tool_args}
+            }
+        )
+        return response.status_code == 200 and "error" not in response.json()
+
+
+async def run_level(caller: ToolCaller, tool_name: str, tool_args: Dict[str, Any], concurrency: int, requests: int) -> Dict[str, Any]:
+    """Run `requests` calls with `concurrency` workers and collect latencies"""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                ok = await caller.call(index, tool_name, tool_args)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "transport": caller.transport,
+        "tool": tool_name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "req_per_sec": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1)
+    }
+
+
+async def run_benchmark(
+    target: str,
+    tools: List[str],
+    transports: List[str],
+    levels: List[int],
+    requests: int,
+    warmup: int,
+    tenants: int
+) -> List[Dict[str, Any]]:
+    """Run every transport x tool x concurrency level and print a results table"""
+    api_keys = [f"bench-key-{i}" for i in range(max(1, tenants))]
+    limits = httpx.Limits(max_connections=max(levels) + 10, max_keepalive_connections=max(levels) + 10)
+    results = []
+
+    print(f"{'transport':<10} {'tool':<22} {'conc':>5} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    async with httpx.AsyncClient(base_url=target, timeout=120.0, limits=limits) as client:
+        for transport in transports:
+            caller = ToolCaller(client, transport, api_keys)
+            await caller.setup()
+
+            for tool_name in tools:
+                tool_args = DEFAULT_TOOL_ARGS.get(tool_name, {})
+                for i in range(warmup):
+                    await caller.call(i, tool_name, tool_args)
+
+                for concurrency in levels:
+                    row = await run_level(caller, tool_name, tool_args, concurrency, requests)
+                    results.append(row)
+                    print(
+                        f"{row['transport']:<10} {row['tool']:<22} {row['concurrency']:>5} {row['requests']:>6} "
+                        f"{row['errors']:>6} {row['req_per_sec']:>8} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}"
+                    )
+    return results
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    """Poll url until it answers 200"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def spawn_servers(args) -> List[subprocess.Popen]:
+    """Start fake Quendoo and the app as local subprocesses"""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    fake = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_quendoo",
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--rooms", str(args.rooms),
+        "--bookings", str(args.bookings),
+        "--padding-bytes", str(args.padding_bytes)
+    ], cwd=project_root)
+
+    env = dict(os.environ)
+    env["QUENDOO_API_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/api/pms/v1"
+    env.setdefault("JWT_SECRET", "benchmark")
+    if "ENCRYPTION_KEY" not in env:
+        from cryptography.fernet import Fernet
+        env["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--port", str(args.app_port),
+        "--log-level", "warning"
+    ], cwd=project_root, env=env, stdout=subprocess.DEVNULL)
+
+    processes = [fake, app]
+    try:
+        wait_until_ready(f"http://127.0.0.1:{args.fake_port}/_stats")
+        wait_until_ready(f"http://127.0.0.1:{args.app_port}/health")
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load driver for /mcp/tools/execute and /messages/")
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="App base URL (ignored with --spawn)")
+    parser.add_argument("--tools", default="get_property_settings,get_availability,get_bookings,get_booking_offers")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS))
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per tool and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured calls per tool before each run")
+    parser.add_argument("--tenants", type=int, default=1, help="Number of distinct API keys to rotate through")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+
+    spawn = parser.add_argument_group("local servers (--spawn)")
+    spawn.add_argument("--spawn", action="store_true", help="Start fake Quendoo and the app locally")
+    spawn.add_argument("--app-port", type=int, default=8000)
+    spawn.add_argument("--fake-port", type=int, default=8081)
+    spawn.add_argument("--latency-ms", type=float, default=50.0)
+    spawn.add_argument("--jitter-ms", type=float, default=20.0)
+    spawn.add_argument("--error-rate", type=float, default=0.0)
+    spawn.add_argument("--throttle-rate", type=float, default=0.0)
+    spawn.add_argument("--rooms", type=int, default=10)
+    spawn.add_argument("--bookings", type=int, default=500)
+    spawn.add_argument("--padding-bytes", type=int, default=0)
+    args = parser.parse_args()
+
+    tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    transports = [t.strip() for t in args.transports.split(",") if t.strip() in TRANSPORTS]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    processes = spawn_servers(args) if args.spawn else []
+    target = f"http://127.0.0.1:{args.app_port}" if args.spawn else args.target
+
+    try:
+        results = asyncio.run(run_benchmark(target, tools, transports, levels, args.requests, args.warmup, args.tenants))
+        if args.spawn:
+            print(f"[LoadDriver] Fake Quendoo stats: {httpx.get(f'http://127.0.0.1:{args.fake_port}/_stats').json()}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[LoadDriver] Wrote {len(results)} rows to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
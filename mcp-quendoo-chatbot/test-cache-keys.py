@@ -0,0 +1,46 @@
+"""
+Response cache key check
+
+QuendooAPIClient looks cached GETs up with the caller's params but stores
+them with the api_key added by _send(). Both must map to the same key, or
+reads without arguments (get_property_settings, get_rooms_details) never hit.
+
+Usage:
+    python test-cache-keys.py
+"""
+import os
+
+API_KEY = "sk-test"
+ENDPOINT = "/Property/getRoomsDetails"
+
+# (params at lookup, params at store) that must share an entry
+CASES = [
+    (None, {"api_key": API_KEY}),
+    ({}, {"api_key": API_KEY}),
+    ({"api_lng": None}, {"api_lng": None, "api_key": API_KEY}),
+    ({"names": "rooms"}, {"names": "rooms", "api_key": API_KEY}),
+    ({"b": 1, "a": 2}, {"a": 2, "b": 1, "api_key": API_KEY}),
+]
+
+
+def main():
+    # Settings need these to load; values are irrelevant for a key check
+    os.environ.setdefault("ENCRYPTION_KEY", "kOFhMROgdLhNarAbrmCQu-vkQbPc6ELIjJlSTnzkBo0=")
+    os.environ.setdefault("JWT_SECRET", "cache-key-check")
+    from app.quendoo.cache import QuendooResponseCache, normalize_params
+
+    failed = False
+    for lookup, stored in CASES:
+        cache = QuendooResponseCache(endpoint_ttls={ENDPOINT: 60.0})
+        cache.set(API_KEY, ENDPOINT, stored, {"data": "ok"})
+        hit = cache.get(API_KEY, ENDPOINT, lookup) is not None
+        print(f"  {'OK  ' if hit else 'FAIL'} lookup={normalize_params(lookup)!r} stored={normalize_params(stored)!r}")
+        failed = failed or not hit
+
+    if failed:
+        raise SystemExit("FAIL: cached reads are stored under a different key than they are looked up")
+    print("OK: lookup and store keys match")
+
+
+if __name__ == "__main__":
+    main()
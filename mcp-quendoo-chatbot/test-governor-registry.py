@@ -0,0 +1,63 @@
+"""
+Governor registry bound check
+
+GovernorRegistry keeps at most max_tenants idle governors. A new tenant that
+arrives while every known tenant has requests in flight must still get a
+governor (the registry grows past the bound) instead of failing.
+
+Usage:
+    python test-governor-registry.py
+"""
+import asyncio
+import os
+
+
+async def check():
+    # Settings need these to load; values are irrelevant for a registry check
+    os.environ.setdefault("ENCRYPTION_KEY", "kOFhMROgdLhNarAbrmCQu-vkQbPc6ELIjJlSTnzkBo0=")
+    os.environ.setdefault("JWT_SECRET", "governor-registry-check")
+    from app.quendoo.governor import GovernorRegistry
+
+    failures = []
+    registry = GovernorRegistry(max_tenants=1)
+
+    # Tenant A busy, tenant B arrives: A must stay, B must be created
+    busy = registry.get("key-a")
+    await busy.acquire()
+    try:
+        newcomer = registry.get("key-b")
+    except Exception as e:
+        failures.append(f"new tenant while all governors busy raised {type(e).__name__}: {e}")
+        newcomer = None
+    if newcomer is not None and registry.get("key-b") is not newcomer:
+        failures.append("new tenant's governor was not kept")
+    if registry.get("key-a") is not busy:
+        failures.append("busy governor was evicted")
+
+    # Once A is idle, the next new tenant evicts the least recently used idle governor
+    busy.release()
+    registry.get("key-c")
+    if len(registry._governors) > 2:
+        failures.append(f"registry did not shrink once governors were idle ({len(registry._governors)} entries)")
+
+    # An idle registry stays within the bound
+    idle = GovernorRegistry(max_tenants=2)
+    for i in range(5):
+        idle.get(f"key-{i}")
+    if len(idle._governors) != 2 or idle.evictions != 3:
+        failures.append(f"idle registry holds {len(idle._governors)} governors after {idle.evictions} evictions (want 2 / 3)")
+
+    return failures
+
+
+def main():
+    failures = asyncio.run(check())
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    if failures:
+        raise SystemExit("FAIL: governor registry bound")
+    print("OK: governor registry stays bounded without evicting new or busy tenants")
+
+
+if __name__ == "__main__":
+    main()
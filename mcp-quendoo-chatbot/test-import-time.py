@@ -0,0 +1,90 @@
+"""
+Import-time budget check for the app
+
+Imports app.main in a fresh interpreter and fails (exit code 1) when it takes
+longer than the budget, or when heavy cloud SDKs are imported eagerly - they
+must be initialized lazily or on startup warmup, never at import time.
+
+Usage:
+    python test-import-time.py
+    IMPORT_TIME_BUDGET_SECONDS=2 python test-import-time.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "3.0"))
+RUNS = int(os.getenv("IMPORT_TIME_RUNS", "3"))
+
+# Modules that must not be loaded just by importing the app
+LAZY_MODULES = [
+    "firebase_admin",
+    "google.cloud.firestore",
+    "google.cloud.aiplatform",
+    "vertexai",
+    "anthropic",
+    "google.cloud.secretmanager",
+]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "eager": [m for m in %r if m in sys.modules]
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once() -> dict:
+    """Import app.main in a new interpreter and return its timing"""
+    env = dict(os.environ)
+    # Settings need these to load; values are irrelevant for an import check
+    env.setdefault("ENCRYPTION_KEY", "kOFhMROgdLhNarAbrmCQu-vkQbPc6ELIjJlSTnzkBo0=")
+    env.setdefault("JWT_SECRET", "import-time-check")
+
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        print(completed.stderr)
+        raise SystemExit("Importing app.main failed")
+
+    # Last stdout line is the probe result (app modules may print on import)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    print("=" * 80)
+    print(f"IMPORT TIME BUDGET: {BUDGET_SECONDS:.2f}s (best of {RUNS})")
+    print("=" * 80)
+
+    results = [measure_once() for _ in range(RUNS)]
+    best = min(r["seconds"] for r in results)
+    eager = sorted({m for r in results for m in r["eager"]})
+
+    for i, r in enumerate(results, 1):
+        print(f"  Run {i}: {r['seconds']:.3f}s")
+
+    failed = False
+    if best > BUDGET_SECONDS:
+        print(f"FAIL: import app.main took {best:.3f}s, budget is {BUDGET_SECONDS:.2f}s")
+        failed = True
+    if eager:
+        print(f"FAIL: heavy modules imported at import time: {', '.join(eager)}")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print(f"OK: import app.main took {best:.3f}s")
+
+
+if __name__ == "__main__":
+    main()